@@ -0,0 +1,391 @@
+"""
+HTTP API for the recruitment pipeline.
+
+Run with:
+    uvicorn api:app --host 0.0.0.0 --port 8000
+
+Reads are served from the shared in-memory CandidateCache, writes are
+collected for a short moment and sent to Google Sheets as one batch_update.
+
+Requests are for the tenant named in the X-Tenant header (utils/tenants.py),
+or the default tenant without one.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel
+
+from utils.config import env
+from utils.sheets_connector import CandidateWriteError, get_connector
+from utils.candidate_cache import get_candidate_cache
+from utils.archive import get_candidate_archive
+from utils.scheduler import TIME_SLOTS, plan_gap_fill, plan_interviews
+from utils.calendar_invites import send_invites_in_background
+from utils.dedup import get_duplicate_scan
+from utils.email_checker import check_for_reply
+from utils.metrics import get_metrics, page_action
+from utils.tenants import current_tenant, use_tenant
+
+
+# How long writes wait to be grouped, and the most candidates per batch
+API_WRITE_FLUSH_SECONDS = float(env("API_WRITE_FLUSH_SECONDS", "0.5"))
+API_WRITE_MAX_BATCH = int(env("API_WRITE_MAX_BATCH", "200"))
+API_REPLY_CHECK_CONCURRENCY = int(env("API_REPLY_CHECK_CONCURRENCY", "5"))
+
+
+class WriteBatcher:
+    """
+    Groups candidate updates from many requests into one Sheets write.
+
+    Every request waits until its update has actually been written, so a
+    200 response still means "saved" - if the write fails (or one of its
+    emails isn't in the sheet) the request gets a CandidateWriteError,
+    answered with a 502. Each tenant's updates go to its own sheet, in
+    its own batch.
+    """
+
+    def __init__(self, flush_seconds: float = API_WRITE_FLUSH_SECONDS, max_batch: int = API_WRITE_MAX_BATCH):
+        self.flush_seconds = flush_seconds
+        self.max_batch = max_batch
+        # tenant -> email -> {column: value}, and the requests (with their emails) waiting on each tenant
+        self._pending: Dict[str, Dict[str, Dict[str, str]]] = {}
+        self._waiters: Dict[str, List[Tuple[asyncio.Future, List[str]]]] = {}
+        self._wakeup = asyncio.Event()
+
+    async def submit(self, updates: Dict[str, Dict[str, str]]) -> List[str]:
+        """
+        Queues email -> {column: value} updates and waits for the batch write.
+
+        Returns:
+            list: The emails of these updates, all written
+
+        Raises:
+            CandidateWriteError: Some weren't written (.written has the ones that were)
+        """
+        tenant_id = current_tenant().tenant_id
+        pending = self._pending.setdefault(tenant_id, {})
+        for email, columns in updates.items():
+            # Later updates to the same cell win, like they would one by one
+            pending.setdefault(email, {}).update(columns)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(tenant_id, []).append((waiter, list(updates)))
+
+        if sum(len(p) for p in self._pending.values()) >= self.max_batch:
+            self._wakeup.set()
+
+        return await waiter
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        if not self._pending:
+            return
+
+        pending_by_tenant, self._pending = self._pending, {}
+        waiters_by_tenant, self._waiters = self._waiters, {}
+
+        def _write(tenant_id, pending):
+            # Runs in a copy of this task's context, so the tenant doesn't leak
+            use_tenant(tenant_id)
+            written = []
+            with page_action("API", "write batch"):
+                try:
+                    written = get_connector().write_candidates(pending)
+                except CandidateWriteError as e:
+                    written = e.written
+                    raise
+                finally:
+                    # The cache only gets what is really in the sheet now
+                    get_candidate_cache().apply_updates({email: pending[email] for email in written})
+            return written
+
+        results = await asyncio.gather(
+            *[asyncio.to_thread(_write, tenant_id, pending) for tenant_id, pending in pending_by_tenant.items()],
+            return_exceptions=True
+        )
+
+        for tenant_id, result in zip(pending_by_tenant, results):
+            if isinstance(result, CandidateWriteError):
+                written, error = set(result.written), str(result)
+            elif isinstance(result, BaseException):
+                written, error = set(), None
+            else:
+                written, error = set(result), "not found in the sheet"
+
+            for waiter, emails in waiters_by_tenant.get(tenant_id, []):
+                if waiter.done():
+                    continue
+                saved = [email for email in emails if email in written]
+                if len(saved) == len(emails):
+                    waiter.set_result(saved)
+                elif error is None:
+                    waiter.set_exception(result)
+                else:
+                    missing = [email for email in emails if email not in written]
+                    waiter.set_exception(CandidateWriteError(
+                        f"Could not save {', '.join(missing)}: {error}", saved
+                    ))
+
+
+batcher: Optional[WriteBatcher] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global batcher
+    batcher = WriteBatcher()
+    task = asyncio.create_task(batcher.run())
+    yield
+    task.cancel()
+    await batcher.flush()
+
+
+app = FastAPI(title="Recruiters Assistant API", lifespan=lifespan)
+
+
+@app.exception_handler(CandidateWriteError)
+async def write_failed(request: Request, error: CandidateWriteError):
+    # The sheet didn't take the write - nothing the client sent was wrong
+    return JSONResponse(status_code=502, content={"detail": str(error), "written": error.written})
+
+
+# Scheduling requests of a tenant run one at a time, from planning until
+# their write is in the sheet - two at once would both see the same free slots
+_schedule_locks: Dict[str, asyncio.Lock] = {}
+
+def _schedule_lock() -> asyncio.Lock:
+    return _schedule_locks.setdefault(current_tenant().tenant_id, asyncio.Lock())
+
+
+async def _write_schedule(plan: Dict[str, Dict[str, str]], df) -> List[str]:
+    # Saves a scheduling plan; invites only go to bookings that are in the sheet
+    try:
+        written = await batcher.submit(plan)
+    except CandidateWriteError as e:
+        if e.written:
+            send_invites_in_background({email: plan[email] for email in e.written}, df)
+        raise
+    send_invites_in_background({email: plan[email] for email in written}, df)
+    return written
+
+
+@app.middleware("http")
+async def label_external_calls(request: Request, call_next):
+    try:
+        use_tenant(request.headers.get("X-Tenant"))
+    except ValueError as e:
+        return JSONResponse(status_code=404, content={"detail": str(e)})
+
+    # "/candidates/a@b.com" -> "GET /candidates", so emails don't become labels
+    resource = request.url.path.strip("/").split("/")[0]
+    with page_action("API", f"{request.method} /{resource}"):
+        return await call_next(request)
+
+
+# ============================================
+# REQUEST MODELS
+# ============================================
+
+class CandidateUpdate(BaseModel):
+    status: Optional[str] = None
+    updates: Dict[str, str] = {}
+
+
+class ScheduleRequest(BaseModel):
+    interview_type: str = "L1"
+    start_date: Optional[date] = None
+    start_time_slot: Optional[str] = None
+
+
+class GapFillRequest(ScheduleRequest):
+    shift_bookings: bool = False
+
+
+class ReplyCheckRequest(BaseModel):
+    emails: Optional[List[str]] = None
+    since_minutes: int = 60
+
+
+# ============================================
+# ENDPOINTS
+# ============================================
+
+async def _candidates():
+    return await asyncio.to_thread(get_candidate_cache().get)
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    External-call counts, latency histograms, bytes and errors (Prometheus format).
+    """
+    return PlainTextResponse(
+        get_metrics().render_prometheus(),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
+@app.get("/candidates")
+async def list_candidates(
+    status: Optional[str] = None,
+    role: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=10000),
+    offset: int = Query(0, ge=0)
+):
+    df = await _candidates()
+
+    if status:
+        df = df[df['Status'] == status]
+    if role:
+        df = df[df['Role'] == role]
+
+    page = df.iloc[offset:offset + limit].fillna('')
+    return {"total": len(df), "candidates": page.to_dict('records')}
+
+
+@app.get("/candidates/{email}")
+async def get_candidate(email: str):
+    df = await _candidates()
+    match = df[df['Email'] == email]
+
+    if len(match) == 0:
+        # Closed candidates may have been moved to the archive (by any process)
+        archive = get_candidate_archive()
+        await asyncio.to_thread(archive.refresh, get_connector)
+        match = await asyncio.to_thread(archive.get, [email])
+        if len(match) == 0:
+            raise HTTPException(status_code=404, detail=f"Candidate {email} not found")
+        return {**match.iloc[0].fillna('').to_dict(), "archived": True}
+    return match.iloc[0].fillna('').to_dict()
+
+
+@app.get("/duplicates")
+async def list_duplicates():
+    """
+    Candidates who look like someone earlier in the sheet (utils/dedup.py),
+    from the last background check - 202 while the first one runs.
+    """
+    df = await _candidates()
+    scan = get_duplicate_scan()
+    # Rescanned in the background when the cached table was reloaded
+    scan.refresh(lambda: df, df.attrs.get("fetched_at", len(df)))
+    duplicates = scan.result
+    if duplicates is None:
+        return JSONResponse(status_code=202, content={"detail": "Checking for duplicates - try again shortly"})
+    return {
+        "total": len(duplicates),
+        "duplicates": duplicates.to_dict('records'),
+        "checked_at": scan.checked_at,
+        "checking": scan.running
+    }
+
+
+@app.patch("/candidates/{email}")
+async def update_candidate(email: str, body: CandidateUpdate):
+    df = await _candidates()
+
+    if len(df[df['Email'] == email]) == 0:
+        raise HTTPException(status_code=404, detail=f"Candidate {email} not found")
+
+    columns = dict(body.updates)
+    if body.status:
+        columns['Status'] = body.status
+
+    unknown = [name for name in columns if name not in df.columns]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown column(s): {', '.join(unknown)}")
+    if not columns:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+
+    await batcher.submit({email: columns})
+    return {"email": email, "updated": columns}
+
+
+@app.post("/schedule")
+async def schedule_interviews(body: ScheduleRequest):
+    if body.interview_type not in ("L1", "L2"):
+        raise HTTPException(status_code=400, detail="interview_type must be L1 or L2")
+    if body.start_time_slot and body.start_time_slot not in TIME_SLOTS:
+        raise HTTPException(status_code=400, detail=f"start_time_slot must be one of: {', '.join(TIME_SLOTS)}")
+
+    async with _schedule_lock():
+        # Scheduling must see the latest bookings, so skip the cache here
+        df = await asyncio.to_thread(get_candidate_cache().get, True)
+        waiting_status = "Screening" if body.interview_type == "L1" else "L1_Done"
+
+        plan = plan_interviews(
+            df,
+            df[df['Status'] == waiting_status],
+            interview_type=body.interview_type,
+            start_date=body.start_date,
+            start_time_slot=body.start_time_slot
+        )
+
+        if plan:
+            await _write_schedule(plan, df)
+
+    return {"scheduled": len(plan), "slots": plan}
+
+
+@app.post("/schedule/gaps")
+async def fill_schedule_gaps(body: GapFillRequest):
+    """
+    Gives slots freed by failed/rejected/reset candidates to waiting ones
+    (and, with shift_bookings, moves later interviews up) - one batch write.
+    """
+    if body.interview_type not in ("L1", "L2"):
+        raise HTTPException(status_code=400, detail="interview_type must be L1 or L2")
+    if body.start_time_slot and body.start_time_slot not in TIME_SLOTS:
+        raise HTTPException(status_code=400, detail=f"start_time_slot must be one of: {', '.join(TIME_SLOTS)}")
+
+    async with _schedule_lock():
+        df = await asyncio.to_thread(get_candidate_cache().get, True)
+
+        plan = plan_gap_fill(
+            df,
+            interview_type=body.interview_type,
+            start_date=body.start_date,
+            start_time_slot=body.start_time_slot,
+            shift_bookings=body.shift_bookings
+        )
+
+        if plan:
+            await _write_schedule(plan, df)
+
+    filled = {email: columns for email, columns in plan.items() if "Status" in columns}
+    moved = {email: columns for email, columns in plan.items() if "Status" not in columns}
+    return {"filled": len(filled), "moved": len(moved), "slots": plan}
+
+
+@app.post("/replies/check")
+async def check_replies(body: ReplyCheckRequest):
+    emails = body.emails
+    if emails is None:
+        df = await _candidates()
+        emails = df[df['Status'] == 'Offer_Accepted']['Email'].tolist()
+
+    limit = asyncio.Semaphore(API_REPLY_CHECK_CONCURRENCY)
+
+    async def _check(email):
+        async with limit:
+            result = await asyncio.to_thread(check_for_reply, email, body.since_minutes)
+        return {"email": email, **result}
+
+    results = await asyncio.gather(*[_check(email) for email in emails])
+    return {"results": results}
@@ -3,7 +3,10 @@ import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from utils.sheets_connector import get_connector
+from utils.sheets_connector import warm_connector
+from utils.metrics import set_page
+from utils.tenants import use_tenant
+from utils.snapshot import load_candidates_fast
 
 st.set_page_config(
     page_title="Recruiters Assistant",
@@ -11,6 +14,18 @@ st.set_page_config(
     layout="wide",
 )
 
+# Which client company this session works for (?tenant=acme, remembered for the session)
+try:
+    tenant = use_tenant(st.query_params.get("tenant") or st.session_state.get("tenant"))
+except ValueError as e:
+    st.error(str(e))
+    st.stop()
+st.session_state["tenant"] = tenant.tenant_id
+
+# Connect to Sheets in the background while the page draws
+warm_connector()
+set_page("Home")
+
 st.title("🎯 Recruiters Assistant")
 st.subheader("AI-Powered Recruitment Pipeline Manager")
 
@@ -22,6 +37,8 @@ This system helps you manage your recruitment pipeline with AI assistance.
 - 📊 **Pipeline Dashboard** - View and manage all candidates
 - 📅 **Interview Scheduler** - Auto-schedule L1 & L2 interviews
 - 👻 **Anti-Ghosting Bot** - Keep candidates engaged during notice period  
+- 🩺 **System Health** - API calls, latency and errors per page action
+- 📈 **Analytics** - Funnel conversion, time between stages, interview load and ghosting
 
 ---
 👈 **Select a tool from the sidebar to get started!**
@@ -31,12 +48,13 @@ st.markdown("---")
 st.subheader("📈 Quick Status")
 
 @st.cache_data(ttl=60)
-def load_data():
-    connector = get_connector()
-    return connector.get_all_candidates()
+def load_data(tenant_id: str):
+    # Last saved copy first (instant after a restart), refreshed from Sheets in the background.
+    # tenant_id only keys Streamlit's cache, so tenants never see each other's data
+    return load_candidates_fast()
 
 try:
-    df = load_data()
+    df = load_data(tenant.tenant_id)
     
     col1, col2, col3, col4, col5 = st.columns(5)
     
@@ -0,0 +1,139 @@
+"""
+In-process stand-ins for Gmail's SMTP and IMAP servers.
+
+FakeMailServer.installed() swaps smtplib.SMTP and imaplib.IMAP4_SSL for
+fakes while the block runs, so utils.email_sender / utils.email_checker
+run unchanged but nothing leaves the machine.
+
+Usage:
+    server = FakeMailServer(connect_latency=0.2, replied={"a@x.com"})
+    with server.installed():
+        send_email("a@x.com", "Hi", "Hello")
+    print(server.sent, server.connections)
+"""
+import imaplib
+import re
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import formatdate
+from typing import Iterable, List, Optional
+
+
+class FakeMailServer:
+    """
+    Records everything sent, and answers IMAP searches from a set of
+    addresses that "replied".
+
+    - connect_latency: seconds to open a connection (TLS + login on Gmail)
+    - command_latency: seconds per command after that (send, search, fetch)
+    """
+
+    def __init__(
+        self,
+        connect_latency: float = 0.0,
+        command_latency: float = 0.0,
+        replied: Optional[Iterable[str]] = None,
+    ):
+        self.connect_latency = connect_latency
+        self.command_latency = command_latency
+        self.replied = {email.lower() for email in (replied if replied is not None else [])}
+        self.sent: List[dict] = []
+        self.connections = {"smtp": 0, "imap": 0}
+        self._lock = threading.Lock()
+
+    def _connect(self, kind: str):
+        with self._lock:
+            self.connections[kind] += 1
+        if self.connect_latency:
+            time.sleep(self.connect_latency)
+
+    def _command(self):
+        if self.command_latency:
+            time.sleep(self.command_latency)
+
+    def _record(self, msg):
+        with self._lock:
+            self.sent.append({"to": msg["To"], "subject": msg["Subject"]})
+
+    @contextmanager
+    def installed(self):
+        server = self
+
+        class FakeSMTP:
+            def __init__(self, host="", port=0, *args, **kwargs):
+                server._connect("smtp")
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                self.quit()
+
+            def starttls(self, *args, **kwargs):
+                return (220, b"ready")
+
+            def ehlo(self, *args, **kwargs):
+                return (250, b"ok")
+
+            def login(self, user, password):
+                return (235, b"accepted")
+
+            def noop(self):
+                return (250, b"ok")
+
+            def send_message(self, msg, *args, **kwargs):
+                server._command()
+                server._record(msg)
+                return {}
+
+            def sendmail(self, from_addr, to_addrs, msg, *args, **kwargs):
+                server._command()
+                with server._lock:
+                    server.sent.append({"to": to_addrs, "subject": None})
+                return {}
+
+            def quit(self):
+                return (221, b"bye")
+
+            def close(self):
+                pass
+
+        class FakeIMAP:
+            def __init__(self, host="", port=0, *args, **kwargs):
+                server._connect("imap")
+
+            def login(self, user, password):
+                return ("OK", [b"logged in"])
+
+            def select(self, mailbox="INBOX", readonly=False):
+                return ("OK", [b"1"])
+
+            def search(self, charset, *criteria):
+                server._command()
+                match = re.search(r'FROM "([^"]+)"', " ".join(criteria))
+                found = match and match.group(1).lower() in server.replied
+                return ("OK", [b"1" if found else b""])
+
+            def fetch(self, message_set, parts):
+                server._command()
+                raw = (
+                    f"From: candidate@example.com\r\n"
+                    f"Date: {formatdate(localtime=True)}\r\n"
+                    f"Subject: Re: hello\r\n\r\nThanks!\r\n"
+                ).encode()
+                return ("OK", [(b"1 (RFC822 {%d}" % len(raw), raw), b")"])
+
+            def noop(self):
+                return ("OK", [b"noop"])
+
+            def logout(self):
+                return ("BYE", [b"logging out"])
+
+        original_smtp, original_imap = smtplib.SMTP, imaplib.IMAP4_SSL
+        smtplib.SMTP, imaplib.IMAP4_SSL = FakeSMTP, FakeIMAP
+        try:
+            yield self
+        finally:
+            smtplib.SMTP, imaplib.IMAP4_SSL = original_smtp, original_imap
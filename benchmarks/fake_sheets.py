@@ -0,0 +1,241 @@
+"""
+In-memory stand-in for a gspread Worksheet.
+
+Implements the calls the app makes (find, row_values, col_values,
+update_cell, batch_update, get_all_records, append_row(s), delete_rows,
+spreadsheet.batch_update), with optional per-call latency and a
+per-minute request quota like the real Sheets API.
+
+Usage:
+    ws = FakeWorksheet(make_candidates(1000), latency=0.05)
+    connector = SheetsConnector(worksheet=ws)
+"""
+import random
+import threading
+import time
+from collections import deque
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import requests
+from gspread.cell import Cell
+from gspread.exceptions import APIError
+from gspread.utils import a1_to_rowcol
+
+HEADERS = [
+    "Name", "Email", "Phone", "Role", "Status", "Applied_Date",
+    "L1_Date", "L1_Time", "L1_Result", "L2_Date", "L2_Time", "L2_Result",
+    "Ghost_Risk", "Notes"
+]
+
+ROLES = ["Backend Engineer", "Frontend Engineer", "Data Scientist", "DevOps Engineer", "Product Manager"]
+FIRST_NAMES = ["Arjun", "Priya", "Rahul", "Sneha", "Vikram", "Ananya", "Karthik", "Divya", "Rohan", "Meera"]
+LAST_NAMES = ["Sharma", "Reddy", "Iyer", "Nair", "Gupta", "Patel", "Rao", "Menon", "Das", "Kumar"]
+
+# Roughly how a real pipeline is spread over the stages
+STATUS_WEIGHTS = {
+    "Screening": 40, "L1_Scheduled": 15, "L1_Done": 10, "L2_Scheduled": 8,
+    "L2_Done": 5, "Offer_Sent": 5, "Offer_Accepted": 12, "Rejected": 5,
+}
+
+
+def make_candidates(count: int, seed: int = 42) -> List[Dict[str, str]]:
+    """
+    Builds `count` realistic candidate rows (same columns as the real sheet).
+
+    The same count and seed always give the same rows.
+    """
+    rng = random.Random(seed)
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    today = date.today()
+
+    candidates = []
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        status = rng.choices(statuses, weights)[0]
+        row = {header: "" for header in HEADERS}
+        row.update({
+            "Name": f"{first} {last}",
+            "Email": f"{first.lower()}.{last.lower()}{i}@example.com",
+            "Phone": f"9{rng.randint(100000000, 999999999)}",
+            "Role": rng.choice(ROLES),
+            "Status": status,
+            "Applied_Date": (today - timedelta(days=rng.randint(0, 90))).strftime("%Y-%m-%d"),
+            "Ghost_Risk": str(rng.choice([10, 10, 30, 50, 70])) if status == "Offer_Accepted" else "",
+        })
+        candidates.append(row)
+
+    return candidates
+
+
+def quota_error() -> APIError:
+    """
+    The same exception gspread raises when Sheets answers 429.
+    """
+    response = requests.Response()
+    response.status_code = 429
+    response._content = (
+        b'{"error": {"code": 429, "message": "Quota exceeded for quota metric '
+        b'\'Read requests\'", "status": "RESOURCE_EXHAUSTED"}}'
+    )
+    return APIError(response)
+
+
+class FakeWorksheet:
+    """
+    A worksheet held in a list of rows (row 1 is the header).
+
+    - latency: seconds each API call takes
+    - quota_per_minute: reads (and, separately, writes) allowed in any 60s
+      window; more raise a 429 APIError, like the real API (None = unlimited)
+    - calls: how many requests of each kind were made
+    """
+
+    def __init__(
+        self,
+        candidates: Optional[List[Dict[str, str]]] = None,
+        headers: Optional[List[str]] = None,
+        latency: float = 0.0,
+        quota_per_minute: Optional[int] = None,
+    ):
+        self.headers = list(headers or HEADERS)
+        self.rows: List[List[str]] = [list(self.headers)]
+        for candidate in candidates or []:
+            self.rows.append([str(candidate.get(h, "")) for h in self.headers])
+
+        self.id = 0
+        self.latency = latency
+        self.quota_per_minute = quota_per_minute
+        self.calls = {"read": 0, "write": 0, "rejected": 0}
+        self._recent = {"read": deque(), "write": deque()}
+        self._lock = threading.Lock()
+
+    # ============================================
+    # SIMULATED API COST
+    # ============================================
+
+    def _request(self, kind: str):
+        with self._lock:
+            now = time.monotonic()
+            if self.quota_per_minute is not None:
+                recent = self._recent[kind]
+                while recent and now - recent[0] > 60:
+                    recent.popleft()
+                if len(recent) >= self.quota_per_minute:
+                    self.calls["rejected"] += 1
+                    raise quota_error()
+                recent.append(now)
+            self.calls[kind] += 1
+
+        if self.latency:
+            time.sleep(self.latency)
+
+    @property
+    def total_calls(self) -> int:
+        return self.calls["read"] + self.calls["write"]
+
+    def reset_calls(self):
+        with self._lock:
+            self.calls = {"read": 0, "write": 0, "rejected": 0}
+            for recent in self._recent.values():
+                recent.clear()
+
+    # ============================================
+    # GSPREAD API
+    # ============================================
+
+    def _set(self, row: int, col: int, value):
+        while len(self.rows) < row:
+            self.rows.append([""] * len(self.headers))
+        cells = self.rows[row - 1]
+        while len(cells) < col:
+            cells.append("")
+        cells[col - 1] = "" if value is None else str(value)
+
+    def get_all_values(self) -> List[List[str]]:
+        self._request("read")
+        return [list(row) for row in self.rows]
+
+    def get_all_records(self) -> List[Dict]:
+        """
+        Like gspread: numbers come back as int/float, everything else as text.
+        """
+        self._request("read")
+        headers = self.rows[0]
+        records = []
+        for row in self.rows[1:]:
+            record = {}
+            for header, value in zip(headers, row):
+                if value.isdigit():
+                    value = int(value)
+                record[header] = value
+            records.append(record)
+        return records
+
+    def row_values(self, row: int) -> List[str]:
+        self._request("read")
+        values = list(self.rows[row - 1]) if row <= len(self.rows) else []
+        while values and values[-1] == "":
+            values.pop()
+        return values
+
+    def col_values(self, col: int) -> List[str]:
+        self._request("read")
+        values = [row[col - 1] if col <= len(row) else "" for row in self.rows]
+        while values and values[-1] == "":
+            values.pop()
+        return values
+
+    def find(self, query: str) -> Optional[Cell]:
+        self._request("read")
+        for row_number, row in enumerate(self.rows, start=1):
+            for col_number, value in enumerate(row, start=1):
+                if value == query:
+                    return Cell(row_number, col_number, value)
+        return None
+
+    def update_cell(self, row: int, col: int, value):
+        self._request("write")
+        self._set(row, col, value)
+
+    def batch_update(self, data: List[Dict], value_input_option=None, **kwargs):
+        self._request("write")
+        for item in data:
+            start_row, start_col = a1_to_rowcol(item["range"].split(":")[0])
+            for r, values in enumerate(item["values"]):
+                for c, value in enumerate(values):
+                    self._set(start_row + r, start_col + c, value)
+
+    def append_row(self, values: List, value_input_option=None, **kwargs):
+        self._request("write")
+        self.rows.append(["" if v is None else str(v) for v in values])
+
+    def append_rows(self, values: List[List], value_input_option=None, **kwargs):
+        self._request("write")
+        for row in values:
+            self.rows.append(["" if v is None else str(v) for v in row])
+
+    def delete_rows(self, start_index: int, end_index: Optional[int] = None):
+        self._request("write")
+        del self.rows[start_index - 1:end_index or start_index]
+
+    @property
+    def spreadsheet(self) -> "FakeSpreadsheet":
+        return FakeSpreadsheet(self)
+
+
+class FakeSpreadsheet:
+    """
+    The worksheet's spreadsheet - only batch_update with deleteDimension.
+    """
+
+    def __init__(self, worksheet: FakeWorksheet):
+        self.worksheet = worksheet
+
+    def batch_update(self, body: Dict) -> Dict:
+        self.worksheet._request("write")
+        for request in body["requests"]:
+            span = request["deleteDimension"]["range"]
+            del self.worksheet.rows[span["startIndex"]:span["endIndex"]]
+        return {"replies": [{} for _ in body["requests"]]}
@@ -0,0 +1,293 @@
+"""
+Benchmarks for the pipeline, against an in-memory Google Sheet and fake
+SMTP/IMAP servers - no credentials or network needed.
+
+Usage:
+    python benchmarks/run.py                          # 100, 1k and 10k candidates
+    python benchmarks/run.py --sizes 1000 --only load schedule
+    python benchmarks/run.py --latency 0.1 --mail-latency 0.3
+    python benchmarks/run.py --save before.json
+    python benchmarks/run.py --compare before.json    # after a change
+
+--latency / --mail-latency add the cost of real round trips, so the
+numbers also show how many API calls each operation makes.
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from typing import Callable, Dict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.fake_sheets import FakeWorksheet, make_candidates
+from benchmarks.fake_mail import FakeMailServer
+from utils.sheets_connector import SheetsConnector
+from utils.rate_limiter import SheetsRateLimiter
+from utils.candidate_store import CandidateStore
+from utils.candidate_diff import diff_candidates
+from utils.search_index import CandidateSearchIndex, SEARCH_FIELDS
+from utils.scheduler import plan_interviews
+from utils.email_sender import send_email
+from utils.email_checker import check_for_reply
+from utils.message_templates import render_bulk
+from utils.hr_alerts import AlertManager
+
+
+class Timer:
+    """
+    Collects named timings and counters for one scenario run.
+    """
+
+    def __init__(self):
+        self.results: Dict[str, float] = {}
+
+    def measure(self, name: str, func: Callable, *args, **kwargs):
+        started = time.perf_counter()
+        # The utils print a line per row - keep them out of the timings/report
+        with redirect_stdout(io.StringIO()):
+            result = func(*args, **kwargs)
+        self.results[f"{name}_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return result
+
+    def count(self, name: str, value):
+        self.results[name] = value
+
+
+def make_sheet(candidates, args, quota=None):
+    """
+    A fake sheet with --latency/--quota, and a connector with its own
+    rate limiter set to the same quota (unlimited without --quota).
+    """
+    quota = quota or args.quota
+    worksheet = FakeWorksheet(candidates, latency=args.latency, quota_per_minute=quota)
+    limiter = SheetsRateLimiter(read_per_minute=quota, write_per_minute=quota)
+    return worksheet, SheetsConnector(worksheet=worksheet, rate_limiter=limiter)
+
+
+# ============================================
+# SCENARIOS
+# ============================================
+
+def bench_load(size: int, args, workdir: str) -> Dict[str, float]:
+    """
+    Sheet -> DataFrame -> local store -> search index (a Pipeline page cold start).
+    """
+    timer = Timer()
+    worksheet, connector = make_sheet(make_candidates(size), args)
+
+    df = timer.measure("get_all_candidates", connector.get_all_candidates)
+
+    store = CandidateStore(os.path.join(workdir, f"load_{size}.db"))
+    timer.measure("store_sync", store.sync, df)
+    timer.measure("store_query_page", store.query, {"Status": "Screening"}, "Name", True, 1, 50)
+
+    index = CandidateSearchIndex()
+    timer.measure("search_index_build", index.update, store.read_columns(SEARCH_FIELDS))
+    timer.measure("search", index.search, "priya backend")
+
+    timer.count("sheet_calls", worksheet.total_calls)
+    return timer.results
+
+
+def bench_schedule(size: int, args, workdir: str) -> Dict[str, float]:
+    """
+    Auto-schedule every Screening candidate for L1 and write the slots.
+    """
+    timer = Timer()
+    worksheet, connector = make_sheet(make_candidates(size), args)
+    df = connector.get_all_candidates()
+    worksheet.reset_calls()
+
+    plan = timer.measure(
+        "plan_interviews", plan_interviews,
+        df, df[df["Status"] == "Screening"], "L1"
+    )
+    timer.measure("write_schedule", connector.batch_update_candidates, plan)
+
+    timer.count("scheduled", len(plan))
+    timer.count("sheet_calls", worksheet.total_calls)
+    return timer.results
+
+
+def bench_updates(size: int, args, workdir: str) -> Dict[str, float]:
+    """
+    Status updates: one at a time (update_candidate_status) vs one batch.
+
+    One-at-a-time is only run for --sample candidates and reported per
+    candidate - at 10k it would take hours with real latency.
+    """
+    timer = Timer()
+    candidates = make_candidates(size)
+    worksheet, connector = make_sheet(candidates, args)
+
+    sample = candidates[:min(args.sample, size)]
+
+    def _one_by_one():
+        for candidate in sample:
+            connector.update_candidate_status(candidate["Email"], "L1_Done", {"L1_Result": "Pass"})
+
+    timer.measure("one_by_one_sample", _one_by_one)
+    timer.count("one_by_one_calls_per_candidate", round(worksheet.total_calls / len(sample), 1))
+    timer.count("one_by_one_ms_per_candidate", round(timer.results["one_by_one_sample_ms"] / len(sample), 3))
+
+    # Same change for EVERY candidate, found the way the Pipeline page does it
+    original = connector.get_all_candidates()
+    edited = original.copy()
+    edited["Status"] = "L1_Done"
+    edited["L1_Result"] = "Pass"
+    updates = timer.measure("diff_candidates", diff_candidates, original, edited)
+
+    worksheet.reset_calls()
+    timer.measure("batch_update_all", connector.batch_update_candidates, updates)
+    timer.count("batch_calls", worksheet.total_calls)
+    return timer.results
+
+
+def bench_anti_ghosting(size: int, args, workdir: str) -> Dict[str, float]:
+    """
+    One Anti-Ghosting cycle for every Offer_Accepted candidate: welcome
+    email, reply check, Ghost_Risk update and HR alert digest.
+    """
+    timer = Timer()
+    worksheet, connector = make_sheet(make_candidates(size), args)
+    df = connector.get_all_candidates()
+    notice = df[df["Status"] == "Offer_Accepted"]
+    worksheet.reset_calls()
+
+    # Every third candidate has replied
+    mail = FakeMailServer(
+        connect_latency=args.mail_latency,
+        replied=notice["Email"].iloc[::3].tolist(),
+    )
+    alerts = AlertManager(db_path=os.path.join(workdir, f"alerts_{size}.db"), window_minutes=0)
+
+    with mail.installed():
+        def _welcome():
+            for message in render_bulk(notice.to_dict("records"), day=1):
+                send_email(message["email"], message["subject"], message["body"])
+
+        def _check():
+            risks = []
+            for cand in notice.to_dict("records"):
+                result = check_for_reply(cand["Email"], since_minutes=60)
+                current = int(cand["Ghost_Risk"]) if str(cand["Ghost_Risk"]).isdigit() else 10
+                risk = 10 if result["found"] else min(current + 20, 100)
+                connector.update_candidate_status(cand["Email"], "Offer_Accepted", {"Ghost_Risk": str(risk)})
+                risks.append({"name": cand["Name"], "email": cand["Email"], "risk": risk})
+            return risks
+
+        timer.measure("welcome_emails", _welcome)
+        risks = timer.measure("reply_checks", _check)
+        timer.measure("hr_alerts", lambda: (alerts.record_risks(risks), alerts.flush(force=True)))
+
+    timer.count("candidates", len(notice))
+    timer.count("smtp_connections", mail.connections["smtp"])
+    timer.count("imap_connections", mail.connections["imap"])
+    timer.count("sheet_calls", worksheet.total_calls)
+    return timer.results
+
+
+def bench_quota(size: int, args, workdir: str) -> Dict[str, float]:
+    """
+    One-at-a-time updates against a sheet that enforces a quota
+    (--quota, default 600/min): how close to the quota do we get, and
+    how many 429s does the sheet send back?
+    """
+    timer = Timer()
+    quota = args.quota or 600
+    candidates = make_candidates(size)
+    worksheet, connector = make_sheet(candidates, args, quota=quota)
+    sample = candidates[:min(args.sample, size)]
+
+    def _updates():
+        for candidate in sample:
+            connector.update_candidate_status(candidate["Email"], "L1_Done", {"L1_Result": "Pass"})
+
+    timer.measure("updates", _updates)
+    minutes = timer.results["updates_ms"] / 60000
+
+    timer.count("quota_per_minute", quota)
+    timer.count("sheet_calls", worksheet.total_calls)
+    timer.count("calls_per_minute", round(worksheet.total_calls / minutes, 1) if minutes else 0)
+    timer.count("rejected_429", worksheet.calls["rejected"])
+    timer.count("coalesced_reads", connector.rate_limiter.stats["coalesced"])
+    return timer.results
+
+
+SCENARIOS = {
+    "load": bench_load,
+    "schedule": bench_schedule,
+    "updates": bench_updates,
+    "anti_ghosting": bench_anti_ghosting,
+    "quota": bench_quota,
+}
+
+# "quota" waits on a real per-minute quota, so it only runs when asked for
+DEFAULT_SCENARIOS = ["load", "schedule", "updates", "anti_ghosting"]
+
+
+# ============================================
+# REPORT
+# ============================================
+
+def print_results(results: Dict[str, Dict[str, Dict[str, float]]], baseline: Dict = None):
+    for scenario, by_size in results.items():
+        print(f"\n## {scenario}")
+        sizes = list(by_size)
+        print(f"{'metric':<34}" + "".join(f"{size:>14}" for size in sizes))
+
+        metrics = list(dict.fromkeys(m for size in sizes for m in by_size[size]))
+        for metric in metrics:
+            line = f"{metric:<34}"
+            for size in sizes:
+                value = by_size[size].get(metric, "")
+                cell = f"{value}"
+                before = (baseline or {}).get(scenario, {}).get(size, {}).get(metric)
+                if before and isinstance(value, (int, float)) and metric.endswith("_ms"):
+                    cell += f" ({before / value:.1f}x)" if value else ""
+                line += f"{cell:>14}"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline against a simulated Google Sheet")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--only", nargs="+", choices=list(SCENARIOS), help="Scenarios to run (default: all)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per Sheets API call")
+    parser.add_argument("--quota", type=int, help="Sheets requests per minute the fake sheet allows (default: unlimited)")
+    parser.add_argument("--mail-latency", type=float, default=0.0, help="Seconds per SMTP/IMAP connection")
+    parser.add_argument("--sample", type=int, default=50, help="Candidates for the one-at-a-time update benchmark")
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier --save, shown as speed-up")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        # Pandas/gspread are imported lazily - pay that once before timing anything
+        bench_load(10, args, workdir)
+
+        for name in args.only or DEFAULT_SCENARIOS:
+            results[name] = {}
+            for size in args.sizes:
+                print(f"⏱️ {name} @ {size} candidates...", file=sys.stderr)
+                results[name][str(size)] = SCENARIOS[name](size, args, workdir)
+
+    print_results(results, baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Saved results to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,20 @@ import os
 from datetime import datetime
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.sheets_connector import get_connector
+from utils.sheets_connector import CandidateWriteError, get_connector, warm_connector
+from utils.snapshot import load_candidates_fast
+from utils.metrics import page_action, set_page
+from utils.tenants import use_tenant
+from utils.candidate_diff import diff_candidates
+from utils.candidate_store import get_candidate_store
+from utils.bulk_import import import_candidates
+from utils.dedup import DEDUP_COLUMNS, get_duplicate_scan, merge_duplicates
+from utils.search_index import get_search_index, SEARCH_FIELDS
+from utils.analytics import get_funnel_analytics
+from utils.archive import (
+    ACTIVITY_COLUMNS, ARCHIVE_AFTER_DAYS, ARCHIVE_SHEET, ARCHIVE_STATUSES,
+    archive_closed_candidates, get_candidate_archive, read_all_columns, select_closed
+)
 
 st.set_page_config(
     page_title="Pipeline Dashboard",
@@ -12,20 +25,53 @@ st.set_page_config(
     layout="wide"
 )
 
+# Which client company this session works for (?tenant=acme, remembered for the session)
+try:
+    tenant = use_tenant(st.query_params.get("tenant") or st.session_state.get("tenant"))
+except ValueError as e:
+    st.error(str(e))
+    st.stop()
+st.session_state["tenant"] = tenant.tenant_id
+
+# Connect to Sheets in the background while the page draws
+warm_connector()
+set_page("Pipeline")
+
 st.title("📊 Pipeline Dashboard")
 st.markdown("Manage your recruitment pipeline")
 
-@st.cache_data(ttl=60)
-def load_candidates():
-    connector = get_connector()
-    return connector.get_all_candidates()
+store = get_candidate_store()
+
+search_index = get_search_index()
+archive = get_candidate_archive()
+
+def sync_store(force=False):
+    # Saved snapshot first (instant after a restart); Refresh goes straight to Sheets
+    synced = store.refresh(
+        lambda: get_connector().get_all_candidates() if force else load_candidates_fast(),
+        max_age_seconds=60,
+        force=force
+    )
+    # The archive tab is shared with other processes - re-read every ARCHIVE_SYNC_SECONDS
+    try:
+        archive_changed = archive.refresh(get_connector, force=force)
+    except Exception as e:
+        archive_changed = False
+        st.warning(f"⚠️ Could not read the archive tab, showing the last copy: {e}")
+    # Only changed candidates are re-indexed - archived ones stay searchable
+    if synced or archive_changed or len(search_index) == 0:
+        search_index.update(read_all_columns(store, archive, SEARCH_FIELDS))
+    # Keeps the Analytics page's counts current (no-op if nothing was synced)
+    get_funnel_analytics().refresh_from(store)
 
-df = load_candidates()
+sync_store()
+
+search_query = st.text_input("🔎 Search candidates", placeholder="Name, email, role or notes - e.g. 'arjun backend'")
 
 st.sidebar.header("🔍 Filters")
 
-all_statuses = df['Status'].unique().tolist()
-all_roles = df['Role'].unique().tolist()
+all_statuses = store.distinct_values('Status')
+all_roles = store.distinct_values('Role')
 
 selected_status = st.sidebar.selectbox(
     "Filter by Status",
@@ -37,32 +83,66 @@ selected_role = st.sidebar.selectbox(
     options=["All"] + all_roles
 )
 
-filtered_df = df.copy()
-if selected_status != "All":
-    filtered_df = filtered_df[filtered_df['Status'] == selected_status]
-if selected_role != "All":
-    filtered_df = filtered_df[filtered_df['Role'] == selected_role]
+st.sidebar.markdown("---")
+st.sidebar.header("↕️ Sort & Pages")
+
+sort_by = st.sidebar.selectbox(
+    "Sort by",
+    options=["Sheet order"] + [c for c in store.columns() if c != "_row"]
+)
+ascending = st.sidebar.radio("Order", ["Ascending", "Descending"], horizontal=True) == "Ascending"
+page_size = st.sidebar.selectbox("Rows per page", options=[25, 50, 100, 250], index=1)
+
+filters = {"Status": selected_status, "Role": selected_role}
+search_results = search_index.search(search_query, limit=500) if search_query.strip() else None
+
+total_pages = max((store.count(filters, emails=search_results) + page_size - 1) // page_size, 1)
+
+page_number = st.sidebar.number_input("Page", min_value=1, max_value=total_pages, value=1, step=1)
+
+if search_results is not None and sort_by == "Sheet order":
+    # Keep the best search matches first
+    filtered_df, matching = store.query(filters, page_size=len(search_results) or 1, emails=search_results)
+    rank = {email: i for i, email in enumerate(search_results)}
+    filtered_df = filtered_df.iloc[
+        filtered_df['Email'].str.lower().map(rank).argsort()
+    ]
+    start = (int(page_number) - 1) * page_size
+    filtered_df = filtered_df.iloc[start:start + page_size]
+else:
+    filtered_df, matching = store.query(
+        filters,
+        sort_by=None if sort_by == "Sheet order" else sort_by,
+        ascending=ascending,
+        page=int(page_number),
+        page_size=page_size,
+        emails=search_results
+    )
+
+status_counts = store.count_by('Status')
 
 st.markdown("---")
 col1, col2, col3, col4, col5 = st.columns(5)
 
 with col1:
-    st.metric("📋 Total", len(df))
+    st.metric("📋 Total", store.total(), help=f"Plus {archive.total()} archived")
 with col2:
-    st.metric("🔍 Screening", len(df[df['Status'] == 'Screening']))
+    st.metric("🔍 Screening", status_counts.get('Screening', 0))
 with col3:
-    st.metric("📞 L1 Scheduled", len(df[df['Status'] == 'L1_Scheduled']))
+    st.metric("📞 L1 Scheduled", status_counts.get('L1_Scheduled', 0))
 with col4:
-    st.metric("✅ Offer Accepted", len(df[df['Status'] == 'Offer_Accepted']))
+    st.metric("✅ Offer Accepted", status_counts.get('Offer_Accepted', 0))
 with col5:
-    st.metric("👻 Ghosted", len(df[df['Status'] == 'Ghosted']))
+    st.metric("👻 Ghosted", status_counts.get('Ghosted', 0))
 
 st.markdown("---")
-st.subheader(f"👥 Candidates ({len(filtered_df)})")
+st.subheader(f"👥 Candidates ({matching})")
+st.caption(f"Page {int(page_number)} of {total_pages}")
 
 edited_df = st.data_editor(
     filtered_df,
     num_rows="fixed",
+    hide_index=True,
     column_config={
         "Status": st.column_config.SelectboxColumn(
             "Status",
@@ -83,36 +163,151 @@ edited_df = st.data_editor(
     }
 )
 
+if search_results:
+    archived_matches = archive.get(search_results)
+    if len(archived_matches) > 0:
+        # Skip anyone who is also in the working sheet (shown above)
+        in_sheet, _ = store.query(page_size=len(archived_matches), emails=archived_matches['Email'].tolist())
+        archived_matches = archived_matches[~archived_matches['Email'].isin(in_sheet['Email'])]
+    if len(archived_matches) > 0:
+        st.subheader(f"🗄️ Archived Matches ({len(archived_matches)})")
+        st.caption("Closed candidates moved out of the sheet - read only")
+        st.dataframe(archived_matches, use_container_width=True, hide_index=True)
+
 st.markdown("---")
 
-if not df.equals(edited_df):
-    st.warning("⚠️ You have unsaved changes!")
+changes = diff_candidates(filtered_df, edited_df)
+
+if changes:
+    changed_cells = sum(len(columns) for columns in changes.values())
+    st.warning(f"⚠️ You have unsaved changes! ({changed_cells} cell(s) across {len(changes)} candidate(s))")
     
     if st.button("💾 Save Changes to Google Sheets"):
+        set_page("Pipeline", "Save Changes")
         connector = get_connector()
-        changes_made = 0
-        
-        for index, row in edited_df.iterrows():
-            original_row = df.loc[index]
-            
-            if row['Status'] != original_row['Status']:
-                connector.update_candidate_status(
-                    email=row['Email'],
-                    new_status=row['Status']
-                )
-                changes_made += 1
+        try:
+            saved = connector.write_candidates(changes)
+            error = None
+        except CandidateWriteError as e:
+            saved = e.written
+            error = e
         
-        if changes_made > 0:
-            st.success(f"✅ Saved {changes_made} change(s) to Google Sheets!")
+        if saved:
+            # Only what actually reached the sheet goes into the local copy
+            store.apply_updates({email: changes[email] for email in saved})
             st.cache_data.clear()
+        
+        if error is None and saved:
+            st.success(f"✅ Saved changes for {len(saved)} candidate(s) to Google Sheets!")
             st.rerun()
+        elif error is None:
+            st.error("❌ None of these candidates are in the sheet any more. Please refresh and try again.")
+        elif saved:
+            st.error(f"❌ Saved {len(saved)} of {len(changes)} candidate(s), the rest failed: {error}. Please refresh and try again.")
         else:
-            st.info("No status changes detected.")
+            st.error(f"❌ Could not save changes: {error}. Please refresh and try again.")
+
+st.markdown("---")
+
+with st.expander("📥 Bulk Import Candidates (CSV / Excel)"):
+    st.caption("Needs at least **Name** and **Email** columns. Rows with an email already in the sheet are skipped.")
+    uploaded_file = st.file_uploader("Choose a file", type=["csv", "xlsx"])
+    
+    if uploaded_file is not None and st.button("📥 Import"):
+        with st.spinner(f"Importing {uploaded_file.name}..."), page_action("Pipeline", "Bulk Import"):
+            try:
+                report = import_candidates(uploaded_file, connector=get_connector())
+            except Exception as e:
+                report = None
+                st.error(f"❌ Import failed: {e}")
+        
+        if report is not None:
+            st.success(
+                f"✅ Imported {report['imported']} of {report['total_rows']} rows "
+                f"in {report['seconds']}s ({report['rows_per_second']} rows/s, {report['api_calls']} API calls)"
+            )
+            if report['rejected']:
+                st.warning(f"⚠️ {len(report['rejected'])} row(s) rejected")
+                st.dataframe(report['rejected'], use_container_width=True)
+            if report['duplicates']:
+                st.warning(f"👥 {len(report['duplicates'])} imported row(s) look like candidates already in the sheet - see Possible Duplicates below")
+                st.dataframe(report['duplicates'], use_container_width=True)
+            if report['imported'] > 0:
+                st.cache_data.clear()
+                sync_store(force=True)
+
+# Checked on a background thread whenever the store syncs - the page shows the last finished check
+duplicate_scan = get_duplicate_scan()
+duplicate_scan.refresh(lambda: store.read_columns(DEDUP_COLUMNS), store.synced_at())
+duplicates = duplicate_scan.result
+
+with st.expander(f"👥 Possible Duplicates ({'checking...' if duplicates is None else len(duplicates)})"):
+    st.caption(
+        "Candidates who share a phone or an email name with someone earlier in the sheet, and have a similar name. "
+        "Merging keeps the open application that got furthest (else the most recent), fills its blank contact "
+        "columns, notes the merge and deletes the other row. Two applications both past screening are not merged."
+    )
+    if duplicates is None:
+        st.info("⏳ Checking for duplicates - refresh in a moment")
+    elif len(duplicates) == 0:
+        st.info("✅ No duplicates found")
+    else:
+        selected_duplicates = st.data_editor(
+            duplicates.assign(Merge=False),
+            disabled=["Email", "Name", "Duplicate_Of", "Score", "Reason"],
+            use_container_width=True,
+            hide_index=True,
+            key="duplicates_editor"
+        )
+        to_merge = selected_duplicates[selected_duplicates['Merge']]
+        
+        if len(to_merge) > 0 and st.button(f"🔗 Merge {len(to_merge)} Duplicate(s)"):
+            with st.spinner(f"Merging {len(to_merge)} duplicate(s)..."), page_action("Pipeline", "Merge Duplicates"):
+                try:
+                    connector = get_connector()
+                    report = merge_duplicates(to_merge, connector.get_all_candidates(), connector=connector)
+                except Exception as e:
+                    report = None
+                    st.error(f"❌ Merge failed: {e}")
+            
+            if report is not None:
+                st.success(f"✅ Merged {report['merged']} duplicate(s), removed {report['deleted']} row(s) from the sheet")
+                if report['skipped']:
+                    st.warning(f"⚠️ {report['skipped']} pair(s) skipped - same email on both rows, fix those in the sheet")
+                if report['conflicts']:
+                    st.warning(f"⚠️ {len(report['conflicts'])} duplicate(s) not merged - both applications are in progress, resolve them in the sheet")
+                    st.dataframe(report['conflicts'], use_container_width=True)
+                st.cache_data.clear()
+                sync_store(force=True)
+
+with st.expander("🗄️ Archive Closed Candidates"):
+    st.caption(
+        f"Moves {', '.join(ARCHIVE_STATUSES)} candidates with no activity for {ARCHIVE_AFTER_DAYS}+ days "
+        f"out of the sheet into its '{ARCHIVE_SHEET}' tab ({archive.total()} archived so far). "
+        "They stay searchable and still count in Analytics."
+    )
+    ready = select_closed(store.read_columns(["Email", "Status"] + ACTIVITY_COLUMNS))
+    st.write(f"**{len(ready)}** candidate(s) ready to archive")
+    
+    if len(ready) > 0 and st.button("🗄️ Archive Now"):
+        with st.spinner(f"Archiving {len(ready)} candidate(s)..."), page_action("Pipeline", "Archive"):
+            try:
+                report = archive_closed_candidates(connector=get_connector())
+            except Exception as e:
+                report = None
+                st.error(f"❌ Archiving failed: {e}")
+        
+        if report is not None:
+            st.success(f"✅ Archived {report['archived']} candidate(s), removed {report['deleted']} row(s) from the sheet")
+            if report['skipped']:
+                st.warning(f"⚠️ {len(report['skipped'])} email(s) kept - they have another row that isn't ready to archive")
+            st.cache_data.clear()
+            sync_store(force=True)
 
 st.markdown("---")
 st.subheader("📨 Pending Offers")
 
-pending_offers = df[df['Status'] == 'Offer_Sent']
+pending_offers, _ = store.query({"Status": "Offer_Sent"}, page_size=500)
 
 if len(pending_offers) == 0:
     st.info("📭 No pending offers. When candidates pass L2, they'll appear here.")
@@ -128,26 +323,32 @@ else:
         
         with col2:
             if st.button("✅ Accepted", key=f"accept_{candidate['Email']}"):
+                set_page("Pipeline", "Offer Accepted")
                 connector = get_connector()
                 connector.update_candidate_status(
                     email=candidate['Email'],
                     new_status="Offer_Accepted"
                 )
+                store.apply_updates({candidate['Email']: {"Status": "Offer_Accepted"}})
                 st.cache_data.clear()
                 st.rerun()
         
         with col3:
             if st.button("❌ Declined", key=f"decline_{candidate['Email']}"):
+                set_page("Pipeline", "Offer Declined")
                 connector = get_connector()
                 connector.update_candidate_status(
                     email=candidate['Email'],
                     new_status="Offer_Declined"
                 )
+                store.apply_updates({candidate['Email']: {"Status": "Offer_Declined"}})
                 st.cache_data.clear()
                 st.rerun()
         
         st.markdown("---")
 
 if st.button("🔄 Refresh Data"):
+    set_page("Pipeline", "Refresh")
     st.cache_data.clear()
+    sync_store(force=True)
     st.rerun()
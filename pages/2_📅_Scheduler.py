@@ -1,12 +1,16 @@
 import streamlit as st
 import sys
 import os
-import pandas as pd
 import time
 from datetime import datetime, timedelta
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.sheets_connector import get_connector
+from utils.sheets_connector import CandidateWriteError, get_connector, warm_connector
+from utils.snapshot import load_candidates_fast
+from utils.metrics import set_page
+from utils.tenants import use_tenant
+from utils.scheduler import TIME_SLOTS, plan_gap_fill, plan_interviews, schedule_grid
+from utils.calendar_invites import send_invites_in_background
 
 st.set_page_config(
     page_title="Interview Scheduler",
@@ -14,105 +18,67 @@ st.set_page_config(
     layout="wide"
 )
 
+# Which client company this session works for (?tenant=acme, remembered for the session)
+try:
+    tenant = use_tenant(st.query_params.get("tenant") or st.session_state.get("tenant"))
+except ValueError as e:
+    st.error(str(e))
+    st.stop()
+st.session_state["tenant"] = tenant.tenant_id
+
+# Connect to Sheets in the background while the page draws
+warm_connector()
+set_page("Scheduler")
+
 st.title("📅 Interview Scheduler")
 st.markdown("Schedule and manage L1 & L2 interviews")
 
-TIME_SLOTS = [
-    "9:00 AM", "10:00 AM", "11:00 AM", "12:00 PM",
-    "2:00 PM", "3:00 PM", "4:00 PM", "5:00 PM"
-]
-
 @st.cache_data(ttl=30)
-def load_candidates():
-    connector = get_connector()
-    return connector.get_all_candidates()
+def load_candidates(tenant_id: str):
+    # Last saved copy first (instant after a restart), refreshed from Sheets in the background.
+    # tenant_id only keys Streamlit's cache, so tenants never see each other's data
+    return load_candidates_fast()
 
-df = load_candidates()
+df = load_candidates(tenant.tenant_id)
 
 screening_candidates = df[df['Status'] == 'Screening']
 l1_scheduled = df[df['Status'] == 'L1_Scheduled']
 l1_done = df[df['Status'] == 'L1_Done']
 l2_scheduled = df[df['Status'] == 'L2_Scheduled']
 
+def write_schedule(connector, plan, all_data):
+    # Saves a scheduling plan; invites only go to bookings that are in the sheet.
+    # Returns how many were saved, None if the write failed (error already shown)
+    try:
+        written = connector.write_candidates(plan)
+    except CandidateWriteError as e:
+        st.sidebar.error(f"❌ Could not save the schedule: {e}")
+        written = None
+        saved = e.written
+    else:
+        saved = written
+    
+    if saved:
+        # Calendar invites go out together over pooled SMTP, without holding up the page
+        send_invites_in_background({email: plan[email] for email in saved}, all_data)
+    return None if written is None else len(written)
+
 def auto_schedule_candidates(candidates_df, interview_type="L1", start_date=None, start_time_slot=None):
     connector = get_connector()
-    scheduled_count = 0
+    all_data = connector.get_all_candidates()
     
-    date_col = f"{interview_type}_Date"
-    time_col = f"{interview_type}_Time"
-    
-    unscheduled = candidates_df[
-        (candidates_df[date_col].isna()) | (candidates_df[date_col] == '')
-    ]
+    plan = plan_interviews(
+        all_data,
+        candidates_df,
+        interview_type=interview_type,
+        start_date=start_date,
+        start_time_slot=start_time_slot
+    )
     
-    if len(unscheduled) == 0:
+    if len(plan) == 0:
         return 0
     
-    if start_date is None:
-        current_date = datetime.now().date()
-    else:
-        current_date = start_date
-    
-    connector_temp = get_connector()
-    all_data = connector_temp.get_all_candidates()
-    already_scheduled = all_data[
-        (all_data['Status'] == f'{interview_type}_Scheduled') &
-        (all_data[date_col] != '') &
-        (all_data[date_col].notna())
-    ]
-    
-    def get_taken_slots(date_str):
-        date_candidates = already_scheduled[already_scheduled[date_col] == date_str]
-        return date_candidates[time_col].tolist()
-    
-    if start_time_slot:
-        start_index = TIME_SLOTS.index(start_time_slot)
-        filtered_slots = TIME_SLOTS[start_index:]
-    else:
-        filtered_slots = TIME_SLOTS
-
-    for _, candidate in unscheduled.iterrows():
-        date_str = current_date.strftime("%Y-%m-%d")
-        
-        taken_slots = get_taken_slots(date_str)
-        available_slot = None
-        
-        for slot in filtered_slots:
-            if slot not in taken_slots:
-                available_slot = slot
-                break
-        
-        while available_slot is None:
-            current_date += timedelta(days=1)
-            while current_date.weekday() >= 5:
-                current_date += timedelta(days=1)
-            
-            date_str = current_date.strftime("%Y-%m-%d")
-            taken_slots = get_taken_slots(date_str)
-            
-            for slot in filtered_slots:
-                if slot not in taken_slots:
-                    available_slot = slot
-                    break
-        
-        connector.update_candidate_status(
-            email=candidate['Email'],
-            new_status=f"{interview_type}_Scheduled",
-            additional_updates={
-                date_col: date_str,
-                time_col: available_slot
-            }
-        )
-        
-        already_scheduled = pd.concat([
-            already_scheduled,
-            pd.DataFrame([{date_col: date_str, time_col: available_slot}])
-        ], ignore_index=True)
-        
-        time.sleep(1)
-        scheduled_count += 1
-    
-    return scheduled_count
+    return write_schedule(connector, plan, all_data)
 
 st.sidebar.header("⚙️ Scheduler Controls")
 
@@ -137,13 +103,16 @@ l1_start_time = st.sidebar.selectbox(
 )
 
 if st.sidebar.button("📋 Schedule L1 Interviews"):
+    set_page("Scheduler", "Schedule L1")
     st.cache_data.clear()
     fresh_connector = get_connector()
     fresh_df = fresh_connector.get_all_candidates()
     fresh_screening = fresh_df[fresh_df['Status'] == 'Screening']
     
     count = auto_schedule_candidates(fresh_screening, "L1", start_date=l1_start_date, start_time_slot=l1_start_time)
-    if count > 0:
+    if count is None:
+        pass
+    elif count > 0:
         st.sidebar.success(f"✅ Scheduled {count} L1 interviews!")
         st.rerun()
     else:
@@ -164,22 +133,61 @@ l2_start_time = st.sidebar.selectbox(
 )
 
 if st.sidebar.button("📋 Schedule L2 Interviews"):
+    set_page("Scheduler", "Schedule L2")
     st.cache_data.clear()
     fresh_connector = get_connector()
     fresh_df = fresh_connector.get_all_candidates()
     fresh_l1_done = fresh_df[fresh_df['Status'] == 'L1_Done']
     
     count = auto_schedule_candidates(fresh_l1_done, "L2", start_date=l2_start_date, start_time_slot=l2_start_time)
-    if count > 0:
+    if count is None:
+        pass
+    elif count > 0:
         st.sidebar.success(f"✅ Scheduled {count} L2 interviews!")
         st.rerun()
     else:
         st.sidebar.info("No candidates to schedule")
 
+st.sidebar.markdown("---")
+st.sidebar.subheader("🧩 Fill Freed Slots")
+
+gap_type = st.sidebar.radio("Interview Round", ["L1", "L2"], horizontal=True, key="gap_type")
+shift_bookings = st.sidebar.checkbox(
+    "Move later interviews earlier",
+    help="Interviews booked after a freed slot move up into it (never ones in the next day)",
+    key="gap_shift"
+)
+
+if st.sidebar.button("🧩 Fill Gaps"):
+    set_page("Scheduler", "Fill Gaps")
+    st.cache_data.clear()
+    connector = get_connector()
+    fresh_df = connector.get_all_candidates()
+    
+    # Same start as the round's Schedule button
+    plan = plan_gap_fill(
+        fresh_df,
+        interview_type=gap_type,
+        start_date=l1_start_date if gap_type == "L1" else l2_start_date,
+        start_time_slot=l1_start_time if gap_type == "L1" else l2_start_time,
+        shift_bookings=shift_bookings
+    )
+    
+    if len(plan) == 0:
+        st.sidebar.info("No freed slots to fill")
+    else:
+        # The whole plan is one batch write
+        count = write_schedule(connector, plan, fresh_df)
+        if count is not None:
+            filled = sum(1 for columns in plan.values() if "Status" in columns)
+            st.sidebar.success(f"✅ Filled {filled} slots, moved {len(plan) - filled} interviews earlier")
+            st.rerun()
+
 st.sidebar.markdown("---")
 st.sidebar.subheader("🔄 Reset (Demo Only)")
 
 if st.sidebar.button("⚠️ Reset All to Screening"):
+    set_page("Scheduler", "Reset")
     st.cache_data.clear()
     connector = get_connector()
     fresh_df = connector.get_all_candidates()
@@ -192,32 +200,23 @@ if st.sidebar.button("⚠️ Reset All to Screening"):
     if len(all_to_reset) == 0:
         st.sidebar.info("Nothing to reset!")
     else:
-        progress_bar = st.sidebar.progress(0)
-        status_text = st.sidebar.empty()
+        reset_values = {
+            "Status": "Screening",
+            "L1_Date": "",
+            "L1_Time": "",
+            "L1_Result": "",
+            "L2_Date": "",
+            "L2_Time": "",
+            "L2_Result": "",
+            "Ghost_Risk": "10"
+        }
         
-        total = len(all_to_reset)
+        # One batch write - the shared rate limiter keeps it within the Sheets quota
+        with st.sidebar, st.spinner(f"Resetting {len(all_to_reset)} candidates..."):
+            total = connector.batch_update_candidates({
+                email: dict(reset_values) for email in all_to_reset['Email']
+            })
         
-        for i, (_, candidate) in enumerate(all_to_reset.iterrows()):
-            status_text.text(f"Resetting {candidate['Name']}...")
-            
-            connector.update_candidate_status(
-                email=candidate['Email'],
-                new_status="Screening",
-                additional_updates={
-                    "L1_Date": "",
-                    "L1_Time": "",
-                    "L1_Result": "",
-                    "L2_Date": "",
-                    "L2_Time": "",
-                    "L2_Result": "",
-                    "Ghost_Risk": "10"
-                }
-            )
-            
-            progress_bar.progress((i + 1) / total)
-            time.sleep(1)
-        
-        status_text.text("Done!")
         st.sidebar.success(f"✅ Reset {total} candidates!")
         st.cache_data.clear()
         time.sleep(1)
@@ -225,7 +224,7 @@ if st.sidebar.button("⚠️ Reset All to Screening"):
 
 st.markdown("---")
 
-tab1, tab2 = st.tabs(["📞 L1 Interviews", "🎯 L2 Interviews"])
+tab1, tab2, tab3 = st.tabs(["📞 L1 Interviews", "🎯 L2 Interviews", "🗓️ Calendar"])
 
 with tab1:
     st.subheader(f"L1 Interviews - {selected_date.strftime('%A, %B %d, %Y')}")
@@ -269,6 +268,7 @@ with tab1:
                     
                     with col3:
                         if st.button("✅ Pass", key=f"pass_l1_{candidate['Email']}"):
+                            set_page("Scheduler", "L1 Pass")
                             connector = get_connector()
                             connector.update_candidate_status(
                                 email=candidate['Email'],
@@ -280,6 +280,7 @@ with tab1:
                     
                     with col4:
                         if st.button("❌ Fail", key=f"fail_l1_{candidate['Email']}"):
+                            set_page("Scheduler", "L1 Fail")
                             connector = get_connector()
                             connector.update_candidate_status(
                                 email=candidate['Email'],
@@ -349,6 +350,7 @@ with tab2:
                     
                     with col3:
                         if st.button("✅ Pass", key=f"pass_l2_{candidate['Email']}"):
+                            set_page("Scheduler", "L2 Pass")
                             connector = get_connector()
                             connector.update_candidate_status(
                                 email=candidate['Email'],
@@ -360,6 +362,7 @@ with tab2:
                     
                     with col4:
                         if st.button("❌ Fail", key=f"fail_l2_{candidate['Email']}"):
+                            set_page("Scheduler", "L2 Fail")
                             connector = get_connector()
                             connector.update_candidate_status(
                                 email=candidate['Email'],
@@ -371,6 +374,43 @@ with tab2:
                     
                     st.markdown("---")
 
+with tab3:
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        grid_span = st.radio("Show", ["Week", "Month"], horizontal=True, key="grid_span")
+    with col2:
+        by_interviewer = st.checkbox("Lane per interviewer", key="grid_lanes")
+    
+    if grid_span == "Week":
+        grid_start = selected_date - timedelta(days=selected_date.weekday())
+        grid_end = grid_start + timedelta(days=6)
+    else:
+        grid_start = selected_date.replace(day=1)
+        grid_end = (grid_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    
+    st.subheader(f"L1 & L2 Interviews - {grid_start.strftime('%b %d')} to {grid_end.strftime('%b %d, %Y')}")
+    
+    # One pivot of every booking in the range, drawn as one table
+    grid = schedule_grid(
+        df,
+        grid_start,
+        grid_end,
+        by_interviewer=by_interviewer,
+        default_interviewer=tenant.hr_email or "HR"
+    )
+    grid.columns = [
+        " · ".join([datetime.strptime(column[0], "%Y-%m-%d").strftime("%a %d %b")] + list(column[1:]))
+        if isinstance(column, tuple) else datetime.strptime(column, "%Y-%m-%d").strftime("%a %d %b")
+        for column in grid.columns
+    ]
+    
+    booked_cells = int((grid != "").to_numpy().sum())
+    if booked_cells == 0:
+        st.info("📭 No interviews scheduled in this range")
+    else:
+        st.caption("📞 L1 · 🎯 L2 · ⚠️ double booking (same round and interviewer in one slot)")
+        st.dataframe(grid, use_container_width=True, height=35 * (len(TIME_SLOTS) + 1) + 3)
+
 st.markdown("---")
 st.subheader("🎯 Passed L1 - Ready for L2 Scheduling")
 
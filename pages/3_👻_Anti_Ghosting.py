@@ -5,25 +5,48 @@ from datetime import datetime, timedelta
 from streamlit_autorefresh import st_autorefresh
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.sheets_connector import get_connector
+from utils.sheets_connector import get_connector, warm_connector
+from utils.snapshot import load_candidates_fast
+from utils.metrics import page_action, set_page
+from utils.tenants import use_tenant
 from utils.email_sender import send_email
 from utils.email_checker import check_for_reply
+from utils.reply_listener import get_reply_listener
 from utils.ai_message_generator import generate_engagement_message
+from utils.hr_alerts import get_alert_manager
+from utils.message_templates import render_message, render_bulk
+from utils.message_batch import (
+    TOUCHPOINTS, get_upcoming_touchpoint, get_pregenerated,
+    start_pregeneration, get_batch_status
+)
 
 st.set_page_config(
     page_title="Anti-Ghosting Bot",
     page_icon="👻",
     layout="wide"
 )
+
+# Which client company this session works for (?tenant=acme, remembered for the session)
+try:
+    tenant = use_tenant(st.query_params.get("tenant") or st.session_state.get("tenant"))
+except ValueError as e:
+    st.error(str(e))
+    st.stop()
+st.session_state["tenant"] = tenant.tenant_id
+
+# Connect to Sheets in the background while the page draws
+warm_connector()
+set_page("Anti-Ghosting")
 st.title("👻 Anti-Ghosting Bot")
 st.markdown("Keep candidates engaged during their notice period")
 
 @st.cache_data(ttl=60)
-def load_candidates():
-    connector = get_connector()
-    return connector.get_all_candidates()
+def load_candidates(tenant_id: str):
+    # Last saved copy first (instant after a restart), refreshed from Sheets in the background.
+    # tenant_id only keys Streamlit's cache, so tenants never see each other's data
+    return load_candidates_fast()
 
-df = load_candidates()
+df = load_candidates(tenant.tenant_id)
 
 notice_period_candidates = df[df['Status'] == 'Offer_Accepted']
 
@@ -59,6 +82,26 @@ if len(notice_period_candidates) > 0:
         format="Day %d"
     )
     
+    st.sidebar.markdown("---")
+    st.sidebar.subheader("⚡ AI Messages")
+    
+    batch_status = get_batch_status()
+    if batch_status['running']:
+        st.sidebar.info("⏳ Pre-generating messages in the background...")
+    elif st.sidebar.button("⚡ Pre-generate for All Candidates"):
+        start_pregeneration(
+            notice_period_candidates[['Name', 'Email', 'Role']].to_dict('records'),
+            days_passed=days_passed,
+            company_name=tenant.company_name
+        )
+        st.sidebar.info("⏳ Started! Messages will appear as they are ready.")
+    elif batch_status['last_result']:
+        last = batch_status['last_result']
+        st.sidebar.caption(
+            f"Last run: {last['generated']} generated, {last['skipped']} cached, "
+            f"{len(last['failed'])} failed in {last['seconds']}s"
+        )
+    
     st.sidebar.markdown("---")
     st.sidebar.subheader("⏱️ Demo Settings")
     demo_mode = st.sidebar.checkbox("🧪 Demo Mode (1 min timer)", value=True)
@@ -75,12 +118,9 @@ if len(notice_period_candidates) > 0:
             st.session_state.auto_emails_sent = False
         if 'emailed_candidates' in st.session_state:
             st.session_state.emailed_candidates = set()
-        if 'alerted_candidates' in st.session_state:
-            st.session_state.alerted_candidates = set()
-    
-    HR_EMAIL = "sriramnalla30@gmail.com"
     
     if auto_check:
+        set_page("Anti-Ghosting", "Auto Check")
         count = st_autorefresh(interval=30000, limit=100, key="auto_checker")
         st.sidebar.success(f"🔄 Auto-checking... (refresh #{count})")
         
@@ -90,6 +130,16 @@ if len(notice_period_candidates) > 0:
         fresh_df = connector.get_all_candidates()
         fresh_notice = fresh_df[fresh_df['Status'] == 'Offer_Accepted']
         
+        # Replies are pushed over IMAP IDLE; check_for_reply answers from it once it's connected
+        listener = get_reply_listener()
+        listener.track(fresh_notice['Email'].tolist())
+        listener.start()
+        listener_status = listener.status()
+        if listener_status['connected']:
+            st.sidebar.caption(f"📡 Listening for replies from {listener_status['tracked']} candidate(s)")
+        else:
+            st.sidebar.caption("📡 Reply listener connecting - checking the inbox directly meanwhile")
+        
         if 'emailed_candidates' not in st.session_state:
             st.session_state.emailed_candidates = set()
         
@@ -99,17 +149,20 @@ if len(notice_period_candidates) > 0:
         if not st.session_state.auto_emails_sent and len(fresh_notice) > 0:
             st.markdown("### 📨 Sending Initial Engagement Emails...")
             email_progress = st.progress(0)
+            welcome_messages = {
+                message['email']: message
+                for message in render_bulk(fresh_notice.to_dict('records'), day=1, company_name=tenant.company_name)
+            }
             
             for i, (_, cand) in enumerate(fresh_notice.iterrows()):
                 if cand['Name'] not in st.session_state.emailed_candidates:
                     try:
-                        email_subject = "Welcome aboard! 🎉"
-                        email_body = f"Hi {cand['Name'].split()[0]},\n\nWe are thrilled that you accepted our offer! The whole team is excited to have you join as a {cand['Role']}.\n\nLet us know if you have any questions!"
+                        welcome = welcome_messages[cand['Email']]
                         
                         send_email(
                             to_email=cand['Email'],
-                            subject=email_subject,
-                            body=email_body
+                            subject=welcome['subject'],
+                            body=welcome['body']
                         )
                         st.session_state.emailed_candidates.add(cand['Name'])
                         st.success(f"✅ Email sent to {cand['Name']}")
@@ -126,8 +179,11 @@ if len(notice_period_candidates) > 0:
         responding_candidates = []
         waiting_candidates = []
         updated_risks = {}
+        candidate_emails = {}
+        alerts = get_alert_manager()
         
         for _, cand in fresh_notice.iterrows():
+            candidate_emails[cand['Name']] = cand['Email']
             if cand['Name'] not in st.session_state.emailed_candidates:
                 waiting_candidates.append(cand['Name'])
                 try:
@@ -142,6 +198,7 @@ if len(notice_period_candidates) > 0:
             if result['found']:
                 responding_candidates.append(cand['Name'])
                 updated_risks[cand['Name']] = 10
+                alerts.resolve(cand['Email'])
                 connector.update_candidate_status(
                     email=cand['Email'],
                     new_status="Offer_Accepted",
@@ -176,43 +233,29 @@ if len(notice_period_candidates) > 0:
             if risk > 40:
                 high_risk_candidates.append(f"{name} ({risk}%)")
         
-        if 'alerted_candidates' not in st.session_state:
-            st.session_state.alerted_candidates = set()
-        
         if high_risk_candidates:
             st.error(f"🚨 **HIGH RISK (>40%):** {', '.join(high_risk_candidates)}")
             
-            new_alerts = []
-            for name, risk in updated_risks.items():
-                if risk > 40 and name not in st.session_state.alerted_candidates:
-                    new_alerts.append(f"{name} ({risk}%)")
-                    st.session_state.alerted_candidates.add(name)
-            
-            if new_alerts and not pause_alerts:
-                alert_subject = "🚨 Ghost Alert: Candidates Need Immediate Attention!"
-                alert_body = f"""
-HR Alert - Anti-Ghosting Bot
-
-⚠️ The following candidates have Ghost Risk ABOVE 40%:
-
-{chr(10).join(['🔴 ' + name for name in new_alerts])}
-
-Please follow up with them IMMEDIATELY to prevent ghosting.
-
----
-This is an automated alert from the Recruiters Assistant.
-                """
+            if not pause_alerts:
+                alert_result = alerts.record_risks([
+                    {"name": name, "email": candidate_emails[name], "risk": risk}
+                    for name, risk in updated_risks.items()
+                ])
                 
-                try:
-                    send_email(to_email=HR_EMAIL, subject=alert_subject, body=alert_body)
-                    st.info(f"📧 Alert sent to HR ({HR_EMAIL}) for: {', '.join(new_alerts)}")
-                except Exception as e:
-                    st.error(f"Failed to send HR alert: {e}")
-            elif new_alerts and pause_alerts:
-                st.warning("⏸️ HR Alert PAUSED (not sent)")
+                if alert_result['escalated']:
+                    st.info(f"📧 Urgent alert going to HR ({tenant.hr_email}) for: {', '.join(alert_result['escalated'])}")
+                if alert_result['queued']:
+                    st.info(f"📧 Added to next HR digest: {', '.join(alert_result['queued'])}")
+                if not alert_result['escalated'] and not alert_result['queued']:
+                    st.caption("ℹ️ HR already alerted for these candidates")
+                
+                next_digest = alerts.next_digest_at()
+                if next_digest:
+                    st.caption(f"🕒 Next HR digest at {next_digest.strftime('%H:%M')} ({len(alerts.pending())} pending)")
             else:
-                st.caption("ℹ️ HR already alerted for these candidates")
+                st.warning("⏸️ HR Alert PAUSED (not sent)")
     
+    set_page("Anti-Ghosting")
     fresh_connector = get_connector()
     fresh_data = fresh_connector.get_all_candidates()
     fresh_candidates = fresh_data[fresh_data['Status'] == 'Offer_Accepted']
@@ -255,14 +298,7 @@ This is an automated alert from the Recruiters Assistant.
         
     st.markdown("### 📅 Engagement Timeline")
     
-    touchpoints = {
-        1:  "🎉 Offer Accepted",
-        7:  "📋 Onboarding Docs",
-        30: "💬 Monthly Check-in",
-        60: "🏢 Team Intro",
-        85: "🚀 Pre-joining Prep",
-        90: "🏁 Day 1 Joined"
-    }
+    touchpoints = TOUCHPOINTS
     
     current_stage = None
     next_stage = None
@@ -289,40 +325,38 @@ This is an automated alert from the Recruiters Assistant.
     st.markdown("---")
     st.subheader("💬 Active Engagement")
     
-    message_subject = ""
-    message_body = ""
-    
-    if days_passed <= 2:
-        message_subject = "Welcome aboard! 🎉"
-        message_body = f"Hi {candidate['Name'].split()[0]},\n\nWe are thrilled that you accepted our offer! The whole team is excited to have you join as a {candidate['Role']}.\n\nLet us know if you have any questions!"
-    elif days_passed <= 10:
-        message_subject = "Getting started: Documents 📋"
-        message_body = f"Hi {candidate['Name'].split()[0]},\n\nTo make your Day 1 smooth, could you please review the attached onboarding documents?\n\nThis will save us a lot of time on your joining date!"
-    elif days_passed <= 35:
-        message_subject = "Checking in 👋"
-        message_body = f"Hi {candidate['Name'].split()[0]},\n\nHope your notice period is going smoothly. How are things at your current workplace? Let us know if you need any support from our side."
-    elif days_passed <= 65:
-        message_subject = "Meet the team! 🏢"
-        message_body = f"Hi {candidate['Name'].split()[0]},\n\nYour future team is having a virtual coffee chat next Friday. Would you like to join and meet everyone before your official start date?"
-    else:
-        message_subject = "Ready for launch? 🚀"
-        message_body = f"Hi {candidate['Name'].split()[0]},\n\nJust a few days left! We have your laptop ready and your desk set up. Can't wait to see you on Monday!"
+    template_message = render_message(candidate['Name'], candidate['Role'], days_passed, company_name=tenant.company_name)
+    message_subject = template_message['subject']
+    message_body = template_message['body']
+
+    pregenerated = get_pregenerated(candidate['Email'], get_upcoming_touchpoint(days_passed))
+    if pregenerated is not None:
+        message_subject = pregenerated['subject']
+        message_body = pregenerated['body']
 
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        st.info(f"**Template Subject:** {message_subject}")
+        if pregenerated is not None:
+            st.info(f"**⚡ Pre-generated AI Subject:** {message_subject}")
+        else:
+            st.info(f"**Template Subject:** {message_subject}")
         
         if st.button("🤖 Generate AI Message"):
-            with st.spinner("AI is writing your message..."):
-                ai_message = generate_engagement_message(
-                    candidate_name=candidate['Name'],
-                    candidate_role=candidate['Role'],
-                    day_number=days_passed,
-                    company_name="TechCorp"
-                )
-                st.session_state['ai_subject'] = ai_message['subject']
-                st.session_state['ai_body'] = ai_message['body']
+            with st.spinner("AI is writing your message..."), page_action("Anti-Ghosting", "Generate AI Message"):
+                try:
+                    ai_message = generate_engagement_message(
+                        candidate_name=candidate['Name'],
+                        candidate_role=candidate['Role'],
+                        day_number=days_passed,
+                        company_name=tenant.company_name,
+                        # Raise instead of quietly returning the template, so a failure shows below
+                        fallback_to_template=False
+                    )
+                    st.session_state['ai_subject'] = ai_message['subject']
+                    st.session_state['ai_body'] = ai_message['body']
+                except Exception as e:
+                    st.error(f"❌ AI message failed, using the template instead: {e}")
         
         if 'ai_subject' in st.session_state:
             final_subject = st.text_input("Subject", value=st.session_state['ai_subject'])
@@ -333,11 +367,12 @@ This is an automated alert from the Recruiters Assistant.
         
         if st.button("📨 Send Email"):
             try:
-                send_email(
-                    to_email=candidate['Email'],
-                    subject=final_subject,
-                    body=final_body
-                )
+                with page_action("Anti-Ghosting", "Send Email"):
+                    send_email(
+                        to_email=candidate['Email'],
+                        subject=final_subject,
+                        body=final_body
+                    )
                 if 'emailed_candidates' not in st.session_state:
                     st.session_state.emailed_candidates = set()
                 st.session_state.emailed_candidates.add(candidate['Name'])
@@ -349,7 +384,7 @@ This is an automated alert from the Recruiters Assistant.
         
         st.markdown("---")
         if st.button("🔍 Check for Reply"):
-            with st.spinner(f"Checking inbox (last {check_minutes} min)..."):
+            with st.spinner(f"Checking inbox (last {check_minutes} min)..."), page_action("Anti-Ghosting", "Check for Reply"):
                 result = check_for_reply(
                     from_email=candidate['Email'],
                     since_minutes=check_minutes
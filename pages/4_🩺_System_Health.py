@@ -0,0 +1,141 @@
+import streamlit as st
+import sys
+import os
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.metrics import get_metrics
+from utils.tenants import get_connector_pool, get_tenants, use_tenant
+
+st.set_page_config(
+    page_title="System Health",
+    page_icon="🩺",
+    layout="wide"
+)
+
+# Which client company this session works for (?tenant=acme, remembered for the session)
+try:
+    tenant = use_tenant(st.query_params.get("tenant") or st.session_state.get("tenant"))
+except ValueError as e:
+    st.error(str(e))
+    st.stop()
+st.session_state["tenant"] = tenant.tenant_id
+
+st.title("🩺 System Health")
+st.markdown("Calls to Google Sheets, Gmail and the LLM - and which page action made them")
+st.caption("Numbers are for this app process since it started. The HTTP API has its own at `GET /metrics`.")
+
+metrics = get_metrics()
+summary = metrics.summary()
+pool = get_connector_pool()
+limiter = pool.rate_limiter(tenant)
+
+total_calls = sum(row['calls'] for row in summary)
+total_errors = sum(row['errors'] for row in summary)
+sheets_last_minute = metrics.calls_last_minute("sheets")
+uptime_minutes = (datetime.now().timestamp() - metrics.started_at) / 60
+
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    st.metric("📡 External Calls", total_calls)
+with col2:
+    st.metric("❌ Errors", total_errors)
+with col3:
+    st.metric(
+        "📊 Sheets calls (last min)", sheets_last_minute,
+        help=f"Quota for {tenant.company_name}: {limiter.buckets['read'].per_minute if limiter.buckets['read'] else '∞'} reads + "
+             f"{limiter.buckets['write'].per_minute if limiter.buckets['write'] else '∞'} writes per minute"
+    )
+with col4:
+    st.metric("⏱️ Uptime", f"{uptime_minutes:.0f} min")
+
+limiter_stats = limiter.stats
+st.caption(
+    f"🚦 Sheets rate limiter: {limiter_stats['calls']} request(s) sent, "
+    f"{limiter_stats['coalesced']} answered from a shared read, {limiter_stats['retries']} retried after 429/5xx"
+)
+if len(get_tenants()) > 1:
+    st.caption(
+        f"🏢 {len(get_tenants())} tenants, {len(pool)}/{pool.max_size} connector(s) in the pool - "
+        f"{pool.stats['connects']} connect(s), {pool.stats['evictions']} dropped as least recently used"
+    )
+
+st.markdown("---")
+st.subheader("📈 By Operation")
+
+if not summary:
+    st.info("📭 No external calls yet. Use the other pages, then come back here.")
+else:
+    st.dataframe(
+        [
+            {
+                "Service": row['service'],
+                "Operation": row['operation'],
+                "Calls": row['calls'],
+                "Errors": row['errors'],
+                "Avg (ms)": row['avg_ms'],
+                "p50 (ms)": row['p50_ms'],
+                "p95 (ms)": row['p95_ms'],
+                "Sent (KB)": round(row['bytes_sent'] / 1024, 1),
+                "Received (KB)": round(row['bytes_received'] / 1024, 1),
+            }
+            for row in summary
+        ],
+        use_container_width=True,
+        hide_index=True
+    )
+
+    st.subheader("🖱️ By Page Action")
+    st.dataframe(
+        [
+            {
+                "Action": row['action'],
+                "Service": row['service'],
+                "Operation": row['operation'],
+                "Calls": row['calls'],
+                "Errors": row['errors'],
+            }
+            for row in metrics.by_action()
+        ],
+        use_container_width=True,
+        hide_index=True
+    )
+
+events = metrics.events()
+if events:
+    st.subheader("🧮 Events")
+    cols = st.columns(min(len(events), 4))
+    for i, (name, count) in enumerate(sorted(events.items())):
+        with cols[i % len(cols)]:
+            st.metric(name.replace("_", " ").title(), count)
+
+recent_errors = metrics.recent_errors()
+if recent_errors:
+    st.subheader("🚨 Recent Errors")
+    st.dataframe(
+        [
+            {
+                "Time": datetime.fromtimestamp(err['time']).strftime("%H:%M:%S"),
+                "Service": err['service'],
+                "Operation": err['operation'],
+                "Action": err['action'],
+                "Error": err['error'],
+            }
+            for err in recent_errors
+        ],
+        use_container_width=True,
+        hide_index=True
+    )
+
+with st.expander("📄 Prometheus format"):
+    st.code(metrics.render_prometheus(), language="text")
+
+st.markdown("---")
+col1, col2 = st.columns(2)
+with col1:
+    if st.button("🔄 Refresh"):
+        st.rerun()
+with col2:
+    if st.button("🗑️ Reset Counters"):
+        metrics.reset()
+        st.rerun()
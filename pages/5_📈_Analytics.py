@@ -0,0 +1,196 @@
+import streamlit as st
+import sys
+import os
+import time
+import pandas as pd
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.sheets_connector import get_connector, warm_connector
+from utils.snapshot import load_candidates_fast
+from utils.metrics import set_page
+from utils.tenants import use_tenant
+from utils.candidate_store import get_candidate_store
+from utils.analytics import get_funnel_analytics, DURATION_STEPS
+from utils.archive import get_candidate_archive
+from utils.hr_alerts import ALERT_THRESHOLD
+
+st.set_page_config(
+    page_title="Recruitment Analytics",
+    page_icon="📈",
+    layout="wide"
+)
+
+# Which client company this session works for (?tenant=acme, remembered for the session)
+try:
+    tenant = use_tenant(st.query_params.get("tenant") or st.session_state.get("tenant"))
+except ValueError as e:
+    st.error(str(e))
+    st.stop()
+st.session_state["tenant"] = tenant.tenant_id
+
+# Connect to Sheets in the background while the page draws
+warm_connector()
+set_page("Analytics")
+
+st.title("📈 Recruitment Analytics")
+st.markdown("Funnel conversion, time between stages, interview load and ghosting - across all history")
+st.caption("Includes archived candidates.")
+
+store = get_candidate_store()
+analytics = get_funnel_analytics()
+
+try:
+    store.refresh(load_candidates_fast, max_age_seconds=60)
+    get_candidate_archive().refresh(get_connector)
+except Exception as e:
+    st.warning(f"⚠️ Could not sync from Google Sheets, showing the last copy: {e}")
+
+# Only candidates that changed since the last sync are re-counted
+analytics.refresh_from(store)
+
+started = time.perf_counter()
+
+# ============================================
+# FILTERS
+# ============================================
+
+st.sidebar.header("🔍 Filters")
+
+selected_role = st.sidebar.selectbox("Role", options=["All"] + analytics.roles())
+role = None if selected_role == "All" else selected_role
+
+cohorts = analytics.cohorts()
+if cohorts:
+    cohort_from, cohort_to = st.sidebar.select_slider(
+        "Applied between",
+        options=cohorts,
+        value=(cohorts[0], cohorts[-1])
+    ) if len(cohorts) > 1 else (cohorts[0], cohorts[0])
+else:
+    cohort_from, cohort_to = None, None
+
+# ============================================
+# FUNNEL
+# ============================================
+
+funnel = analytics.funnel(role, cohort_from, cohort_to)
+outcomes = analytics.outcomes(role, cohort_from, cohort_to)
+applied = funnel[0]['candidates']
+
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    st.metric("📋 Applied", applied)
+with col2:
+    st.metric("✅ Hired", outcomes.get('hired', 0))
+with col3:
+    st.metric("❌ Rejected", outcomes.get('rejected', 0))
+with col4:
+    st.metric("🙅 Offers Declined", outcomes.get('declined', 0))
+
+st.markdown("---")
+st.subheader("🔻 Funnel")
+
+if applied == 0:
+    st.info("📭 No candidates for these filters yet.")
+else:
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        st.bar_chart(
+            pd.DataFrame(funnel).set_index("stage")["candidates"],
+            horizontal=True
+        )
+    with col2:
+        st.dataframe(
+            [
+                {
+                    "Stage": row['stage'],
+                    "Candidates": row['candidates'],
+                    "From previous (%)": row['from_previous'],
+                    "From applied (%)": row['from_applied'],
+                }
+                for row in funnel
+            ],
+            use_container_width=True,
+            hide_index=True
+        )
+
+    by_cohort = analytics.conversion_by_cohort(role)
+    if by_cohort:
+        st.markdown("**Hire rate by application month (%)**")
+        st.line_chart(pd.DataFrame(by_cohort).query("cohort != 'Unknown'").set_index("cohort")["hire_rate"])
+
+# ============================================
+# TIME BETWEEN STAGES
+# ============================================
+
+st.markdown("---")
+st.subheader("⏳ Time Between Stages")
+
+step_labels = {"applied_to_l1": "Applied → L1", "l1_to_l2": "L1 → L2"}
+cols = st.columns(len(DURATION_STEPS))
+for col, step in zip(cols, DURATION_STEPS):
+    with col:
+        stats = analytics.durations(step, role)
+        st.markdown(f"**{step_labels.get(step, step)}**")
+        if stats['count'] == 0:
+            st.caption("No candidates with both dates yet")
+            continue
+        st.caption(
+            f"{stats['count']} candidates · avg {stats['mean']} days · "
+            f"median {stats['p50']} · 90% within {stats['p90']} days"
+        )
+        st.bar_chart(pd.Series(stats['distribution'], name="candidates").rename_axis("days"))
+
+time_in_status = analytics.time_in_status()
+if time_in_status:
+    with st.expander("🕒 Time in each status (from status changes seen between syncs)"):
+        st.dataframe(
+            [
+                {
+                    "Status": row['status'],
+                    "Moves out": row['transitions'],
+                    "Avg days": row['avg_days'],
+                    "Max days": row['max_days'],
+                }
+                for row in time_in_status
+            ],
+            use_container_width=True,
+            hide_index=True
+        )
+
+# ============================================
+# INTERVIEW LOAD
+# ============================================
+
+st.markdown("---")
+st.subheader("🗓️ Interview Load")
+
+weeks = st.slider("Weeks to show", min_value=1, max_value=52, value=8)
+today = date.today()
+load = analytics.interview_load(
+    (today - timedelta(weeks=weeks)).isoformat(),
+    (today + timedelta(weeks=2)).isoformat()
+)
+
+if not load:
+    st.info("📭 No interviews in this period.")
+else:
+    st.bar_chart(pd.DataFrame(load), x="day", y=["L1", "L2"])
+
+# ============================================
+# GHOSTING
+# ============================================
+
+st.markdown("---")
+st.subheader("👻 Ghosting by Role")
+st.caption(f"Share of candidates who got an offer that were marked Ghosted, or whose offer is still open with a Ghost Risk over {ALERT_THRESHOLD}%")
+
+ghosting = analytics.ghosting_by_role(cohort_from, cohort_to)
+if not ghosting:
+    st.info("📭 No offers made yet.")
+else:
+    pivot = pd.DataFrame(ghosting).pivot(index="role", columns="cohort", values="ghost_rate")
+    st.dataframe(pivot, use_container_width=True)
+
+st.caption(f"⚡ Computed from pre-aggregated counts in {(time.perf_counter() - started) * 1000:.0f} ms")
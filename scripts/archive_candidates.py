@@ -0,0 +1,50 @@
+"""
+Moves old closed candidates out of the working sheet into the archive.
+
+Safe to run from cron - running it again only picks up what is left.
+
+Usage:
+    python scripts/archive_candidates.py --dry-run     # list who would move
+    python scripts/archive_candidates.py               # ARCHIVE_AFTER_DAYS / ARCHIVE_STATUSES
+    python scripts/archive_candidates.py --days 180 --statuses Rejected Joined
+    python scripts/archive_candidates.py --tenant acme  # one tenant (utils/tenants.py)
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from utils.archive import ARCHIVE_AFTER_DAYS, ARCHIVE_STATUSES, archive_closed_candidates
+from utils.metrics import page_action
+from utils.tenants import use_tenant
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS,
+                        help=f"Archive after this many days without activity (default {ARCHIVE_AFTER_DAYS})")
+    parser.add_argument("--statuses", nargs="+", default=ARCHIVE_STATUSES,
+                        help=f"Closed statuses (default {' '.join(ARCHIVE_STATUSES)})")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the candidates that would move")
+    parser.add_argument("--tenant", help="Tenant to archive for (default: the .env settings)")
+    args = parser.parse_args()
+
+    use_tenant(args.tenant)
+
+    with page_action("Archive Job"):
+        report = archive_closed_candidates(max_age_days=args.days, statuses=args.statuses, dry_run=args.dry_run)
+
+    print(f"Checked {report['candidates']} candidate(s), {len(report['emails'])} closed for {args.days}+ days")
+    if report['skipped']:
+        print(f"Kept {len(report['skipped'])} email(s) with another row that isn't ready to archive")
+    if args.dry_run:
+        for email in report['emails']:
+            print(f"  {email}")
+    else:
+        print(f"Archived {report['archived']}, deleted {report['deleted']} sheet row(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Shows how long each app module takes to import, and what makes it slow.
+
+Each module is imported in a fresh interpreter with `python -X importtime`,
+so the numbers are true cold-start costs (nothing is already cached).
+
+Usage:
+    python scripts/profile_imports.py                 # all utils modules
+    python scripts/profile_imports.py utils.scheduler # just these
+    python scripts/profile_imports.py --top 20
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = sorted(
+    "utils." + name[:-3]
+    for name in os.listdir(os.path.join(ROOT, "utils"))
+    if name.endswith(".py") and name != "__init__.py"
+)
+
+# "import time:  self [us] | cumulative | imported package"
+LINE_PATTERN = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile(module: str):
+    """
+    Imports one module in a new interpreter.
+
+    Returns:
+        (total_ms, [(cumulative_ms, name), ...] for its direct imports)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    total_ms = 0.0
+    children = []
+    for line in result.stderr.splitlines():
+        match = LINE_PATTERN.match(line)
+        if not match:
+            continue
+        cumulative_ms = int(match.group(2)) / 1000
+        depth = len(match.group(3)) // 2
+        name = match.group(4)
+        if depth == 0:
+            if name == module:
+                total_ms = cumulative_ms
+                break
+            # Interpreter startup (site, encodings, ...) - not ours
+            children = []
+        elif depth == 1:
+            # Direct imports only - their cost already includes submodules
+            children.append((cumulative_ms, name))
+
+    return total_ms, sorted(children, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile cold import times")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=5, help="Slowest imports to list per module")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        try:
+            total_ms, children = profile(module)
+        except RuntimeError as e:
+            print(f"❌ {module}: {e}")
+            continue
+
+        print(f"{module:<32} {total_ms:8.1f} ms")
+        for cumulative_ms, name in children[:args.top]:
+            if cumulative_ms >= 1:
+                print(f"    {name:<28} {cumulative_ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Emails a reminder for every interview booked for tomorrow.
+
+Run it once a day from cron.
+
+Usage:
+    python scripts/send_reminders.py --dry-run           # list tomorrow's interviews
+    python scripts/send_reminders.py                     # send the reminders
+    python scripts/send_reminders.py --date 2025-01-15   # another day
+    python scripts/send_reminders.py --tenant acme       # one tenant (utils/tenants.py)
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from utils.calendar_invites import send_interview_reminders
+from utils.metrics import page_action
+from utils.tenants import use_tenant
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--date", type=lambda value: datetime.strptime(value, "%Y-%m-%d").date(),
+                        help="Day of the interviews, YYYY-MM-DD (default: tomorrow)")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the interviews")
+    parser.add_argument("--tenant", help="Tenant to remind for (default: the .env settings)")
+    args = parser.parse_args()
+
+    use_tenant(args.tenant)
+
+    with page_action("Reminder Job"):
+        report = send_interview_reminders(day=args.date, dry_run=args.dry_run)
+
+    print(f"{len(report['interviews'])} interview(s) on {report['date']}")
+    for email, interview_type, slot in report['interviews']:
+        print(f"  {interview_type} {slot:>8}  {email}")
+    if not args.dry_run:
+        print(f"Sent {report['sent']} reminder(s)")
+
+
+if __name__ == "__main__":
+    main()
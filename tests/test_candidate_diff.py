@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from utils.candidate_diff import diff_candidates
+
+
+def _table():
+    return pd.DataFrame({
+        "Email": ["a@x.com", "b@x.com", "c@x.com"],
+        "Status": ["Screening", "Screening", "L1_Done"],
+        "Phone": [9876543210.0, np.nan, 9123456780.0],
+    })
+
+
+def test_changed_cells_are_keyed_by_original_email():
+    original = _table()
+    edited = original.copy()
+    edited.loc[1, "Status"] = "L1_Scheduled"
+    edited.loc[2, "Email"] = "c2@x.com"
+
+    assert diff_candidates(original, edited) == {
+        "b@x.com": {"Status": "L1_Scheduled"},
+        "c@x.com": {"Email": "c2@x.com"},
+    }
+
+
+def test_edited_subset_of_rows():
+    original = _table()
+    edited = original.loc[[1, 2]].copy()
+    edited.loc[1, "Status"] = "X"
+
+    assert diff_candidates(original, edited) == {"b@x.com": {"Status": "X"}}
+
+
+def test_integral_floats_are_not_edits():
+    original = _table()
+    edited = original.copy()
+    edited["Phone"] = ["9876543210", "", "9123456781"]
+
+    assert diff_candidates(original, edited) == {"c@x.com": {"Phone": "9123456781"}}
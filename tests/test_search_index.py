@@ -0,0 +1,55 @@
+import pandas as pd
+
+from utils import search_index
+from utils.search_index import CandidateSearchIndex
+
+
+def _index(rows):
+    index = CandidateSearchIndex()
+    index.update(pd.DataFrame(rows, columns=["Name", "Email", "Role", "Notes"]))
+    return index
+
+
+def test_one_letter_query_matches_whole_words():
+    index = _index([
+        ["Arjun S", "arjun.s@mail.com", "Backend", ""],
+        ["Priya", "priya@mail.com", "Sales", ""],
+    ])
+
+    assert index.search("s") == ["arjun.s@mail.com"]
+    assert index.search("a") == []
+
+
+def test_prefix_expansion_keeps_the_most_common_words(monkeypatch):
+    monkeypatch.setattr(search_index, "MAX_PREFIX_TOKENS", 2)
+    index = _index([
+        ["Dev A", "a@x.com", "", "zqaa"],
+        ["Dev B", "b@x.com", "", "zqab"],
+        ["Dev C", "c@x.com", "", "zqzz"],
+        ["Dev D", "d@x.com", "", "zqzz"],
+        ["Dev E", "e@x.com", "", "zqzz"],
+        ["Dev F", "f@x.com", "", "zqyy"],
+        ["Dev G", "g@x.com", "", "zqyy"],
+    ])
+
+    # zqzz (3 candidates) and zqyy (2) win over the alphabetically first zqaa and zqab
+    assert index._prefix_tokens("zq") == ["zqzz", "zqyy"]
+    assert index.search("zq") == ["c@x.com", "d@x.com", "e@x.com", "f@x.com", "g@x.com"]
+    assert index.search("zqa") == ["a@x.com", "b@x.com"]
+
+
+def test_fuzzy_entries_are_dropped_when_no_name_or_role_has_the_word():
+    index = _index([
+        ["Arjun", "arjun@mail.com", "", ""],
+        ["Priya", "priya@mail.com", "", "referred by arjun"],
+    ])
+    assert index.search("arjnu") == ["arjun@mail.com", "priya@mail.com"]
+
+    index.update(pd.DataFrame(
+        [["Priya", "priya@mail.com", "", "referred by arjun"]],
+        columns=["Name", "Email", "Role", "Notes"]
+    ))
+
+    # "arjun" is still indexed (Notes), but typos only match names and roles
+    assert index.search("arjun") == ["priya@mail.com"]
+    assert index.search("arjnu") == []
@@ -1,28 +1,26 @@
-from groq import  Groq
 import os 
-from dotenv import load_dotenv
+from bisect import bisect_left
+from utils.config import env
 
-load_dotenv()
+from utils.llm_provider import get_llm_provider
+from utils.message_cache import get_message_cache, make_cache_key
+from utils.metrics import get_metrics, track
+from utils.message_templates import render_message
+from utils.tenants import current_tenant
 
-client=Groq()
-def generate_engagement_message(candidate_name,candidate_role,day_number,company_name="TechCorp"):
-    """
-    Generates a personalized engagement message using Groq LLM.
-    Args:
-        candidate_name:Name of the candidate (e.g.,"Arjun Sharma")
-        Candidate_role: Their job role (e.g.,"Backend Engineer")
-        day_number: which day of hte 90-day notice period(1,7,30, etc..)
-        company_name: Your Company Name
-    
-    Returns:
-        dict with 'Subject' and 'Body' keys
-    """
 
-    prompt = f"""
+MODEL = env("LLM_MODEL", "llama-3.3-70b-versatile")
+TEMPERATURE = 0.7  # Some creativity but not too random
+MAX_TOKENS = 300   # Keep response short
+
+# Last day of each tone stage in the prompt below (1-7, 8-30, 31-60, 61-85, 86-90)
+DAY_BUCKET_ENDS = [7, 30, 60, 85, 90]
+
+PROMPT_TEMPLATE = """
     You are a friendly HR buddy writing engaging emails to candidates during their 90-day notice period.
 
     **Candidate Info:**
-    - Name: {candidate_name} (use first name only)
+    - Name: {first_name}
     - Role: {candidate_role}
     - Company: {company_name}
     - Day: {day_number}/90
@@ -42,20 +40,80 @@ def generate_engagement_message(candidate_name,candidate_role,day_number,company
     5. End with "{company_name} Team"
     6. Ask ONE engaging question to encourage reply
     """
+
+def get_day_bucket(day_number):
+    """
+    Maps a notice-period day to its tone stage (0-4), e.g. day 12 -> 1.
+    """
+    return min(bisect_left(DAY_BUCKET_ENDS, day_number), len(DAY_BUCKET_ENDS) - 1)
+
+def generate_engagement_message(candidate_name,candidate_role,day_number,company_name=None,use_cache=True,timeout=None,fallback_to_template=True):
+    """
+    Generates a personalized engagement message using the configured LLM
+    provider (Groq by default, see utils/llm_provider.py).
+
+    The message only depends on first name, role, tone stage of the day and
+    company, so results are cached on those (plus model settings) and repeat
+    requests skip the LLM call entirely.
+
+    Args:
+        candidate_name:Name of the candidate (e.g.,"Arjun Sharma")
+        Candidate_role: Their job role (e.g.,"Backend Engineer")
+        day_number: which day of hte 90-day notice period(1,7,30, etc..)
+        company_name: Your Company Name (default: the current tenant's)
+        use_cache: Set False to always ask the LLM for a fresh message
+        timeout: Seconds to wait for the LLM (default: LLM_TIMEOUT_SECONDS)
+        fallback_to_template: If the LLM fails or times out, return the
+            stage template instead of raising (template results are not cached)
     
-    chat_completion = client.chat.completions.create(
-        messages=[
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ],
-        model="llama-3.3-70b-versatile",  
-        temperature=0.7,  # Some creativity but not too random
-        max_tokens=300    # Keep response short
+    Returns:
+        dict with 'Subject' and 'Body' keys
+    """
+    company_name = company_name or current_tenant().company_name
+    first_name = str(candidate_name).split()[0] if str(candidate_name).strip() else candidate_name
+    provider = get_llm_provider()
+
+    cache_key = make_cache_key(
+        provider=provider.name,
+        first_name=first_name,
+        role=candidate_role,
+        day_bucket=get_day_bucket(day_number),
+        company=company_name,
+        model=MODEL,
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS,
     )
-    
-    response_text = chat_completion.choices[0].message.content
+
+    if use_cache:
+        cached = get_message_cache().get(cache_key)
+        if cached is not None:
+            get_metrics().count_event("message_cache_hit")
+            return cached
+        get_metrics().count_event("message_cache_miss")
+
+    prompt = PROMPT_TEMPLATE.format(
+        first_name=first_name,
+        candidate_role=candidate_role,
+        company_name=company_name,
+        day_number=day_number
+    )
+
+    try:
+        with track("llm", provider.name) as call:
+            response_text = provider.complete(
+                prompt,
+                model=MODEL,
+                temperature=TEMPERATURE,
+                max_tokens=MAX_TOKENS,
+                timeout=timeout
+            )
+            call.add_bytes(sent=len(prompt.encode("utf-8")), received=len(response_text.encode("utf-8")))
+    except Exception as e:
+        if not fallback_to_template:
+            raise
+        get_metrics().count_event("llm_template_fallback")
+        print(f"⚠️ LLM unavailable ({e}), using template message")
+        return render_message(candidate_name, candidate_role, day_number, company_name)
     
     lines = response_text.strip().split('\n')
     
@@ -64,10 +122,15 @@ def generate_engagement_message(candidate_name,candidate_role,day_number,company
     body_lines = [line for line in lines[1:] if line.strip()]
     body = '\n'.join(body_lines)
     
-    return {
+    message = {
         "subject": subject,
         "body": body
     }
+
+    if use_cache:
+        get_message_cache().add(cache_key, message)
+
+    return message
 # =================================================
 # TEST FUNCTION - Run this file directly to test
 # =================================================
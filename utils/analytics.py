@@ -0,0 +1,550 @@
+"""
+Recruitment funnel analytics, kept as pre-computed aggregates.
+
+FunnelAnalytics keeps one small "fact" row per candidate (furthest stage,
+outcome, cohort, days between interviews, ...) and a few count tables
+built from them. update() only looks at candidates whose sheet row
+changed since the last update, and adjusts the counts by the difference,
+so the Analytics page reads a few hundred aggregate rows - never the
+whole history.
+
+Lives in the same SQLite file as the CandidateStore, and counts archived
+candidates (utils/archive.py) as well as the working sheet.
+"""
+from __future__ import annotations
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import date
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from utils.archive import CandidateArchive, get_candidate_archive, read_all_columns
+from utils.candidate_store import CandidateStore, get_candidate_store
+from utils.hr_alerts import ALERT_THRESHOLD
+from utils.tenants import current_tenant
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Funnel order - a candidate "reached" every stage up to their furthest one
+FUNNEL_STAGES = [
+    "Applied", "L1 Scheduled", "L1 Done", "L2 Scheduled", "L2 Done", "Offer Sent", "Offer Accepted"
+]
+
+# Furthest stage each status implies (Rejected is worked out from the interview columns)
+STATUS_STAGE = {
+    "Screening": 0,
+    "L1_Scheduled": 1,
+    "L1_Done": 2,
+    "L2_Scheduled": 3,
+    "L2_Done": 4,
+    "Offer_Sent": 5,
+    "Offer_Declined": 5,
+    "Offer_Accepted": 6,
+    "Joined": 6,
+    "Ghosted": 6,
+}
+
+OUTCOMES = {
+    "Offer_Accepted": "hired",
+    "Joined": "hired",
+    "Ghosted": "ghosted",
+    "Offer_Declined": "declined",
+    "Rejected": "rejected",
+}
+
+# Bump when build_fact() changes - stored facts are then rebuilt on the next refresh
+FACTS_VERSION = "2"
+
+# Columns the facts are built from - a change anywhere else doesn't matter here
+ANALYTICS_COLUMNS = [
+    "Email", "Role", "Status", "Applied_Date", "L1_Date", "L1_Result",
+    "L2_Date", "L2_Result", "Ghost_Risk"
+]
+
+# Gaps between dates we have in the sheet
+DURATION_STEPS = {
+    "applied_to_l1": ("Applied_Date", "L1_Date"),
+    "l1_to_l2": ("L1_Date", "L2_Date"),
+}
+
+FACT_FIELDS = ["role", "cohort", "stage", "outcome", "ghosted", "status",
+               "applied_to_l1", "l1_to_l2", "l1_date", "l2_date"]
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(value: str) -> Optional[date]:
+    # Cached - a few years of history only has a few thousand distinct dates
+    try:
+        return date.fromisoformat(value.strip()[:10])
+    except ValueError:
+        return None
+
+
+def build_fact(record: Dict) -> Dict:
+    """
+    Turns one candidate row into the numbers the aggregates are made of.
+    """
+    status = str(record.get("Status") or "")
+
+    if status == "Rejected":
+        # How far they got before being rejected
+        stage = 0
+        for column, reached in [("L1_Date", 1), ("L1_Result", 2), ("L2_Date", 3), ("L2_Result", 4)]:
+            if str(record.get(column) or "").strip():
+                stage = reached
+    else:
+        stage = STATUS_STAGE.get(status, 0)
+
+    risk = str(record.get("Ghost_Risk") or "").strip()
+    outcome = OUTCOMES.get(status, "open")
+
+    dates = {column: _parse_date(str(record.get(column) or "")) for column in ("Applied_Date", "L1_Date", "L2_Date")}
+    applied = dates["Applied_Date"]
+
+    fact = {
+        "role": str(record.get("Role") or "Unknown"),
+        "cohort": applied.strftime("%Y-%m") if applied else "Unknown",
+        "stage": stage,
+        "outcome": outcome,
+        # Marked Ghosted, or still open with a Ghost Risk over the alert threshold -
+        # a high risk on a hired or declined candidate is history, not ghosting
+        "ghosted": int(
+            outcome == "ghosted"
+            or (outcome == "open" and risk.isdigit() and int(risk) > ALERT_THRESHOLD)
+        ),
+        "status": status,
+        "l1_date": dates["L1_Date"].isoformat() if dates["L1_Date"] else None,
+        "l2_date": dates["L2_Date"].isoformat() if dates["L2_Date"] else None,
+    }
+    for step, (start, end) in DURATION_STEPS.items():
+        if dates[start] and dates[end] and dates[end] >= dates[start]:
+            fact[step] = (dates[end] - dates[start]).days
+        else:
+            fact[step] = None
+    return fact
+
+
+def _percentile(counts: List[Tuple[int, int]], fraction: float) -> Optional[int]:
+    """
+    Percentile from sorted (value, count) pairs.
+    """
+    total = sum(count for _, count in counts)
+    if total == 0:
+        return None
+    running = 0
+    for value, count in counts:
+        running += count
+        if running >= total * fraction:
+            return value
+    return counts[-1][0]
+
+
+class FunnelAnalytics:
+    """
+    Incrementally maintained funnel aggregates.
+
+    Usage:
+        analytics = get_funnel_analytics()
+        analytics.refresh_from(store)       # cheap if the store hasn't changed
+        analytics.funnel(role="Backend Engineer")
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        with self._db() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS analytics_meta (key TEXT PRIMARY KEY, value TEXT);
+
+                CREATE TABLE IF NOT EXISTS candidate_facts (
+                    email         TEXT PRIMARY KEY,
+                    row_hash      TEXT NOT NULL,
+                    role          TEXT NOT NULL,
+                    cohort        TEXT NOT NULL,
+                    stage         INTEGER NOT NULL,
+                    outcome       TEXT NOT NULL,
+                    ghosted       INTEGER NOT NULL,
+                    status        TEXT NOT NULL,
+                    applied_to_l1 INTEGER,
+                    l1_to_l2      INTEGER,
+                    l1_date       TEXT,
+                    l2_date       TEXT
+                );
+
+                CREATE TABLE IF NOT EXISTS funnel_counts (
+                    cohort TEXT, role TEXT, stage INTEGER, outcome TEXT, ghosted INTEGER,
+                    candidates INTEGER NOT NULL,
+                    PRIMARY KEY (cohort, role, stage, outcome, ghosted)
+                );
+
+                CREATE TABLE IF NOT EXISTS duration_counts (
+                    step TEXT, role TEXT, days INTEGER,
+                    candidates INTEGER NOT NULL,
+                    PRIMARY KEY (step, role, days)
+                );
+
+                CREATE TABLE IF NOT EXISTS interview_counts (
+                    day TEXT, kind TEXT,
+                    candidates INTEGER NOT NULL,
+                    PRIMARY KEY (day, kind)
+                );
+
+                CREATE TABLE IF NOT EXISTS status_history (
+                    email       TEXT NOT NULL,
+                    from_status TEXT NOT NULL,
+                    to_status   TEXT NOT NULL,
+                    changed_at  REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_status_history_email ON status_history (email, changed_at);
+            """)
+
+            row = conn.execute("SELECT value FROM analytics_meta WHERE key = 'facts_version'").fetchone()
+            if row is None or row[0] != FACTS_VERSION:
+                # Facts built by an older build_fact(): make every row look changed,
+                # so the next update swaps them (and their counts) for new ones
+                conn.execute("UPDATE candidate_facts SET row_hash = ''")
+                conn.execute("DELETE FROM analytics_meta WHERE key = 'source_version'")
+                conn.execute("INSERT OR REPLACE INTO analytics_meta VALUES ('facts_version', ?)", (FACTS_VERSION,))
+
+    def _db(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    # ============================================
+    # INCREMENTAL UPDATE
+    # ============================================
+
+    def update(self, df: pd.DataFrame, observed_at: Optional[float] = None) -> Dict[str, int]:
+        """
+        Brings the aggregates in line with the latest candidate table.
+
+        Rows are compared by a hash of ANALYTICS_COLUMNS; only new, changed
+        and removed candidates touch the aggregates. Status changes are
+        also written to status_history (time-in-stage).
+
+        Returns:
+            dict with 'added', 'changed' and 'removed' counts
+        """
+        import pandas as pd
+
+        stats = {"added": 0, "changed": 0, "removed": 0}
+        if "Email" not in df.columns:
+            return stats
+
+        observed_at = observed_at or time.time()
+        columns = [c for c in ANALYTICS_COLUMNS if c in df.columns]
+        table = df[columns].astype(object).where(df[columns].notna(), "")
+        table = table.assign(_email=table["Email"].astype(str).str.strip().str.lower())
+        table = table[table["_email"] != ""].drop_duplicates("_email")
+        hashes = pd.util.hash_pandas_object(table[columns].astype(str), index=False).astype(str)
+
+        with self._lock, self._db() as conn:
+            known = dict(conn.execute("SELECT email, row_hash FROM candidate_facts"))
+            changed = table[table["_email"].map(known).ne(hashes)]
+            changed_hashes = hashes[changed.index]
+            removed = set(known) - set(table["_email"].tolist())
+
+            touched = changed["_email"].tolist() + list(removed)
+            old_facts = self._load_facts(conn, touched)
+
+            deltas = _Deltas()
+            history = []
+            fact_rows = []
+
+            for record, row_hash in zip(changed.to_dict("records"), changed_hashes):
+                email = record["_email"]
+                fact = build_fact(record)
+                old = old_facts.get(email)
+
+                if old is not None:
+                    deltas.add(old, -1)
+                    stats["changed"] += 1
+                    if old["status"] != fact["status"]:
+                        history.append((email, old["status"], fact["status"], observed_at))
+                else:
+                    stats["added"] += 1
+
+                deltas.add(fact, +1)
+                fact_rows.append((email, row_hash) + tuple(fact[f] for f in FACT_FIELDS))
+
+            for email in removed:
+                deltas.add(old_facts[email], -1)
+                stats["removed"] += 1
+
+            conn.executemany(
+                f"INSERT OR REPLACE INTO candidate_facts (email, row_hash, {', '.join(FACT_FIELDS)}) "
+                f"VALUES ({', '.join('?' for _ in range(len(FACT_FIELDS) + 2))})",
+                fact_rows
+            )
+            conn.executemany("DELETE FROM candidate_facts WHERE email = ?", [(e,) for e in removed])
+            conn.executemany("INSERT INTO status_history VALUES (?, ?, ?, ?)", history)
+            deltas.apply(conn)
+
+        return stats
+
+    def _load_facts(self, conn: sqlite3.Connection, emails: List[str]) -> Dict[str, Dict]:
+        facts = {}
+        # SQLite caps the number of ? per statement
+        for start in range(0, len(emails), 500):
+            chunk = emails[start:start + 500]
+            rows = conn.execute(
+                f"SELECT email, {', '.join(FACT_FIELDS)} FROM candidate_facts "
+                f"WHERE email IN ({', '.join('?' for _ in chunk)})",
+                chunk
+            )
+            for row in rows:
+                facts[row[0]] = dict(zip(FACT_FIELDS, row[1:]))
+        return facts
+
+    def refresh_from(self, store: CandidateStore, archive: Optional[CandidateArchive] = None) -> bool:
+        """
+        Updates from the working store plus the archive (default: the
+        shared one) if either changed since the last update.
+
+        Returns:
+            bool: True if an update ran
+        """
+        archive = archive or get_candidate_archive()
+        synced_at = store.synced_at()
+        if synced_at is None:
+            return False
+        archived_at = archive.updated_at()
+        version = f"{synced_at}|{archived_at}"
+
+        with self._db() as conn:
+            row = conn.execute("SELECT value FROM analytics_meta WHERE key = 'source_version'").fetchone()
+        if row is not None and row[0] == version:
+            return False
+
+        self.update(
+            read_all_columns(store, archive, ANALYTICS_COLUMNS),
+            observed_at=max(synced_at, archived_at or 0)
+        )
+        with self._db() as conn:
+            conn.execute("INSERT OR REPLACE INTO analytics_meta VALUES ('source_version', ?)", (version,))
+        return True
+
+    # ============================================
+    # QUERIES
+    # ============================================
+
+    def _filters(self, role: Optional[str], cohort_from: Optional[str], cohort_to: Optional[str]) -> Tuple[str, list]:
+        clauses, params = [], []
+        if role:
+            clauses.append("role = ?")
+            params.append(role)
+        if cohort_from:
+            clauses.append("cohort >= ?")
+            params.append(cohort_from)
+        if cohort_to:
+            clauses.append("cohort <= ?")
+            params.append(cohort_to)
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def roles(self) -> List[str]:
+        with self._db() as conn:
+            return [r[0] for r in conn.execute("SELECT DISTINCT role FROM funnel_counts ORDER BY role")]
+
+    def cohorts(self) -> List[str]:
+        with self._db() as conn:
+            return [r[0] for r in conn.execute(
+                "SELECT DISTINCT cohort FROM funnel_counts WHERE cohort != 'Unknown' ORDER BY cohort"
+            )]
+
+    def funnel(self, role: Optional[str] = None, cohort_from: Optional[str] = None,
+               cohort_to: Optional[str] = None) -> List[Dict]:
+        """
+        Candidates reaching each stage, with conversion from the previous
+        stage and from Applied.
+        """
+        where, params = self._filters(role, cohort_from, cohort_to)
+        with self._db() as conn:
+            by_stage = dict(conn.execute(
+                f"SELECT stage, SUM(candidates) FROM funnel_counts {where} GROUP BY stage", params
+            ))
+
+        rows = []
+        reached_next = 0
+        reached = [0] * len(FUNNEL_STAGES)
+        for stage in reversed(range(len(FUNNEL_STAGES))):
+            reached_next += by_stage.get(stage, 0)
+            reached[stage] = reached_next
+
+        for stage, name in enumerate(FUNNEL_STAGES):
+            previous = reached[stage - 1] if stage > 0 else reached[0]
+            rows.append({
+                "stage": name,
+                "candidates": reached[stage],
+                "from_previous": round(reached[stage] / previous * 100, 1) if previous else None,
+                "from_applied": round(reached[stage] / reached[0] * 100, 1) if reached[0] else None,
+            })
+        return rows
+
+    def outcomes(self, role: Optional[str] = None, cohort_from: Optional[str] = None,
+                 cohort_to: Optional[str] = None) -> Dict[str, int]:
+        where, params = self._filters(role, cohort_from, cohort_to)
+        with self._db() as conn:
+            return dict(conn.execute(
+                f"SELECT outcome, SUM(candidates) FROM funnel_counts {where} GROUP BY outcome", params
+            ))
+
+    def conversion_by_cohort(self, role: Optional[str] = None) -> List[Dict]:
+        """
+        Per application month: applicants, hires (Offer_Accepted or Joined)
+        and the hire rate.
+        """
+        where, params = self._filters(role, None, None)
+        with self._db() as conn:
+            rows = conn.execute(
+                f"SELECT cohort, SUM(candidates), SUM(CASE WHEN outcome = 'hired' THEN candidates ELSE 0 END) "
+                f"FROM funnel_counts {where} GROUP BY cohort ORDER BY cohort",
+                params
+            ).fetchall()
+        return [
+            {"cohort": cohort, "applied": applied, "hired": hired,
+             "hire_rate": round(hired / applied * 100, 1) if applied else None}
+            for cohort, applied, hired in rows
+        ]
+
+    def ghosting_by_role(self, cohort_from: Optional[str] = None, cohort_to: Optional[str] = None) -> List[Dict]:
+        """
+        Per role and application month: share of candidates who got an
+        offer that were marked Ghosted, or whose offer is still open with a
+        Ghost Risk over ALERT_THRESHOLD.
+        """
+        where, params = self._filters(None, cohort_from, cohort_to)
+        where = (where + " AND " if where else "WHERE ") + "stage >= 5"
+        with self._db() as conn:
+            rows = conn.execute(
+                f"SELECT cohort, role, SUM(candidates), SUM(ghosted * candidates) "
+                f"FROM funnel_counts {where} GROUP BY cohort, role ORDER BY cohort, role",
+                params
+            ).fetchall()
+        return [
+            {"cohort": cohort, "role": role, "offers": offers, "ghosted": ghosted,
+             "ghost_rate": round(ghosted / offers * 100, 1) if offers else None}
+            for cohort, role, offers, ghosted in rows
+        ]
+
+    def durations(self, step: str, role: Optional[str] = None) -> Dict:
+        """
+        Days between two stages (see DURATION_STEPS): count, mean, p50, p90
+        and the full {days: candidates} distribution.
+        """
+        clause, params = ("AND role = ?", [step, role]) if role else ("", [step])
+        with self._db() as conn:
+            counts = conn.execute(
+                f"SELECT days, SUM(candidates) FROM duration_counts WHERE step = ? {clause} "
+                f"GROUP BY days ORDER BY days",
+                params
+            ).fetchall()
+
+        total = sum(count for _, count in counts)
+        return {
+            "count": total,
+            "mean": round(sum(days * count for days, count in counts) / total, 1) if total else None,
+            "p50": _percentile(counts, 0.5),
+            "p90": _percentile(counts, 0.9),
+            "distribution": dict(counts),
+        }
+
+    def time_in_status(self) -> List[Dict]:
+        """
+        How long candidates stayed in each status before moving on, from
+        the status changes seen between syncs (status_history).
+        """
+        with self._db() as conn:
+            rows = conn.execute("""
+                SELECT to_status, COUNT(*), AVG(days), MAX(days) FROM (
+                    SELECT to_status,
+                           (LEAD(changed_at) OVER (PARTITION BY email ORDER BY changed_at) - changed_at) / 86400.0 AS days
+                    FROM status_history
+                )
+                WHERE days IS NOT NULL
+                GROUP BY to_status
+                ORDER BY to_status
+            """).fetchall()
+        return [
+            {"status": status, "transitions": count, "avg_days": round(avg, 1), "max_days": round(longest, 1)}
+            for status, count, avg, longest in rows
+        ]
+
+    def interview_load(self, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict]:
+        """
+        Interviews per day ('YYYY-MM-DD' range, inclusive), split into L1 and L2.
+        """
+        clauses, params = [], []
+        if start:
+            clauses.append("day >= ?")
+            params.append(start)
+        if end:
+            clauses.append("day <= ?")
+            params.append(end)
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+
+        with self._db() as conn:
+            rows = conn.execute(
+                f"SELECT day, kind, candidates FROM interview_counts {where} ORDER BY day", params
+            ).fetchall()
+
+        by_day: Dict[str, Dict] = {}
+        for day, kind, count in rows:
+            by_day.setdefault(day, {"day": day, "L1": 0, "L2": 0})[kind] = count
+        return list(by_day.values())
+
+
+class _Deltas:
+    """
+    +1/-1 changes to the aggregate tables, written in one go.
+    """
+
+    def __init__(self):
+        self.funnel = defaultdict(int)
+        self.durations = defaultdict(int)
+        self.interviews = defaultdict(int)
+
+    def add(self, fact: Dict, sign: int):
+        self.funnel[(fact["cohort"], fact["role"], fact["stage"], fact["outcome"], fact["ghosted"])] += sign
+        for step in DURATION_STEPS:
+            if fact[step] is not None:
+                self.durations[(step, fact["role"], fact[step])] += sign
+        for kind, day in (("L1", fact["l1_date"]), ("L2", fact["l2_date"])):
+            if day:
+                self.interviews[(day, kind)] += sign
+
+    def apply(self, conn: sqlite3.Connection):
+        for table, keys, deltas in [
+            ("funnel_counts", ("cohort", "role", "stage", "outcome", "ghosted"), self.funnel),
+            ("duration_counts", ("step", "role", "days"), self.durations),
+            ("interview_counts", ("day", "kind"), self.interviews),
+        ]:
+            changes = [key + (delta,) for key, delta in deltas.items() if delta != 0]
+            if not changes:
+                continue
+            conn.executemany(
+                f"INSERT INTO {table} ({', '.join(keys)}, candidates) "
+                f"VALUES ({', '.join('?' for _ in range(len(keys) + 1))}) "
+                f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET candidates = candidates + excluded.candidates",
+                changes
+            )
+            conn.execute(f"DELETE FROM {table} WHERE candidates <= 0")
+
+
+_analytics_instances: Dict[str, FunnelAnalytics] = {}
+_analytics_lock = threading.Lock()
+
+def get_funnel_analytics() -> FunnelAnalytics:
+    """
+    Returns the current tenant's FunnelAnalytics (stored next to its candidate store).
+    """
+    tenant = current_tenant()
+
+    with _analytics_lock:
+        if tenant.tenant_id not in _analytics_instances:
+            _analytics_instances[tenant.tenant_id] = FunnelAnalytics(get_candidate_store().db_path)
+
+        return _analytics_instances[tenant.tenant_id]
@@ -0,0 +1,355 @@
+"""
+Cold storage for closed candidates.
+
+Rejected, Joined, Ghosted and Offer_Declined candidates never change
+again, but they stayed in the working sheet forever - so every
+get_all_records, find and page render paid for all-time history.
+archive_closed_candidates() moves the ones whose last activity is older
+than ARCHIVE_AFTER_DAYS to the ARCHIVE_SHEET tab of the same spreadsheet
+(one row per candidate: Email, Status, Archived_At and the full record as
+JSON) and deletes their rows from the candidate sheet.
+
+The tab is the archive - every process and replica sees the same one.
+Each process reads it into a local SQLite copy (refresh(), at most every
+ARCHIVE_SYNC_SECONDS), which search and analytics read through
+read_all_columns(), so archived candidates can still be found and still
+count in the funnel.
+
+Usage:
+    report = archive_closed_candidates(dry_run=True)   # what would move
+    report = archive_closed_candidates()
+"""
+from __future__ import annotations
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, TYPE_CHECKING
+from utils.config import env, LOCAL_DATA_DIR
+from utils.tenants import current_tenant
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from utils.candidate_store import CandidateStore
+    from utils.sheets_connector import SheetsConnector
+
+
+# The archive itself: a tab of the candidate spreadsheet (created on first use)
+ARCHIVE_SHEET = env("ARCHIVE_SHEET", "Archive")
+ARCHIVE_HEADERS = ["Email", "Status", "Archived_At", "Record"]
+# This process's copy of the tab, re-read at most every ARCHIVE_SYNC_SECONDS
+ARCHIVE_PATH = env("ARCHIVE_PATH", os.path.join(LOCAL_DATA_DIR, "archive.db"))
+ARCHIVE_SYNC_SECONDS = float(env("ARCHIVE_SYNC_SECONDS", "300"))
+ARCHIVE_AFTER_DAYS = int(env("ARCHIVE_AFTER_DAYS", "90"))
+ARCHIVE_STATUSES = [
+    s.strip() for s in env("ARCHIVE_STATUSES", "Rejected,Joined,Ghosted,Offer_Declined").split(",") if s.strip()
+]
+
+# A candidate's last activity is the latest of these dates
+ACTIVITY_COLUMNS = ["Applied_Date", "L1_Date", "L2_Date"]
+
+
+def _archive_row(record: Dict, archived_at: float) -> List[str]:
+    # One ARCHIVE_SHEET row (ARCHIVE_HEADERS order)
+    return [
+        str(record.get("Email") or "").strip(),
+        str(record.get("Status") or ""),
+        datetime.fromtimestamp(archived_at).isoformat(timespec="seconds"),
+        json.dumps(record, default=str),
+    ]
+
+
+def _archived_at(value: str) -> float:
+    try:
+        return datetime.fromisoformat(value.strip()).timestamp()
+    except ValueError:
+        return 0.0
+
+
+class CandidateArchive:
+    """
+    This process's copy of the ARCHIVE_SHEET tab: archived candidates, one
+    row per email with the full sheet record.
+
+    Records are stored as JSON so the archive doesn't care if sheet
+    columns are added later.
+    """
+
+    def __init__(self, db_path: str = ARCHIVE_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        folder = os.path.dirname(self.db_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        with self._db() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS archived_candidates (
+                    email       TEXT PRIMARY KEY,
+                    status      TEXT,
+                    archived_at REAL NOT NULL,
+                    record      TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS archive_meta (key TEXT PRIMARY KEY, value TEXT);
+            """)
+
+    def _db(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def add(self, records: List[Dict]) -> int:
+        """
+        Stores these candidate records (re-archiving an email replaces it).
+
+        Returns:
+            int: Number of records stored
+        """
+        now = time.time()
+        rows = [
+            (str(r["Email"]).strip().lower(), r.get("Status"), now, json.dumps(r, default=str))
+            for r in records
+            if str(r.get("Email") or "").strip()
+        ]
+        if not rows:
+            return 0
+
+        with self._lock, self._db() as conn:
+            conn.executemany("INSERT OR REPLACE INTO archived_candidates VALUES (?, ?, ?, ?)", rows)
+            conn.execute("INSERT OR REPLACE INTO archive_meta VALUES ('updated_at', ?)", (str(now),))
+        return len(rows)
+
+    def refresh(
+        self,
+        connect: Callable,
+        max_age_seconds: float = ARCHIVE_SYNC_SECONDS,
+        force: bool = False
+    ) -> bool:
+        """
+        Re-reads the ARCHIVE_SHEET tab if the copy is older than
+        max_age_seconds. Records only this copy has (archived before the
+        tab existed) are written to the tab first.
+
+        Args:
+            connect: Returns the connector (only called when a read is due),
+                e.g. get_connector
+
+        Returns:
+            bool: True if the archived candidates changed
+        """
+        with self._db() as conn:
+            row = conn.execute("SELECT value FROM archive_meta WHERE key = 'synced_at'").fetchone()
+        if not force and row is not None and time.time() - float(row[0]) < max_age_seconds:
+            return False
+
+        connector = connect()
+        worksheet = connector.archive_worksheet(create=False)
+        values = worksheet.get_all_values() if worksheet is not None else []
+
+        # email -> (status, archived_at, record); a later archiving of an
+        # email wins, within one run the first row (the one the app showed)
+        latest: Dict[str, tuple] = {}
+        for row in values[1:]:
+            row = list(row) + [""] * (len(ARCHIVE_HEADERS) - len(row))
+            email = row[0].strip().lower()
+            if not email or not row[3]:
+                continue
+            archived_at = _archived_at(row[2])
+            if email not in latest or archived_at > latest[email][1]:
+                latest[email] = (row[1], archived_at, row[3])
+
+        with self._db() as conn:
+            local = {
+                email: (status, archived_at, record)
+                for email, status, archived_at, record in
+                conn.execute("SELECT email, status, archived_at, record FROM archived_candidates")
+            }
+
+        local_only = {email: entry for email, entry in local.items() if email not in latest}
+        if local_only:
+            worksheet = worksheet or connector.archive_worksheet()
+            worksheet.append_rows([
+                _archive_row(json.loads(record), archived_at)
+                for status, archived_at, record in local_only.values()
+            ])
+            latest.update(local_only)
+            print(f"🗄️ Copied {len(local_only)} locally archived candidate(s) to the '{ARCHIVE_SHEET}' tab")
+
+        changed = latest.keys() != local.keys() or any(local[e][2] != latest[e][2] for e in latest)
+        now = time.time()
+        with self._lock, self._db() as conn:
+            if changed:
+                conn.execute("DELETE FROM archived_candidates")
+                conn.executemany(
+                    "INSERT INTO archived_candidates VALUES (?, ?, ?, ?)",
+                    [(email, status, archived_at, record) for email, (status, archived_at, record) in latest.items()]
+                )
+                conn.execute("INSERT OR REPLACE INTO archive_meta VALUES ('updated_at', ?)", (str(now),))
+            conn.execute("INSERT OR REPLACE INTO archive_meta VALUES ('synced_at', ?)", (str(now),))
+        return changed
+
+    def updated_at(self) -> Optional[float]:
+        with self._db() as conn:
+            row = conn.execute("SELECT value FROM archive_meta WHERE key = 'updated_at'").fetchone()
+        return float(row[0]) if row else None
+
+    def total(self) -> int:
+        with self._db() as conn:
+            return conn.execute("SELECT COUNT(*) FROM archived_candidates").fetchone()[0]
+
+    def count_by_status(self) -> Dict[str, int]:
+        with self._db() as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM archived_candidates GROUP BY status"))
+
+    def get(self, emails: Iterable[str]) -> pd.DataFrame:
+        """
+        Returns the archived records for these emails (case-insensitive).
+        """
+        import pandas as pd
+
+        emails = [e.strip().lower() for e in emails]
+        records = []
+        with self._db() as conn:
+            # SQLite caps the number of ? per statement
+            for start in range(0, len(emails), 500):
+                chunk = emails[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT record FROM archived_candidates WHERE email IN ({', '.join('?' for _ in chunk)})",
+                    chunk
+                )
+                records.extend(json.loads(row[0]) for row in rows)
+        return pd.DataFrame(records)
+
+    def read_columns(self, columns: List[str]) -> pd.DataFrame:
+        """
+        Returns these columns for every archived candidate (missing ones are blank).
+        """
+        import pandas as pd
+
+        with self._db() as conn:
+            records = [json.loads(row[0]) for row in conn.execute("SELECT record FROM archived_candidates")]
+        if not records:
+            return pd.DataFrame(columns=columns)
+        return pd.DataFrame(records).reindex(columns=columns).fillna("")
+
+
+def read_all_columns(store: CandidateStore, archive: CandidateArchive, columns: List[str]) -> pd.DataFrame:
+    """
+    These columns for working and archived candidates together. If an
+    email is in both (e.g. re-added after archiving), the working row wins.
+    """
+    import pandas as pd
+
+    working = store.read_columns(columns)
+    archived = archive.read_columns(columns)
+    if len(archived) == 0:
+        return working
+    if len(working) == 0:
+        return archived
+
+    both = pd.concat([working, archived], ignore_index=True)
+    if "Email" not in both.columns:
+        return both
+    return both[~both["Email"].astype(str).str.strip().str.lower().duplicated()]
+
+
+def select_closed(
+    df: pd.DataFrame,
+    max_age_days: int = ARCHIVE_AFTER_DAYS,
+    statuses: Iterable[str] = ARCHIVE_STATUSES,
+    today: Optional[date] = None,
+) -> pd.DataFrame:
+    """
+    The candidates that are closed and whose last activity is older than
+    max_age_days. Candidates with no readable date are kept (age unknown).
+    """
+    import pandas as pd
+
+    if len(df) == 0 or "Status" not in df.columns:
+        return df.iloc[0:0]
+
+    cutoff = pd.Timestamp((today or date.today()) - timedelta(days=max_age_days))
+    dates = [
+        pd.to_datetime(df[column].astype(str).str.slice(0, 10), format="%Y-%m-%d", errors="coerce")
+        for column in ACTIVITY_COLUMNS if column in df.columns
+    ]
+    if not dates:
+        return df.iloc[0:0]
+
+    last_activity = pd.concat(dates, axis=1).max(axis=1)
+    return df[df["Status"].isin(list(statuses)) & (last_activity < cutoff)]
+
+
+def archive_closed_candidates(
+    connector: Optional[SheetsConnector] = None,
+    archive: Optional[CandidateArchive] = None,
+    max_age_days: int = ARCHIVE_AFTER_DAYS,
+    statuses: Iterable[str] = ARCHIVE_STATUSES,
+    dry_run: bool = False,
+) -> Dict[str, object]:
+    """
+    Moves old closed candidates from the sheet into the archive.
+
+    Records are appended to the ARCHIVE_SHEET tab before their rows are
+    deleted, so a failure part-way leaves a candidate in both (the
+    working row wins everywhere) - never in neither. Running it again
+    finishes the job. An email with several rows is only archived when
+    all of them qualify; then every row goes to the tab and every row is
+    deleted.
+
+    Returns:
+        dict with 'candidates' (rows checked), 'archived', 'deleted',
+        'emails' (the ones selected) and 'skipped' (emails with a row
+        that isn't ready to archive)
+    """
+    if connector is None:
+        from utils.sheets_connector import get_connector
+        connector = get_connector()
+    archive = archive or get_candidate_archive()
+
+    df = connector.get_all_candidates()
+    closed = select_closed(df, max_age_days, statuses)
+    skipped: List[str] = []
+    if len(closed):
+        # Rows of an email that stay behind (still open, or recent) keep all its rows in the sheet
+        rows_per_email = df["Email"].astype(str).value_counts()
+        closed_per_email = closed["Email"].astype(str).value_counts()
+        partly = closed_per_email.index[closed_per_email < rows_per_email.reindex(closed_per_email.index)]
+        skipped = partly.tolist()
+        closed = closed[~closed["Email"].astype(str).isin(skipped)]
+    emails = closed["Email"].astype(str).drop_duplicates().tolist() if len(closed) else []
+    report = {"candidates": len(df), "archived": 0, "deleted": 0, "emails": emails, "skipped": skipped}
+
+    if dry_run or not emails:
+        return report
+
+    worksheet = connector.archive_worksheet()
+    if worksheet is None:
+        raise Exception(f"❌ No '{ARCHIVE_SHEET}' tab to archive to - this connector has no spreadsheet")
+
+    now = time.time()
+    records = closed.astype(object).where(closed.notna(), "").to_dict("records")
+    # The tab first: once this returns the records are safe, and shared with every process
+    worksheet.append_rows([_archive_row(record, now) for record in records])
+    # First row per email in the local copy, the same one refresh() keeps
+    report["archived"] = archive.add(list({str(r["Email"]).strip().lower(): r for r in reversed(records)}.values()))
+    report["deleted"] = connector.delete_candidates(emails, all_rows=True)
+    print(f"🗄️ Archived {report['archived']} closed candidate(s), deleted {report['deleted']} sheet row(s)")
+    return report
+
+
+_archive_instances: Dict[str, CandidateArchive] = {}
+_archive_lock = threading.Lock()
+
+def get_candidate_archive() -> CandidateArchive:
+    """
+    Returns the current tenant's CandidateArchive.
+    """
+    tenant = current_tenant()
+
+    with _archive_lock:
+        if tenant.tenant_id not in _archive_instances:
+            _archive_instances[tenant.tenant_id] = CandidateArchive(tenant.data_path("archive.db", ARCHIVE_PATH))
+
+        return _archive_instances[tenant.tenant_id]
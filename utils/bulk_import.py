@@ -0,0 +1,188 @@
+from __future__ import annotations
+import re
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, TYPE_CHECKING
+from utils.config import env
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+IMPORT_CHUNK_SIZE = int(env("IMPORT_CHUNK_SIZE", "1000"))
+# Rows per append_rows call - one API request each
+IMPORT_BATCH_SIZE = int(env("IMPORT_BATCH_SIZE", "500"))
+
+# What to do with rows that look like a candidate already in the sheet:
+# "flag" (import, list them in the report), "skip" (reject them) or "off"
+IMPORT_DUPLICATES = env("IMPORT_DUPLICATES", "flag")
+
+REQUIRED_COLUMNS = ["Name", "Email"]
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+def _read_chunks(source, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Yields the file as DataFrames of up to chunk_size rows, all values as text.
+
+    Args:
+        source: Path, or a file-like object with a .name (e.g. Streamlit upload)
+    """
+    import pandas as pd
+
+    name = source if isinstance(source, str) else getattr(source, "name", "")
+
+    if name.lower().endswith((".xlsx", ".xlsm")):
+        # openpyxl's read-only mode streams rows instead of loading the whole workbook
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(source, read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(h).strip() if h is not None else "" for h in next(rows, [])]
+
+        chunk = []
+        for row in rows:
+            chunk.append(["" if v is None else str(v).strip() for v in row])
+            if len(chunk) >= chunk_size:
+                yield pd.DataFrame(chunk, columns=header)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=header)
+        workbook.close()
+    else:
+        for chunk in pd.read_csv(source, chunksize=chunk_size, dtype=str, keep_default_na=False):
+            chunk.columns = [str(c).strip() for c in chunk.columns]
+            yield chunk.apply(lambda col: col.str.strip())
+
+
+def import_candidates(
+    source,
+    connector=None,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    default_status: str = "Screening",
+    duplicates: str = IMPORT_DUPLICATES
+) -> Dict[str, object]:
+    """
+    Imports candidates from a CSV or Excel file into the sheet.
+
+    - Reads the file in chunks, so big files don't sit in memory at once
+    - Skips rows without Name/Email, with a malformed Email, or whose
+      Email is already in the sheet (or earlier in the same file)
+    - Checks the rest against the sheet and the file so far for the same
+      person under another email or a misspelt name (utils/dedup.py)
+    - Writes with append_rows, batch_size rows per API call
+
+    Args:
+        source: Path or uploaded file (.csv / .xlsx)
+        connector: SheetsConnector to write to (default: get_connector())
+        chunk_size: Rows read from the file at a time
+        batch_size: Rows per append_rows call
+        default_status: Status for rows without one
+        duplicates: "flag", "skip" or "off" (see IMPORT_DUPLICATES)
+
+    Returns:
+        dict with 'imported', 'rejected' (list of {'row', 'email', 'reason'}),
+        'duplicates' (list of {'row', 'email', 'duplicate_of', 'score', 'reason'}),
+        'total_rows', 'api_calls', 'seconds' and 'rows_per_second'
+    """
+    if connector is None:
+        from utils.sheets_connector import get_connector
+        connector = get_connector()
+
+    started = time.time()
+
+    headers = connector.worksheet.row_values(1)
+    duplicate_index = None
+    if duplicates == "off":
+        existing_emails = {email.strip().lower() for email in connector.get_email_index(headers)}
+    else:
+        # Names and phones too - the whole table instead of just the Email column
+        from utils.dedup import DuplicateIndex
+
+        existing = connector.get_all_candidates()
+        existing_emails = {str(email).strip().lower() for email in existing.get('Email', [])}
+        duplicate_index = DuplicateIndex()
+        for record in existing.to_dict("records"):
+            duplicate_index.add(record)
+    api_calls = 2
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    imported = 0
+    total_rows = 0
+    rejected: List[Dict[str, object]] = []
+    flagged: List[Dict[str, object]] = []
+    pending: List[Dict[str, str]] = []
+
+    def _write(rows):
+        nonlocal imported, api_calls
+        added = connector.add_candidates(rows, headers=headers)
+        api_calls += 1
+        if added == 0:
+            for row in rows:
+                rejected.append({"row": row["_source_row"], "email": row["Email"], "reason": "Write to sheet failed"})
+        imported += added
+
+    for chunk in _read_chunks(source, chunk_size):
+        missing = [c for c in REQUIRED_COLUMNS if c not in chunk.columns]
+        if missing:
+            raise ValueError(f"❌ Import file is missing column(s): {', '.join(missing)}")
+
+        for record in chunk.to_dict("records"):
+            total_rows += 1
+            # +1 for the header line, so this matches the row number in Excel
+            source_row = total_rows + 1
+            email = record.get("Email", "")
+            key = email.lower()
+
+            if not record.get("Name") or not email:
+                reason = "Missing Name or Email"
+            elif not EMAIL_PATTERN.match(email):
+                reason = "Invalid Email"
+            elif key in existing_emails:
+                reason = "Duplicate Email"
+            else:
+                reason = None
+
+            if reason is None and duplicate_index is not None:
+                match = duplicate_index.match(record)
+                if match is not None:
+                    duplicate_of, score, why = match
+                    if duplicates == "skip":
+                        reason = f"Possible duplicate of {duplicate_of} ({why}, {score})"
+                    else:
+                        flagged.append({"row": source_row, "email": email, "duplicate_of": duplicate_of, "score": score, "reason": why})
+
+            if reason:
+                rejected.append({"row": source_row, "email": email, "reason": reason})
+                continue
+
+            existing_emails.add(key)
+            if duplicate_index is not None:
+                duplicate_index.add(record)
+            record.setdefault("Status", "")
+            record.setdefault("Applied_Date", "")
+            record["Status"] = record["Status"] or default_status
+            record["Applied_Date"] = record["Applied_Date"] or today
+            record["_source_row"] = source_row
+            pending.append(record)
+
+            if len(pending) >= batch_size:
+                _write(pending)
+                pending = []
+
+    if pending:
+        _write(pending)
+
+    seconds = time.time() - started
+    print(f"✅ Imported {imported} candidate(s), rejected {len(rejected)} in {seconds:.1f}s")
+
+    return {
+        "imported": imported,
+        "rejected": rejected,
+        "duplicates": flagged,
+        "total_rows": total_rows,
+        "api_calls": api_calls,
+        "seconds": round(seconds, 2),
+        "rows_per_second": round(total_rows / seconds, 1) if seconds > 0 else float(total_rows),
+    }
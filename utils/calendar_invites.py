@@ -0,0 +1,261 @@
+"""
+Calendar invites (ICS) for scheduled interviews, and reminders the day before.
+
+Scheduling used to only write L1_Date/L1_Time to the sheet. Now every
+scheduling write (Scheduler page, POST /schedule, Fill Gaps) also emails
+the candidate an invite, with the interviewer on Cc - the optional
+L1_Interviewer / L2_Interviewer column, else the tenant's HR inbox.
+Each candidate/round keeps one event UID, so a moved interview updates
+the calendar entry instead of adding a second one.
+
+All invites of one scheduling run go out together through
+send_messages() (a few pooled SMTP connections), on a background thread.
+
+Reminders: scripts/send_reminders.py (daily, from cron) picks the next
+day's interviews from the candidate store's date index.
+"""
+from __future__ import annotations
+import time
+from datetime import date, datetime, timedelta, timezone
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Dict, List, Optional, TYPE_CHECKING
+from utils.config import env
+from utils.email_sender import SMTP_EMAIL, send_messages
+from utils.tenants import current_tenant, start_thread
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from utils.tenants import Tenant
+
+
+INTERVIEW_DURATION_MINUTES = int(env("INTERVIEW_DURATION_MINUTES", "60"))
+# Time zone of the TIME_SLOTS in the sheet
+INTERVIEW_TIMEZONE = env("INTERVIEW_TIMEZONE", "Asia/Kolkata")
+
+
+def _escape(text) -> str:
+    # RFC 5545 TEXT values
+    return (
+        str(text).replace("\\", "\\\\").replace(";", "\\;")
+        .replace(",", "\\,").replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    # Lines longer than 75 octets continue on the next line after a space
+    raw = line.encode("utf-8")
+    if len(raw) <= 75:
+        return line
+
+    parts, start = [], 0
+    while start < len(raw):
+        end = min(start + (75 if not parts else 74), len(raw))
+        # Don't split a multi-byte character
+        while end < len(raw) and (raw[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(raw[start:end].decode("utf-8"))
+        start = end
+    return "\r\n ".join(parts)
+
+
+def _ics_time(value: datetime) -> str:
+    if value.tzinfo is None:
+        # No time zone data on this machine - a "floating" local time
+        return value.strftime("%Y%m%dT%H%M%S")
+    return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def interview_start(date_str: str, slot: str) -> datetime:
+    """
+    When a sheet date ("2025-01-15") + slot ("2:00 PM") starts, in INTERVIEW_TIMEZONE.
+    """
+    start = datetime.strptime(f"{date_str} {slot}", "%Y-%m-%d %I:%M %p")
+    try:
+        from zoneinfo import ZoneInfo
+        return start.replace(tzinfo=ZoneInfo(INTERVIEW_TIMEZONE))
+    except Exception:
+        return start
+
+
+def interviewer_for(candidate: Dict, interview_type: str, tenant: Optional[Tenant] = None) -> str:
+    """
+    The interviewer's email: the {type}_Interviewer column if filled, else the tenant's HR inbox.
+    """
+    interviewer = str(candidate.get(f"{interview_type}_Interviewer", "") or "").strip()
+    return interviewer or (tenant or current_tenant()).hr_email or ""
+
+
+def build_invite(
+    candidate: Dict,
+    interview_type: str,
+    company_name: str,
+    interviewer: str = "",
+    organizer: Optional[str] = None
+) -> str:
+    """
+    One VEVENT invite (METHOD:REQUEST) for this candidate's interview.
+
+    Args:
+        candidate: Sheet row with Email, Name, Role and {type}_Date/{type}_Time
+        interview_type: "L1" or "L2"
+    """
+    organizer = organizer or SMTP_EMAIL or interviewer
+    email = str(candidate["Email"])
+    start = interview_start(str(candidate[f"{interview_type}_Date"]), str(candidate[f"{interview_type}_Time"]))
+    end = start + timedelta(minutes=INTERVIEW_DURATION_MINUTES)
+    role = candidate.get("Role", "")
+    name = candidate.get("Name", "") or email
+
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//HR Assistant//Interview Scheduler//EN",
+        "METHOD:REQUEST",
+        "BEGIN:VEVENT",
+        # Same UID for every invite of this candidate/round - a newer SEQUENCE replaces the old one
+        f"UID:{interview_type}-{email}@hr-assistant",
+        f"SEQUENCE:{int(time.time())}",
+        f"DTSTAMP:{_ics_time(datetime.now(timezone.utc))}",
+        f"DTSTART:{_ics_time(start)}",
+        f"DTEND:{_ics_time(end)}",
+        f"SUMMARY:{_escape(f'{interview_type} Interview - {company_name}' + (f' ({role})' if role else ''))}",
+        f"DESCRIPTION:{_escape(f'{interview_type} interview with {name} for the {role or company_name} role.')}",
+        f"ORGANIZER;CN={_escape(company_name)}:mailto:{organizer}",
+        f"ATTENDEE;CN={_escape(name)};ROLE=REQ-PARTICIPANT;RSVP=TRUE:mailto:{email}",
+    ]
+    if interviewer and interviewer != email:
+        lines.append(f"ATTENDEE;CN=Interviewer;ROLE=REQ-PARTICIPANT:mailto:{interviewer}")
+    lines += ["STATUS:CONFIRMED", "END:VEVENT", "END:VCALENDAR"]
+
+    return "\r\n".join(_fold(line) for line in lines) + "\r\n"
+
+
+def invite_message(
+    candidate: Dict,
+    interview_type: str,
+    tenant: Optional[Tenant] = None,
+    reminder: bool = False
+) -> MIMEMultipart:
+    """
+    The email for one invite (or reminder): a short text plus the .ics.
+    """
+    tenant = tenant or current_tenant()
+    interviewer = interviewer_for(candidate, interview_type, tenant)
+    date_str = str(candidate[f"{interview_type}_Date"])
+    slot = str(candidate[f"{interview_type}_Time"])
+    first_name = str(candidate.get("Name", "") or "").split(" ")[0] or "there"
+
+    if reminder:
+        subject = f"Reminder: your {interview_type} interview with {tenant.company_name} is tomorrow at {slot}"
+        body = f"Hi {first_name},\n\nA reminder that your {interview_type} interview is on {date_str} at {slot}.\n\nSee you then!\n{tenant.company_name} HR"
+    else:
+        subject = f"{interview_type} Interview with {tenant.company_name} - {date_str} {slot}"
+        body = f"Hi {first_name},\n\nYour {interview_type} interview is scheduled for {date_str} at {slot}. The calendar invite is attached.\n\nBest,\n{tenant.company_name} HR"
+
+    msg = MIMEMultipart("mixed")
+    msg["From"] = SMTP_EMAIL
+    msg["To"] = str(candidate["Email"])
+    if interviewer and interviewer != msg["To"]:
+        msg["Cc"] = interviewer
+    msg["Subject"] = subject
+    msg.attach(MIMEText(body, "plain"))
+
+    invite = MIMEText(build_invite(candidate, interview_type, tenant.company_name, interviewer), "calendar", "utf-8")
+    invite.set_param("method", "REQUEST")
+    invite.add_header("Content-Disposition", "attachment", filename="invite.ics")
+    msg.attach(invite)
+    return msg
+
+
+def _planned_interviews(plan: Dict[str, Dict[str, str]], all_candidates: pd.DataFrame) -> List[tuple]:
+    # (candidate row with the plan applied, interview type) for every booking in the plan
+    rows = all_candidates[all_candidates['Email'].isin(list(plan))].drop_duplicates('Email')
+    planned = []
+    for candidate in rows.to_dict('records'):
+        updates = plan[candidate['Email']]
+        for interview_type in ("L1", "L2"):
+            if updates.get(f"{interview_type}_Date") and updates.get(f"{interview_type}_Time"):
+                planned.append(({**candidate, **updates}, interview_type))
+    return planned
+
+
+def send_interview_invites(
+    plan: Dict[str, Dict[str, str]],
+    all_candidates: pd.DataFrame,
+    tenant: Optional[Tenant] = None
+) -> int:
+    """
+    Emails an invite for every interview a scheduling plan booked or moved.
+
+    Args:
+        plan: email -> column updates, as given to batch_update_candidates
+        all_candidates: The table the plan was made from (names, roles, interviewers)
+
+    Returns:
+        int: Invites sent
+    """
+    if not SMTP_EMAIL:
+        print("⚠️ SMTP_EMAIL not set - no interview invites sent")
+        return 0
+
+    tenant = tenant or current_tenant()
+    messages = [
+        invite_message(candidate, interview_type, tenant)
+        for candidate, interview_type in _planned_interviews(plan, all_candidates)
+    ]
+    if not messages:
+        return 0
+
+    sent = send_messages(messages)
+    print(f"✅ Sent {sent}/{len(messages)} interview invites")
+    return sent
+
+
+def send_invites_in_background(plan: Dict[str, Dict[str, str]], all_candidates: pd.DataFrame):
+    """
+    send_interview_invites() on a background thread, so the page doesn't wait on SMTP.
+    """
+    tenant = current_tenant()
+    start_thread(lambda: send_interview_invites(plan, all_candidates, tenant), name="interview-invites")
+
+
+def send_interview_reminders(day: Optional[date] = None, dry_run: bool = False) -> Dict:
+    """
+    Emails a reminder (with the invite again) for every interview on `day`
+    (default: tomorrow), for the current tenant.
+
+    The candidate store is refreshed from Sheets first, then the day's
+    interviews are looked up by L1_Date/L2_Date index.
+
+    Returns:
+        {'date', 'interviews': [(email, type, slot)], 'sent'}
+    """
+    from utils.candidate_store import get_candidate_store
+    from utils.sheets_connector import get_connector
+
+    day = day or (datetime.now().date() + timedelta(days=1))
+    date_str = day.strftime("%Y-%m-%d")
+
+    store = get_candidate_store()
+    store.refresh(get_connector().get_all_candidates, force=True)
+    interviews = store.interviews_on(date_str)
+
+    report = {
+        "date": date_str,
+        "interviews": [
+            (row['Email'], row['Interview'], row[f"{row['Interview']}_Time"])
+            for row in interviews.to_dict('records')
+        ],
+        "sent": 0
+    }
+    if dry_run or len(interviews) == 0:
+        return report
+
+    tenant = current_tenant()
+    messages = [
+        invite_message(row, row['Interview'], tenant, reminder=True)
+        for row in interviews.to_dict('records')
+    ]
+    report["sent"] = send_messages(messages)
+    return report
@@ -0,0 +1,100 @@
+from __future__ import annotations
+import threading
+import time
+from typing import Callable, Dict, Optional, TYPE_CHECKING
+from utils.config import env
+from utils.tenants import current_tenant
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+CANDIDATE_CACHE_TTL_SECONDS = float(env("CANDIDATE_CACHE_TTL_SECONDS", "30"))
+
+
+class CandidateCache:
+    """
+    Keeps the candidate table in memory and shares it between callers.
+
+    - Only one caller at a time pulls from Sheets; everyone else waits for
+      that pull instead of starting their own
+    - Writes we make ourselves are patched into the cached table
+      (apply_updates), so reads stay correct without another full pull
+    - The table's age comes from df.attrs['fetched_at'] when the loader
+      sets it (a snapshot may be older than the moment it was loaded)
+
+    Args:
+        loader: Returns the candidate table
+        fresh_loader: Used for get(force_refresh=True) - must go to Sheets
+            (default: loader)
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], pd.DataFrame],
+        ttl_seconds: float = CANDIDATE_CACHE_TTL_SECONDS,
+        fresh_loader: Optional[Callable[[], pd.DataFrame]] = None
+    ):
+        self.loader = loader
+        self.fresh_loader = fresh_loader or loader
+        self.ttl_seconds = ttl_seconds
+        self._df: Optional[pd.DataFrame] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, force_refresh: bool = False) -> pd.DataFrame:
+        """
+        Returns the cached table, pulling from Sheets if it's older than the TTL.
+
+        Callers get a copy, so they can filter/modify it freely.
+        """
+        with self._lock:
+            stale = time.time() - self._loaded_at > self.ttl_seconds
+            if self._df is None or stale or force_refresh:
+                self._df = self.fresh_loader() if force_refresh else self.loader()
+                self._loaded_at = self._df.attrs.get("fetched_at", time.time())
+            return self._df.copy()
+
+    def invalidate(self):
+        with self._lock:
+            self._df = None
+
+    def apply_updates(self, updates: Dict[str, Dict[str, str]]):
+        """
+        Patches written values into the cached table (email -> {column: value}).
+        """
+        with self._lock:
+            if self._df is None or len(self._df) == 0:
+                return
+
+            for email, columns in updates.items():
+                mask = self._df['Email'] == email
+                for column_name, value in columns.items():
+                    if column_name not in self._df.columns:
+                        continue
+                    # Sheets values come back as numbers too - don't let pandas reject a string
+                    if self._df[column_name].dtype != object:
+                        self._df[column_name] = self._df[column_name].astype(object)
+                    self._df.loc[mask, column_name] = value
+
+
+_candidate_cache_instances: Dict[str, CandidateCache] = {}
+_candidate_cache_lock = threading.Lock()
+
+def get_candidate_cache() -> CandidateCache:
+    """
+    Returns the current tenant's CandidateCache, backed by its local
+    snapshot (utils/snapshot.py) and get_connector().
+    """
+    tenant = current_tenant()
+
+    with _candidate_cache_lock:
+        if tenant.tenant_id not in _candidate_cache_instances:
+            from utils.sheets_connector import get_connector
+            from utils.snapshot import load_candidates_fast
+            _candidate_cache_instances[tenant.tenant_id] = CandidateCache(
+                loader=lambda: load_candidates_fast(max_age_seconds=CANDIDATE_CACHE_TTL_SECONDS),
+                fresh_loader=lambda: get_connector().get_all_candidates()
+            )
+
+        return _candidate_cache_instances[tenant.tenant_id]
@@ -0,0 +1,51 @@
+from __future__ import annotations
+import re
+from typing import Dict, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# "123.0" - how a number in a column with blanks comes back (float)
+_INTEGRAL_FLOAT = re.compile(r"^(-?\d+)\.0+$")
+
+
+def diff_candidates(original: pd.DataFrame, edited: pd.DataFrame, key: str = 'Email') -> Dict[str, Dict[str, str]]:
+    """
+    Finds every changed cell between two versions of the candidate table.
+
+    Compares all columns at once (no row-by-row loop). Rows are matched by
+    index, and each change is keyed by the ORIGINAL email, so editing the
+    Email column itself still finds the right row in the sheet.
+
+    Args:
+        original: Table as loaded (e.g. the DataFrame passed to st.data_editor)
+        edited: Table after editing (same index)
+        key: Column that identifies a candidate
+
+    Returns:
+        dict of email -> {column: new_value}, ready for
+        SheetsConnector.batch_update_candidates
+    """
+    columns = [c for c in edited.columns if c in original.columns]
+    rows = edited.index.intersection(original.index)
+
+    # Compare as text - Sheets gives back 10 for "10", and NaN for empty cells
+    before = original.loc[rows, columns].fillna('').astype(str)
+    after = edited.loc[rows, columns].fillna('').astype(str)
+
+    changed = before.ne(after)
+    if not changed.to_numpy().any():
+        return {}
+
+    keys = original.loc[rows, key]
+    updates: Dict[str, Dict[str, str]] = {}
+    for column_name in changed.columns[changed.any()]:
+        mask = changed[column_name]
+        # 123 vs 123.0 is the same number, not an edit
+        old = before.loc[mask, column_name].str.replace(_INTEGRAL_FLOAT, r"\1", regex=True)
+        new = after.loc[mask, column_name].str.replace(_INTEGRAL_FLOAT, r"\1", regex=True)
+        edited_cells = old.ne(new)
+        for email, value in zip(keys[mask][edited_cells], new[edited_cells]):
+            updates.setdefault(email, {})[column_name] = value
+
+    return updates
@@ -0,0 +1,311 @@
+from __future__ import annotations
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+from utils.config import env, LOCAL_DATA_DIR
+from utils.tenants import current_tenant
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+CANDIDATE_STORE_PATH = env("CANDIDATE_STORE_PATH", os.path.join(LOCAL_DATA_DIR, "candidates.db"))
+
+# Columns that get an index - what the pages filter on, Email for updates,
+# interview dates for the reminder job
+INDEXED_COLUMNS = ["Status", "Role", "Email", "L1_Date", "L2_Date"]
+
+
+class CandidateStore:
+    """
+    Local SQLite copy of the candidate sheet, for paging/sorting/filtering.
+
+    Google Sheets is still the source of truth - sync() replaces the local
+    copy with a fresh pull. Pages then ask for one page of rows at a time
+    instead of sending the whole table to the browser.
+
+    Every row keeps its position in the pulled table in the "_row" column
+    (2 for the first candidate). That is the sheet row for a single sheet,
+    but not for a sharded table, so it is only used for "Sheet order" -
+    writes always go by email.
+    """
+
+    def __init__(self, db_path: str = CANDIDATE_STORE_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        folder = os.path.dirname(self.db_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        with self._db() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _db(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    @staticmethod
+    def _quote(column: str) -> str:
+        return '"' + column.replace('"', '""') + '"'
+
+    # ============================================
+    # SYNC FROM GOOGLE SHEETS
+    # ============================================
+
+    def sync(self, df: pd.DataFrame):
+        """
+        Replaces the local copy with this table (as returned by get_all_candidates).
+
+        The new table is built on the side and swapped in one transaction,
+        so readers never see a half-written copy.
+        """
+        columns = [str(c) for c in df.columns]
+        column_sql = "".join(f", {self._quote(c)}" for c in columns)
+        placeholders = "".join(", ?" for _ in columns)
+
+        # Row 1 is the header, so the first candidate is sheet row 2
+        rows = [
+            (row_number,) + tuple(values)
+            for row_number, values in enumerate(
+                df.astype(object).where(df.notna(), None).itertuples(index=False, name=None),
+                start=2
+            )
+        ]
+
+        with self._lock, self._db() as conn:
+            conn.execute("DROP TABLE IF EXISTS candidates_new")
+            conn.execute(f"CREATE TABLE candidates_new (_row INTEGER PRIMARY KEY{column_sql})")
+            conn.executemany(
+                f"INSERT INTO candidates_new (_row{column_sql}) VALUES (?{placeholders})",
+                rows
+            )
+
+            conn.execute("DROP TABLE IF EXISTS candidates")
+            conn.execute("ALTER TABLE candidates_new RENAME TO candidates")
+            for column in INDEXED_COLUMNS:
+                if column in columns:
+                    conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS idx_candidates_{column.lower()} "
+                        f"ON candidates ({self._quote(column)})"
+                    )
+
+            # A snapshot's data is as old as the pull that made it, not now
+            conn.execute(
+                "INSERT OR REPLACE INTO store_meta VALUES ('synced_at', ?)",
+                (str(df.attrs.get("fetched_at", time.time())),)
+            )
+
+    def apply_updates(self, updates: Dict[str, Dict[str, str]]):
+        """
+        Patches values we just wrote to Sheets into the local copy
+        (email -> {column: value}), so the next render is correct without a re-sync.
+        """
+        known = set(self.columns())
+
+        with self._lock, self._db() as conn:
+            for email, columns in updates.items():
+                for column, value in columns.items():
+                    if column in known:
+                        conn.execute(
+                            f"UPDATE candidates SET {self._quote(column)} = ? WHERE Email = ?",
+                            (value, email)
+                        )
+
+    def synced_at(self) -> Optional[float]:
+        with self._db() as conn:
+            row = conn.execute("SELECT value FROM store_meta WHERE key = 'synced_at'").fetchone()
+        return float(row[0]) if row else None
+
+    def refresh(self, loader: Callable[[], pd.DataFrame], max_age_seconds: float = 60, force: bool = False) -> bool:
+        """
+        Syncs from loader() if the local copy is older than max_age_seconds.
+
+        Returns:
+            bool: True if a sync happened
+        """
+        synced_at = self.synced_at()
+        if not force and synced_at is not None and time.time() - synced_at < max_age_seconds:
+            return False
+
+        df = loader()
+        # Same snapshot as last time (its background refresh hasn't landed yet)
+        if not force and synced_at is not None and df.attrs.get("fetched_at") == synced_at:
+            return False
+
+        self.sync(df)
+        return True
+
+    # ============================================
+    # QUERIES
+    # ============================================
+
+    def columns(self) -> List[str]:
+        with self._db() as conn:
+            info = conn.execute("PRAGMA table_info(candidates)").fetchall()
+        return [row[1] for row in info]
+
+    def _where(self, filters: Dict[str, Optional[str]], emails: Optional[List[str]] = None) -> Tuple[str, list]:
+        clauses, params = [], []
+
+        if emails is not None:
+            clauses.append(f"LOWER(Email) IN ({', '.join('?' for _ in emails)})" if emails else "0")
+            params.extend(email.lower() for email in emails)
+        known = set(self.columns())
+
+        for column, value in filters.items():
+            if value is None or value == "All":
+                continue
+            if column not in known:
+                raise ValueError(f"❌ Unknown column '{column}'")
+            clauses.append(f"{self._quote(column)} = ?")
+            params.append(value)
+
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        return where, params
+
+    def query(
+        self,
+        filters: Optional[Dict[str, Optional[str]]] = None,
+        sort_by: Optional[str] = None,
+        ascending: bool = True,
+        page: int = 1,
+        page_size: int = 50,
+        emails: Optional[List[str]] = None
+    ) -> Tuple[pd.DataFrame, int]:
+        """
+        Returns one page of candidates plus the total number of matches.
+
+        Args:
+            filters: Column -> value (exact match). None / "All" means no filter.
+                Example: {"Status": "Screening", "Role": "Backend Engineer"}
+            sort_by: Column to sort by (default: sheet order)
+            ascending: Sort direction
+            page: 1-based page number
+            page_size: Rows per page
+            emails: Only these candidates (case-insensitive), e.g. search results
+
+        Returns:
+            (DataFrame indexed by sheet row number, total matching rows)
+        """
+        where, params = self._where(filters or {}, emails)
+
+        order_column = "_row"
+        if sort_by:
+            if sort_by not in self.columns():
+                raise ValueError(f"❌ Unknown column '{sort_by}'")
+            order_column = sort_by
+        order = f"ORDER BY {self._quote(order_column)} {'ASC' if ascending else 'DESC'}, _row"
+
+        import pandas as pd
+
+        offset = max(page - 1, 0) * page_size
+
+        with self._db() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM candidates {where}", params).fetchone()[0]
+            page_df = pd.read_sql_query(
+                f"SELECT * FROM candidates {where} {order} LIMIT ? OFFSET ?",
+                conn,
+                params=params + [page_size, offset]
+            )
+
+        return page_df.set_index("_row"), total
+
+    def count(self, filters: Optional[Dict[str, Optional[str]]] = None, emails: Optional[List[str]] = None) -> int:
+        """
+        Returns how many candidates match the filters (same format as query).
+        """
+        where, params = self._where(filters or {}, emails)
+        with self._db() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM candidates {where}", params).fetchone()[0]
+
+    def read_columns(self, columns: List[str]) -> pd.DataFrame:
+        """
+        Returns these columns for every candidate (unknown columns are skipped).
+        """
+        import pandas as pd
+
+        known = [c for c in columns if c in self.columns()]
+        if not known:
+            return pd.DataFrame()
+        with self._db() as conn:
+            return pd.read_sql_query(
+                f"SELECT {', '.join(self._quote(c) for c in known)} FROM candidates ORDER BY _row",
+                conn
+            )
+
+    def interviews_on(self, date_str: str) -> pd.DataFrame:
+        """
+        Returns the L1/L2 interviews booked on this day ("2025-01-15"),
+        looked up by the date indexes. The "Interview" column says which round.
+        """
+        import pandas as pd
+
+        known = set(self.columns())
+        selects, params = [], []
+        for interview_type in ("L1", "L2"):
+            if f"{interview_type}_Date" in known and "Status" in known:
+                selects.append(
+                    f"SELECT '{interview_type}' AS Interview, * FROM candidates "
+                    f"WHERE {interview_type}_Date = ? AND Status = ?"
+                )
+                params += [date_str, f"{interview_type}_Scheduled"]
+        if not selects:
+            return pd.DataFrame()
+
+        with self._db() as conn:
+            df = pd.read_sql_query(" UNION ALL ".join(selects) + " ORDER BY _row", conn, params=params)
+        return df.set_index("_row")
+
+    def distinct_values(self, column: str) -> List[str]:
+        """
+        Returns the distinct values of a column (e.g. all roles), sorted.
+        """
+        if column not in self.columns():
+            return []
+        with self._db() as conn:
+            rows = conn.execute(
+                f"SELECT DISTINCT {self._quote(column)} FROM candidates ORDER BY 1"
+            ).fetchall()
+        return [r[0] for r in rows if r[0] not in (None, "")]
+
+    def count_by(self, column: str = "Status") -> Dict[str, int]:
+        """
+        Returns {value: count}, e.g. {"Screening": 12, "L1_Scheduled": 4}.
+        """
+        if column not in self.columns():
+            return {}
+        with self._db() as conn:
+            rows = conn.execute(
+                f"SELECT {self._quote(column)}, COUNT(*) FROM candidates GROUP BY 1"
+            ).fetchall()
+        return {r[0]: r[1] for r in rows}
+
+    def total(self) -> int:
+        if not self.columns():
+            return 0
+        with self._db() as conn:
+            return conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+
+_store_instances: Dict[str, CandidateStore] = {}
+_store_lock = threading.Lock()
+
+def get_candidate_store() -> CandidateStore:
+    """
+    Returns the current tenant's CandidateStore (utils/tenants.py).
+
+    Usage:
+        from utils.candidate_store import get_candidate_store
+        store = get_candidate_store()
+        store.refresh(get_connector().get_all_candidates)
+        page_df, total = store.query({"Status": "Screening"}, page=1, page_size=50)
+    """
+    tenant = current_tenant()
+
+    with _store_lock:
+        if tenant.tenant_id not in _store_instances:
+            _store_instances[tenant.tenant_id] = CandidateStore(tenant.data_path("candidates.db", CANDIDATE_STORE_PATH))
+
+        return _store_instances[tenant.tenant_id]
@@ -0,0 +1,24 @@
+"""
+Settings from the .env file.
+
+The .env file is read ONCE, the first time any module imports from here,
+instead of every utils module calling load_dotenv() on its own.
+
+Usage:
+    from utils.config import env
+    SHEET_NAME = env('SHEET_NAME', 'Recruitment_Pipeline')
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Folder for the local SQLite files (alerts, message cache, candidate store)
+LOCAL_DATA_DIR = os.getenv("LOCAL_DATA_DIR", "local_data")
+
+
+def env(name: str, default=None):
+    """
+    Returns a setting from the environment / .env file.
+    """
+    return os.getenv(name, default)
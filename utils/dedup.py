@@ -0,0 +1,465 @@
+"""
+Finding candidates who are in the table twice.
+
+People reapply with another email address or a typo in their name, and
+update_candidate_status() then updates whichever row it finds first.
+Comparing every pair of rows doesn't scale (100k rows = 5 billion
+pairs), and a common name says nothing on its own (there are hundreds
+of "Priya Sharma"s) - so two rows are only compared if they share a
+strong key:
+- the phone number (digits only, last 10)
+- the email local part ("arjun.s+jobs@gmail.com" -> "arjuns"), which
+  also catches the same address at another domain
+
+Pairs that share a key are scored on name similarity, word by word
+(a word's Soundex counts too, so "Arjun Sharma" and "Arjunn Sarma"
+match). find_duplicates() checks the whole table; DuplicateScan runs it
+in the background when the table changes (Pipeline page,
+GET /duplicates); import_candidates() checks each new row before
+writing it. merge_duplicates() folds duplicates into the row worth keeping.
+"""
+from __future__ import annotations
+import re
+import threading
+import time
+from difflib import SequenceMatcher
+from typing import Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+from utils.config import env
+from utils.sheets_connector import CandidateWriteError
+from utils.tenants import current_tenant, start_thread
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Pairs scoring at least this are reported (0-1)
+DEDUP_THRESHOLD = float(env("DEDUP_THRESHOLD", "0.8"))
+# A row is compared with at most this many earlier rows (a phone shared by many, e.g. an agency's)
+DEDUP_MAX_COMPARISONS = int(env("DEDUP_MAX_COMPARISONS", "20"))
+
+DEDUP_COLUMNS = ["Email", "Name", "Phone", "Applied_Date"]
+
+# Each shared key (phone, email local part) counts this much; name similarity makes up the rest
+KEY_WEIGHT = 0.3
+# Email local parts shorter than this ("hr", "info") are too common to be a key
+_MIN_LOCAL_LENGTH = 5
+# Only the first few words of a name are compared
+_MAX_NAME_WORDS = 4
+
+_SOUNDEX_CODES = str.maketrans("bfpvcgjkqsxzdtlmnr", "111122222222334556")
+_NOT_LETTER = re.compile(r"[^a-z]+")
+_NOT_ALNUM = re.compile(r"[^a-z0-9]+")
+_NOT_DIGIT = re.compile(r"\D+")
+
+
+def soundex(word: str) -> str:
+    """
+    American Soundex, e.g. "Robert" and "Rupert" -> "R163".
+    """
+    word = _NOT_LETTER.sub("", str(word).lower())
+    if not word:
+        return ""
+
+    codes = word.translate(_SOUNDEX_CODES)
+    result = word[0].upper()
+    last = codes[0] if codes[0].isdigit() else ""
+    for letter, code in zip(word[1:], codes[1:]):
+        if code.isdigit():
+            if code != last:
+                result += code
+            last = code
+        elif letter not in "hw":
+            # A vowel separates two letters with the same code; h/w don't
+            last = ""
+    return (result + "000")[:4]
+
+
+def normalize_phone(phone) -> str:
+    """
+    Digits only, without the country code ("+91 98765-43210" -> "9876543210").
+    "" if it is too short to be a phone number.
+    """
+    if isinstance(phone, float) and phone.is_integer():
+        # The sheet read a number column as float (9876543210.0)
+        phone = int(phone)
+    digits = _NOT_DIGIT.sub("", str(phone or ""))
+    return digits[-10:] if len(digits) >= 7 else ""
+
+
+def normalize_email(email) -> Tuple[str, str]:
+    """
+    (the address lower-cased without a +tag, its local part letters and digits only)
+    e.g. "Arjun.S+jobs@Gmail.com" -> ("arjun.s@gmail.com", "arjuns").
+    """
+    email = str(email or "").strip().lower()
+    local, _, domain = email.partition("@")
+    local = local.split("+", 1)[0]
+    return f"{local}@{domain}" if domain else local, _NOT_ALNUM.sub("", local)
+
+
+def normalize_name(name) -> str:
+    # Word order and punctuation don't matter: "Sharma, Arjun" == "Arjun Sharma"
+    return " ".join(sorted(word for word in _NOT_ALNUM.split(str(name or "").lower()) if word))
+
+
+def _name_words(name: str) -> Tuple[Tuple[str, str], ...]:
+    # (word, Soundex) of the first words of a normalized name, initials left out
+    words = [w for w in name.split(" ") if len(w) > 1] or name.split(" ")
+    return tuple((w, soundex(w)) for w in words[:_MAX_NAME_WORDS] if w)
+
+
+def _word_similarity(a: Tuple[str, str], b: Tuple[str, str]) -> float:
+    if a[0] == b[0]:
+        return 1.0
+    if a[1] and a[1] == b[1]:
+        return 0.9
+    ratio = SequenceMatcher(None, a[0], b[0]).ratio()
+    return ratio if ratio >= 0.8 else 0.0
+
+
+def _name_similarity(a: Tuple, b: Tuple) -> float:
+    """
+    Share of the shorter name's words found (or nearly found) in the
+    other name - "Priya Sharma" vs "Rahul Sharma" is 0.5, not 0.75 as
+    a character diff would say.
+    """
+    if not a or not b:
+        return 0.0
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(max(_word_similarity(word, other) for other in b) for word in a) / len(a)
+
+
+class DuplicateIndex:
+    """
+    Index of the candidates added so far by phone and email local part;
+    match() finds the best earlier candidate a new one duplicates.
+
+    Usage:
+        index = DuplicateIndex()
+        for record in records:
+            match = index.match(record)   # (email, score, reason) or None
+            index.add(record)
+    """
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, max_comparisons: int = DEDUP_MAX_COMPARISONS):
+        self.threshold = threshold
+        self.max_comparisons = max(1, max_comparisons)
+        # (email, normalized email, email local part, name words, phone) per candidate
+        self._records: List[Tuple] = []
+        self._blocks: Dict[str, List[int]] = {}
+
+    def __len__(self):
+        return len(self._records)
+
+    @staticmethod
+    def _prepare(record: Dict) -> Tuple:
+        email = str(record.get("Email", "") or "").strip()
+        email_key, local = normalize_email(email)
+        name = _name_words(normalize_name(record.get("Name", "")))
+        return email, email_key, local, name, normalize_phone(record.get("Phone", ""))
+
+    @staticmethod
+    def _keys(prepared: Tuple) -> List[str]:
+        _, email_key, local, _, phone = prepared
+        keys = []
+        if phone:
+            keys.append("p:" + phone)
+        if len(local) >= _MIN_LOCAL_LENGTH:
+            keys.append("e:" + local)
+        elif email_key:
+            keys.append("m:" + email_key)
+        return keys
+
+    def add(self, record: Dict):
+        prepared = self._prepare(record)
+        position = len(self._records)
+        self._records.append(prepared)
+        for key in self._keys(prepared):
+            self._blocks.setdefault(key, []).append(position)
+
+    def score(self, a: Tuple, b: Tuple) -> Tuple[float, str]:
+        """
+        How likely two prepared records are the same person (0-1), and why.
+        0 unless they share the email, the phone or the email local part.
+        """
+        _, email_a, local_a, name_a, phone_a = a
+        _, email_b, local_b, name_b, phone_b = b
+
+        if email_a and email_a == email_b:
+            return 1.0, "Same email"
+
+        reasons = []
+        if phone_a and phone_a == phone_b:
+            reasons.append("same phone")
+        if len(local_a) >= _MIN_LOCAL_LENGTH and local_a == local_b:
+            reasons.append("same email name")
+        if not reasons:
+            return 0.0, ""
+
+        key_score = KEY_WEIGHT * len(reasons)
+        name_similarity = _name_similarity(name_a, name_b)
+        if name_similarity >= 0.8:
+            reasons.append("same name" if name_similarity == 1 else "similar name")
+        return key_score + (1 - key_score) * name_similarity, ", ".join(reasons).capitalize()
+
+    def match(self, record: Dict) -> Optional[Tuple[str, float, str]]:
+        """
+        The earlier candidate this one most likely duplicates, as
+        (email, score, reason), or None if nothing reaches the threshold.
+        At most max_comparisons earlier rows are scored, newest first.
+        """
+        prepared = self._prepare(record)
+        best = None
+        seen = set()
+
+        for key in self._keys(prepared):
+            for position in reversed(self._blocks.get(key, [])):
+                if position in seen:
+                    continue
+                if len(seen) >= self.max_comparisons:
+                    return best
+                seen.add(position)
+
+                other = self._records[position]
+                score, reason = self.score(prepared, other)
+                if score >= self.threshold and (best is None or score > best[1]):
+                    best = (other[0], round(score, 2), reason)
+                    if score == 1.0:
+                        return best
+        return best
+
+
+def find_duplicates(
+    candidates: pd.DataFrame,
+    threshold: float = DEDUP_THRESHOLD,
+    max_comparisons: int = DEDUP_MAX_COMPARISONS
+) -> pd.DataFrame:
+    """
+    Every candidate who looks like someone earlier in the table.
+
+    Args:
+        candidates: Table in sheet order with Email, Name and (optionally) Phone
+
+    Returns:
+        DataFrame with Email, Duplicate_Of (the first row of that person),
+        Score and Reason - one row per duplicate
+    """
+    import pandas as pd
+
+    index = DuplicateIndex(threshold=threshold, max_comparisons=max_comparisons)
+    # Chains (C looks like B, B like A) all point at A
+    original: Dict[str, str] = {}
+    found = []
+
+    columns = [c for c in DEDUP_COLUMNS if c in candidates.columns]
+    for record in candidates[columns].to_dict("records"):
+        match = index.match(record)
+        if match is not None:
+            email, score, reason = match
+            duplicate_of = original.get(email, email)
+            original[str(record.get("Email", ""))] = duplicate_of
+            found.append({
+                "Email": record.get("Email", ""),
+                "Name": record.get("Name", ""),
+                "Duplicate_Of": duplicate_of,
+                "Score": score,
+                "Reason": reason,
+            })
+        index.add(record)
+
+    return pd.DataFrame(found, columns=["Email", "Name", "Duplicate_Of", "Score", "Reason"])
+
+
+class DuplicateScan:
+    """
+    The latest find_duplicates() result for one tenant. refresh() rescans
+    on a background thread when the table changed, so the Pipeline page
+    and GET /duplicates read a result instead of scanning per request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._result: Optional[pd.DataFrame] = None
+        self._version = None
+        self._thread: Optional[threading.Thread] = None
+        self.checked_at: Optional[float] = None
+
+    @property
+    def result(self) -> Optional[pd.DataFrame]:
+        """
+        Duplicates found by the last finished scan (None before the first).
+        """
+        with self._lock:
+            return self._result
+
+    @property
+    def running(self) -> bool:
+        with self._lock:
+            return self._thread is not None and self._thread.is_alive()
+
+    def refresh(self, loader: Callable[[], pd.DataFrame], version) -> bool:
+        """
+        Scans loader() in the background, unless this version of the
+        table was already scanned or a scan is still running.
+
+        Args:
+            loader: Returns the table to scan (DEDUP_COLUMNS are enough)
+            version: Anything that changes with the table, e.g. its sync time
+
+        Returns:
+            bool: True if a scan was started
+        """
+        def _scan():
+            try:
+                result = find_duplicates(loader())
+            except Exception as e:
+                print(f"⚠️ Duplicate check failed: {e}")
+                return
+            with self._lock:
+                self._result = result
+                self._version = version
+                self.checked_at = time.time()
+            print(f"✅ Duplicate check: {len(result)} possible duplicate(s)")
+
+        with self._lock:
+            if version == self._version or (self._thread is not None and self._thread.is_alive()):
+                return False
+            self._thread = start_thread(_scan, name="duplicate-scan")
+        return True
+
+
+_scan_instances: Dict[str, DuplicateScan] = {}
+_scan_lock = threading.Lock()
+
+def get_duplicate_scan() -> DuplicateScan:
+    """
+    Returns the current tenant's DuplicateScan.
+    """
+    tenant_id = current_tenant().tenant_id
+
+    with _scan_lock:
+        if tenant_id not in _scan_instances:
+            _scan_instances[tenant_id] = DuplicateScan()
+
+        return _scan_instances[tenant_id]
+
+
+# Columns that describe one application - never copied from a merged row
+_APPLICATION_COLUMNS = {"Email", "Notes", "Status", "Applied_Date", "Ghost_Risk"}
+_INTERVIEW_COLUMNS = ["L1_Date", "L1_Time", "L1_Result", "L2_Date", "L2_Time", "L2_Result"]
+
+
+def _blank(value) -> bool:
+    return str(value).strip() in ("", "nan", "None")
+
+
+def merge_duplicates(duplicates: pd.DataFrame, all_candidates: pd.DataFrame, connector=None) -> Dict[str, object]:
+    """
+    Folds each group of duplicates into the one row worth keeping and
+    deletes the others.
+
+    The row kept is the open application (Status not in
+    ARCHIVE_STATUSES) that got furthest, then the most recently applied.
+    The others fill its blank contact columns (never Status or interview
+    columns) and Notes records what they were. Two open applications
+    that both have interview progress conflict - that row is left alone
+    and reported. Pairs whose two rows have exactly the same email can't
+    be told apart by email - they are skipped (fix those in the sheet).
+
+    One write for the kept rows, then one delete for the merged ones.
+
+    Args:
+        duplicates: Rows of find_duplicates() to merge
+        all_candidates: Fresh candidate table (get_all_candidates)
+
+    Returns:
+        {'merged', 'deleted', 'skipped', 'conflicts': [{'Email', 'Kept', 'Reason'}]}
+    """
+    from utils.analytics import STATUS_STAGE
+    from utils.archive import ARCHIVE_STATUSES
+
+    if connector is None:
+        from utils.sheets_connector import get_connector
+        connector = get_connector()
+
+    rows = all_candidates.drop_duplicates("Email").set_index("Email", drop=False)
+    interview_columns = [c for c in _INTERVIEW_COLUMNS if c in rows.columns]
+    sheet_order = {email: i for i, email in enumerate(rows.index)}
+
+    def _is_open(row) -> bool:
+        return str(row.get("Status", "")) not in ARCHIVE_STATUSES
+
+    def _stage(row) -> int:
+        return STATUS_STAGE.get(str(row.get("Status", "")), 0)
+
+    def _in_progress(row) -> bool:
+        return _stage(row) > 0 or any(not _blank(row[c]) for c in interview_columns)
+
+    def _rank(email):
+        row = rows.loc[email]
+        return _is_open(row), _stage(row), str(row.get("Applied_Date", "")), sheet_order[email]
+
+    # Everyone find_duplicates() tied to the same first row is one person
+    groups: Dict[str, List[str]] = {}
+    skipped = 0
+    for duplicate, original in zip(duplicates["Email"], duplicates["Duplicate_Of"]):
+        if duplicate == original or duplicate not in rows.index or original not in rows.index:
+            skipped += 1
+            continue
+        group = groups.setdefault(original, [original])
+        if duplicate not in group:
+            group.append(duplicate)
+
+    updates: Dict[str, Dict[str, str]] = {}
+    to_delete: Dict[str, List[str]] = {}
+    conflicts: List[Dict[str, str]] = []
+
+    for group in groups.values():
+        kept_email = max(group, key=_rank)
+        kept = rows.loc[kept_email]
+        columns: Dict[str, str] = {}
+        notes = [] if "Notes" not in rows.columns or _blank(kept["Notes"]) else [str(kept["Notes"])]
+
+        for email in group:
+            if email == kept_email:
+                continue
+            other = rows.loc[email]
+            if _is_open(kept) and _is_open(other) and _in_progress(kept) and _in_progress(other):
+                conflicts.append({
+                    "Email": email,
+                    "Kept": kept_email,
+                    "Reason": f"Both in progress ({other.get('Status', '')} / {kept.get('Status', '')})"
+                })
+                continue
+
+            for column in rows.columns:
+                if column in _APPLICATION_COLUMNS or column in interview_columns or column in columns:
+                    continue
+                if _blank(kept[column]) and not _blank(other[column]):
+                    columns[column] = str(other[column])
+            notes.append(
+                f"Merged duplicate {email} ({other.get('Status', '') or 'no status'}, "
+                f"applied {other.get('Applied_Date', '') or '?'})"
+            )
+            to_delete.setdefault(kept_email, []).append(email)
+
+        if kept_email in to_delete:
+            if "Notes" in rows.columns:
+                columns["Notes"] = "; ".join(notes)
+            updates[kept_email] = columns
+
+    written: List[str] = []
+    if updates:
+        try:
+            written = connector.write_candidates(updates)
+        except CandidateWriteError as e:
+            print(f"❌ Could not update the kept rows: {e}")
+            written = e.written
+
+    # Only delete rows whose kept row now has what it needed from them
+    merged = [email for kept_email in written for email in to_delete.get(kept_email, [])]
+    deleted = connector.delete_candidates(merged) if merged else 0
+    print(f"✅ Merged {len(merged)} duplicate(s) into {len(written)} candidate(s), deleted {deleted} row(s)")
+
+    return {"merged": len(merged), "deleted": deleted, "skipped": skipped, "conflicts": conflicts}
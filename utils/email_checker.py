@@ -1,14 +1,64 @@
 import imaplib
 import email
 from email.header import decode_header
-import os
 from datetime import datetime,timedelta
-from dotenv import load_dotenv
+from utils.config import env
+from utils.metrics import add_bytes, track
+from utils.reply_listener import get_reply_listener
 
-load_dotenv()
 
-SMTP_EMAIL=os.getenv("SMTP_EMAIL")
-SMTP_PASSWORD=os.getenv("SMTP_PASSWORD")
+SMTP_EMAIL=env("SMTP_EMAIL")
+SMTP_PASSWORD=env("SMTP_PASSWORD")
+
+def _search_inbox(from_email, since_minutes):
+    """
+    The IMAP round trip behind check_for_reply - raises on connection errors.
+    """
+    mail=imaplib.IMAP4_SSL("imap.gmail.com",993)
+    mail.login(SMTP_EMAIL,SMTP_PASSWORD)
+    mail.select("inbox")
+    since_date = datetime.now() - timedelta(minutes=since_minutes)
+    date_str = since_date.strftime("%d-%b-%Y") 
+    search_criteria = f'(FROM "{from_email}" SINCE "{date_str}")'
+
+    status, messages = mail.search(None, search_criteria)
+
+    email_ids = messages[0].split()
+
+    if len(email_ids) == 0:
+        # No emails found from this candidate
+        mail.logout()
+        return {
+            "found": False,
+            "latest_reply_time": None,
+            "message": f"No reply from {from_email} in last {since_minutes} minutes"
+        }
+
+    # Get the latest email (last in list)
+    latest_id = email_ids[-1]
+
+    # Fetch the email data
+    status, msg_data = mail.fetch(latest_id, "(RFC822)")
+
+    # Parse the email
+    for response_part in msg_data:
+        if isinstance(response_part, tuple):
+            add_bytes(received=len(response_part[1]))
+            msg = email.message_from_bytes(response_part[1])
+
+            # Get the date of the email
+            date_str = msg["Date"]
+
+            mail.logout()
+            return {
+                "found": True,
+                "latest_reply_time": date_str,
+                "message": f"✅ Reply found from {from_email}!"
+            }
+
+    mail.logout()
+    return {"found": False, "latest_reply_time": None}
+
 
 def check_for_reply(from_email,since_minutes=60):
     """
@@ -23,51 +73,27 @@ def check_for_reply(from_email,since_minutes=60):
         dict with 'found' (bool) and 'latest_reply_time' (datetime or None)
     """
     
-    try:
-        mail=imaplib.IMAP4_SSL("imap.gmail.com",993)
-        mail.login(SMTP_EMAIL,SMTP_PASSWORD)
-        mail.select("inbox")
-        since_date = datetime.now() - timedelta(minutes=since_minutes)
-        date_str = since_date.strftime("%d-%b-%Y") 
-        search_criteria = f'(FROM "{from_email}" SINCE "{date_str}")'
-        
-        status, messages = mail.search(None, search_criteria)
-        
-        email_ids = messages[0].split()
-        
-        if len(email_ids) == 0:
-            # No emails found from this candidate
-            mail.logout()
+    # The IDLE listener has seen every reply in this window - no IMAP call needed
+    since = datetime.now() - timedelta(minutes=since_minutes)
+    listener = get_reply_listener()
+    if listener.covers(from_email, since.timestamp()):
+        reply = listener.last_reply(from_email)
+        if reply is not None and reply["received_at"] >= since.timestamp():
             return {
-                "found": False,
-                "latest_reply_time": None,
-                "message": f"No reply from {from_email} in last {since_minutes} minutes"
+                "found": True,
+                "latest_reply_time": reply["date"],
+                "message": f"✅ Reply found from {from_email}!"
             }
-        
-        # Get the latest email (last in list)
-        latest_id = email_ids[-1]
-        
-        # Fetch the email data
-        status, msg_data = mail.fetch(latest_id, "(RFC822)")
-        
-        # Parse the email
-        for response_part in msg_data:
-            if isinstance(response_part, tuple):
-                msg = email.message_from_bytes(response_part[1])
-                
-                # Get the date of the email
-                date_str = msg["Date"]
-                
-                mail.logout()
-                return {
-                    "found": True,
-                    "latest_reply_time": date_str,
-                    "message": f"✅ Reply found from {from_email}!"
-                }
-        
-        mail.logout()
-        return {"found": False, "latest_reply_time": None}
-        
+        return {
+            "found": False,
+            "latest_reply_time": None,
+            "message": f"No reply from {from_email} in last {since_minutes} minutes"
+        }
+
+    try:
+        with track("imap", "check_for_reply"):
+            return _search_inbox(from_email, since_minutes)
+
     except Exception as e:
         return {
             "found": False,
@@ -1,14 +1,19 @@
+import queue
 import smtplib
+import threading
+from email.message import Message
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-import os
-from dotenv import load_dotenv
+from typing import List
+from utils.config import env
+from utils.metrics import track
 
-load_dotenv()
 
 # Get values from .env file
-SMTP_EMAIL = os.getenv("SMTP_EMAIL")
-SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SMTP_EMAIL = env("SMTP_EMAIL")
+SMTP_PASSWORD = env("SMTP_PASSWORD")
+# Connections send_messages() opens at once (Gmail allows a handful per account)
+SMTP_POOL_SIZE = int(env("SMTP_POOL_SIZE", "4"))
 
 def send_email(to_email, subject, body):
     """
@@ -20,10 +25,89 @@ def send_email(to_email, subject, body):
     msg['Subject'] = subject
     msg.attach(MIMEText(body, 'plain'))
 
-    with smtplib.SMTP('smtp.gmail.com', 587) as server:
+    with track("smtp", "send_email") as call:
+        with smtplib.SMTP('smtp.gmail.com', 587) as server:
+            server.starttls()
+            server.login(SMTP_EMAIL, SMTP_PASSWORD)
+            server.send_message(msg)
+            call.add_bytes(sent=len(msg.as_bytes()))
+            print("Email sent successfully!")
+
+    return True
+
+def _connect():
+    with track("smtp", "connect"):
+        server = smtplib.SMTP('smtp.gmail.com', 587)
         server.starttls()
         server.login(SMTP_EMAIL, SMTP_PASSWORD)
-        server.send_message(msg)
-        print("Email sent successfully!")
+    return server
+
+
+def send_messages(messages: List[Message], workers: int = SMTP_POOL_SIZE) -> int:
+    """
+    Sends many ready-made messages over a few SMTP connections.
+
+    send_email() logs in for every email; here each of `workers`
+    connections logs in once and takes messages off a shared queue until
+    it is empty. A dropped connection is reopened (the message retried
+    once); a message the server refuses is skipped and printed.
+
+    Returns:
+        int: How many were sent
+    """
+    pending = queue.Queue()
+    for msg in messages:
+        pending.put(msg)
+
+    sent = [0]
+    sent_lock = threading.Lock()
+
+    def _worker():
+        server = None
+        try:
+            while True:
+                try:
+                    msg = pending.get_nowait()
+                except queue.Empty:
+                    return
+
+                for attempt in range(2):
+                    if server is None:
+                        try:
+                            server = _connect()
+                        except (smtplib.SMTPException, OSError) as e:
+                            # Leave it for the other connections
+                            print(f"❌ Could not connect to SMTP: {e}")
+                            pending.put(msg)
+                            return
+                    try:
+                        with track("smtp", "send_message") as call:
+                            server.send_message(msg)
+                            call.add_bytes(sent=len(msg.as_bytes()))
+                        with sent_lock:
+                            sent[0] += 1
+                        break
+                    except smtplib.SMTPServerDisconnected:
+                        server = None
+                        if attempt:
+                            print(f"❌ Could not send email to {msg['To']}: connection lost")
+                    except (smtplib.SMTPException, OSError) as e:
+                        print(f"❌ Could not send email to {msg['To']}: {e}")
+                        break
+        finally:
+            if server is not None:
+                try:
+                    server.quit()
+                except (smtplib.SMTPException, OSError):
+                    pass
+
+    threads = [
+        threading.Thread(target=_worker, name=f"smtp-{i}", daemon=True)
+        for i in range(max(1, min(workers, len(messages))))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
 
-    return True
\ No newline at end of file
+    return sent[0]
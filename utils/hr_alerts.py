@@ -0,0 +1,330 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from utils.config import env, LOCAL_DATA_DIR
+from utils.tenants import current_tenant
+
+from utils.email_sender import send_email
+
+
+HR_EMAIL = env("HR_EMAIL", "sriramnalla30@gmail.com")
+ALERT_DB_PATH = env("ALERT_DB_PATH", os.path.join(LOCAL_DATA_DIR, "alerts.db"))
+
+# Risk above ALERT_THRESHOLD is queued for the next digest,
+# risk above ESCALATE_THRESHOLD is sent right away.
+ALERT_THRESHOLD = int(env("ALERT_THRESHOLD", "40"))
+ESCALATE_THRESHOLD = int(env("ALERT_ESCALATE_THRESHOLD", "70"))
+ALERT_WINDOW_MINUTES = float(env("ALERT_WINDOW_MINUTES", "15"))
+# A digest still 'sending' after this long was cut off (crash, restart) - its alerts are sent again
+ALERT_SENDING_TIMEOUT_MINUTES = float(env("ALERT_SENDING_TIMEOUT_MINUTES", "10"))
+
+
+class AlertManager:
+    """
+    Collects Ghost Risk threshold crossings and emails HR one digest per window.
+
+    Why not just send an email when we see a high risk?
+    - Every Streamlit rerun (and every open tab) would send its own email
+    - Alert history lives in a small SQLite file, so a candidate is only
+      alerted once per level no matter how many tabs/processes see them
+    - Emails go out from a background thread, so the page never waits on SMTP
+    """
+
+    def __init__(
+        self,
+        db_path: str = ALERT_DB_PATH,
+        hr_email: str = HR_EMAIL,
+        threshold: int = ALERT_THRESHOLD,
+        escalate_threshold: int = ESCALATE_THRESHOLD,
+        window_minutes: float = ALERT_WINDOW_MINUTES,
+        sender: Callable[[str, str, str], bool] = send_email,
+    ):
+        self.db_path = db_path
+        self.hr_email = hr_email
+        self.threshold = threshold
+        self.escalate_threshold = escalate_threshold
+        self.window_seconds = window_minutes * 60
+        self.sender = sender
+
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._init_db()
+
+    def _db(self) -> sqlite3.Connection:
+        """
+        Opens a fresh connection - cheap for SQLite, and safe across threads.
+        """
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _init_db(self):
+        folder = os.path.dirname(self.db_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        with self._db() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS alerts (
+                    email      TEXT NOT NULL,
+                    level      TEXT NOT NULL,
+                    name       TEXT,
+                    risk       INTEGER,
+                    status     TEXT NOT NULL DEFAULT 'pending',
+                    crossed_at REAL NOT NULL,
+                    sent_at    REAL,
+                    batch_id   TEXT,
+                    UNIQUE (email, level)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_alerts_status ON alerts (status)")
+
+    # ============================================
+    # RECORDING THRESHOLD CROSSINGS
+    # ============================================
+
+    def record_risks(self, candidates: List[Dict]) -> Dict[str, List[str]]:
+        """
+        Records the latest Ghost Risk for a batch of candidates.
+
+        Args:
+            candidates: List of dicts with 'name', 'email' and 'risk' keys
+
+        Returns:
+            dict with 'queued', 'escalated' and 'already_alerted' lists of
+            "Name (risk%)" labels, for showing on the page
+        """
+        result = {"queued": [], "escalated": [], "already_alerted": []}
+        now = time.time()
+        escalate_now = False
+
+        with self._db() as conn:
+            for cand in candidates:
+                risk = int(cand['risk'])
+                if risk <= self.threshold:
+                    continue
+
+                label = f"{cand['name']} ({risk}%)"
+                level = "escalation" if risk > self.escalate_threshold else "alert"
+
+                # UNIQUE(email, level) makes this the dedup check - a second
+                # tab inserting the same crossing is simply ignored
+                inserted = conn.execute(
+                    "INSERT OR IGNORE INTO alerts (email, level, name, risk, crossed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (cand['email'], level, cand['name'], risk, now)
+                ).rowcount
+
+                if not inserted:
+                    result["already_alerted"].append(label)
+                elif level == "escalation":
+                    result["escalated"].append(label)
+                    escalate_now = True
+                else:
+                    result["queued"].append(label)
+
+        if escalate_now:
+            self._wakeup.set()
+
+        return result
+
+    def resolve(self, email: str):
+        """
+        Forgets a candidate's alert history (e.g. after they replied),
+        so a future threshold crossing alerts HR again.
+        """
+        with self._db() as conn:
+            conn.execute("DELETE FROM alerts WHERE email = ?", (email,))
+
+    def pending(self) -> List[Dict]:
+        """
+        Returns alerts waiting for the next digest.
+        """
+        with self._db() as conn:
+            rows = conn.execute(
+                "SELECT name, email, risk, level, crossed_at FROM alerts "
+                "WHERE status = 'pending' ORDER BY crossed_at"
+            ).fetchall()
+
+        return [
+            {"name": r[0], "email": r[1], "risk": r[2], "level": r[3], "crossed_at": r[4]}
+            for r in rows
+        ]
+
+    def next_digest_at(self) -> Optional[datetime]:
+        """
+        Returns when the current window closes, or None if nothing is pending.
+        """
+        pending = self.pending()
+        if not pending:
+            return None
+        return datetime.fromtimestamp(pending[0]['crossed_at'] + self.window_seconds)
+
+    # ============================================
+    # SENDING DIGESTS
+    # ============================================
+
+    def _is_due(self, conn: sqlite3.Connection, now: float) -> bool:
+        row = conn.execute(
+            "SELECT MIN(crossed_at), MAX(level = 'escalation') FROM alerts WHERE status = 'pending'"
+        ).fetchone()
+        oldest, has_escalation = row
+        if oldest is None:
+            return False
+        return bool(has_escalation) or now - oldest >= self.window_seconds
+
+    def flush(self, force: bool = False) -> int:
+        """
+        Sends one digest with every pending alert, if the window has closed
+        (or an escalation is waiting, or force=True).
+
+        Returns:
+            int: Number of candidates included in the digest
+        """
+        now = time.time()
+        batch_id = uuid.uuid4().hex
+
+        with self._db() as conn:
+            # Rows a crashed flush left in 'sending' would never be sent,
+            # and UNIQUE(email, level) would keep them from alerting again
+            reclaimed = conn.execute(
+                "UPDATE alerts SET status = 'pending', batch_id = NULL "
+                "WHERE status = 'sending' AND (sent_at IS NULL OR sent_at < ?)",
+                (now - ALERT_SENDING_TIMEOUT_MINUTES * 60,)
+            ).rowcount
+            if reclaimed:
+                print(f"⚠️ {reclaimed} alert(s) from an unfinished digest queued again")
+
+            if not force and not self._is_due(conn, now):
+                return 0
+            # Claim the pending rows first so two processes never send the same digest
+            # (sent_at holds the claim time until the digest is sent)
+            conn.execute(
+                "UPDATE alerts SET status = 'sending', batch_id = ?, sent_at = ? WHERE status = 'pending'",
+                (batch_id, now)
+            )
+            rows = conn.execute(
+                "SELECT name, risk, level FROM alerts WHERE batch_id = ? ORDER BY risk DESC",
+                (batch_id,)
+            ).fetchall()
+
+        if not rows:
+            return 0
+
+        subject, body = self._build_digest(rows)
+
+        try:
+            self.sender(self.hr_email, subject, body)
+        except Exception as e:
+            print(f"❌ Failed to send HR digest: {e}")
+            with self._db() as conn:
+                conn.execute(
+                    "UPDATE alerts SET status = 'pending', batch_id = NULL, sent_at = NULL WHERE batch_id = ?",
+                    (batch_id,)
+                )
+            return 0
+
+        with self._db() as conn:
+            conn.execute(
+                "UPDATE alerts SET status = 'sent', sent_at = ? WHERE batch_id = ?",
+                (time.time(), batch_id)
+            )
+
+        print(f"✅ HR digest sent for {len(rows)} candidate(s)")
+        return len(rows)
+
+    def _build_digest(self, rows) -> tuple:
+        urgent = [r for r in rows if r[2] == "escalation"]
+        others = [r for r in rows if r[2] != "escalation"]
+
+        if urgent:
+            subject = "🚨 URGENT Ghost Alert: Candidates Need Immediate Attention!"
+        else:
+            subject = "⚠️ Ghost Alert Digest: Candidates Need Attention"
+
+        sections = []
+        if urgent:
+            sections.append(
+                f"🔴 Ghost Risk ABOVE {self.escalate_threshold}%:\n"
+                + "\n".join(f"🔴 {name} ({risk}%)" for name, risk, _ in urgent)
+            )
+        if others:
+            sections.append(
+                f"🟠 Ghost Risk ABOVE {self.threshold}%:\n"
+                + "\n".join(f"🟠 {name} ({risk}%)" for name, risk, _ in others)
+            )
+
+        body = f"""
+HR Alert - Anti-Ghosting Bot
+
+{(chr(10) * 2).join(sections)}
+
+Please follow up with them to prevent ghosting.
+
+---
+This is an automated alert from the Recruiters Assistant.
+"""
+        return subject, body
+
+    # ============================================
+    # BACKGROUND WORKER
+    # ============================================
+
+    def start(self):
+        """
+        Starts the background thread that sends digests (safe to call on every rerun).
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="hr-alert-digest", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+
+    def _run(self):
+        # Check a few times per window so digests go out close to on time
+        poll_seconds = max(1.0, min(60.0, self.window_seconds / 10))
+
+        while not self._stop.is_set():
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"❌ Alert worker error: {e}")
+
+            self._wakeup.wait(poll_seconds)
+            self._wakeup.clear()
+
+
+_alert_manager_instances: Dict[str, AlertManager] = {}
+_alert_manager_lock = threading.Lock()
+
+def get_alert_manager() -> AlertManager:
+    """
+    Returns the current tenant's AlertManager (alerts go to the tenant's
+    HR inbox), with its background worker running.
+
+    Usage:
+        from utils.hr_alerts import get_alert_manager
+        alerts = get_alert_manager()
+        alerts.record_risks([{"name": "Arjun", "email": "a@x.com", "risk": 50}])
+    """
+    tenant = current_tenant()
+
+    with _alert_manager_lock:
+        alerts = _alert_manager_instances.get(tenant.tenant_id)
+        if alerts is None:
+            alerts = _alert_manager_instances[tenant.tenant_id] = AlertManager(
+                db_path=tenant.data_path("alerts.db", ALERT_DB_PATH),
+                hr_email=tenant.hr_email
+            )
+        alerts.start()
+
+    return alerts
@@ -0,0 +1,152 @@
+import abc
+import re
+import hashlib
+import threading
+from typing import Optional
+from utils.config import env
+
+
+LLM_PROVIDER = env("LLM_PROVIDER", "groq")
+LLM_TIMEOUT_SECONDS = float(env("LLM_TIMEOUT_SECONDS", "10"))
+LLM_MAX_RETRIES = int(env("LLM_MAX_RETRIES", "1"))
+
+
+class LLMProvider(abc.ABC):
+    """
+    Base class for anything that can turn a prompt into text.
+
+    Subclasses implement complete(); the message generator doesn't care
+    whether the text comes from Groq or from the local stub.
+    """
+
+    name = "base"
+
+    @abc.abstractmethod
+    def complete(
+        self,
+        prompt: str,
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 300,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """
+        Returns the model's reply to prompt.
+        """
+
+
+class GroqProvider(LLMProvider):
+    """
+    Groq chat completions.
+
+    The Groq client (and its HTTP connection pool) is only created on the
+    first call, then reused for every call after that.
+    """
+
+    name = "groq"
+
+    def __init__(self, timeout: float = LLM_TIMEOUT_SECONDS, max_retries: int = LLM_MAX_RETRIES):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from groq import Groq
+                    self._client = Groq(timeout=self.timeout, max_retries=self.max_retries)
+        return self._client
+
+    def complete(self, prompt, model, temperature=0.7, max_tokens=300, timeout=None):
+        chat_completion = self.client.chat.completions.create(
+            messages=[
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout if timeout is not None else self.timeout
+        )
+        return chat_completion.choices[0].message.content
+
+
+class StubProvider(LLMProvider):
+    """
+    Offline provider for demos, tests and benchmarks.
+
+    Returns a fixed-format message built from the Name/Role/Company lines
+    of the prompt. The same prompt always gives the same text.
+    """
+
+    name = "stub"
+
+    SUBJECTS = [
+        "Counting down with you! 🎉",
+        "A quick hello from the team 👋",
+        "Something to look forward to 🚀",
+    ]
+
+    def _field(self, prompt: str, label: str, default: str) -> str:
+        match = re.search(rf"-\s*{label}:\s*(.+)", prompt)
+        return match.group(1).strip() if match else default
+
+    def complete(self, prompt, model, temperature=0.7, max_tokens=300, timeout=None):
+        name = self._field(prompt, "Name", "there")
+        role = self._field(prompt, "Role", "new role")
+        company = self._field(prompt, "Company", "TechCorp")
+
+        digest = int(hashlib.md5(prompt.encode("utf-8")).hexdigest(), 16)
+        subject = self.SUBJECTS[digest % len(self.SUBJECTS)]
+
+        return (
+            f"Subject: {subject}\n"
+            f"Hi {name},\n"
+            f"We're really looking forward to having you with us as a {role}.\n"
+            f"What are you most excited to work on first?\n"
+            f"{company} Team"
+        )
+
+
+PROVIDERS = {
+    "groq": GroqProvider,
+    "stub": StubProvider,
+}
+
+_provider_instance: Optional[LLMProvider] = None
+_provider_lock = threading.Lock()
+
+def get_llm_provider() -> LLMProvider:
+    """
+    Returns the shared provider picked by LLM_PROVIDER ("groq" or "stub").
+
+    Creating the provider is cheap - no network client exists until the
+    first complete() call.
+    """
+    global _provider_instance
+
+    with _provider_lock:
+        if _provider_instance is None:
+            provider_class = PROVIDERS.get(LLM_PROVIDER.lower())
+            if provider_class is None:
+                raise ValueError(
+                    f"Unknown LLM_PROVIDER '{LLM_PROVIDER}'. Use one of: {', '.join(PROVIDERS)}"
+                )
+            _provider_instance = provider_class()
+
+    return _provider_instance
+
+
+def set_llm_provider(provider: LLMProvider):
+    """
+    Replaces the shared provider (e.g. StubProvider() for offline benchmarks).
+    """
+    global _provider_instance
+
+    with _provider_lock:
+        _provider_instance = provider
@@ -0,0 +1,232 @@
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Union
+from utils.config import env
+
+from utils.ai_message_generator import generate_engagement_message
+from utils.tenants import current_tenant, start_thread
+from utils.message_cache import MESSAGE_CACHE_PATH
+
+
+PREGENERATED_DB_PATH = env("PREGENERATED_DB_PATH", MESSAGE_CACHE_PATH)
+MESSAGE_BATCH_WORKERS = int(env("MESSAGE_BATCH_WORKERS", "4"))
+
+# Engagement touchpoints during the 90-day notice period (day -> label)
+TOUCHPOINTS = {
+    1:  "🎉 Offer Accepted",
+    7:  "📋 Onboarding Docs",
+    30: "💬 Monthly Check-in",
+    60: "🏢 Team Intro",
+    85: "🚀 Pre-joining Prep",
+    90: "🏁 Day 1 Joined"
+}
+TOUCHPOINT_DAYS = sorted(TOUCHPOINTS)
+
+
+def get_upcoming_touchpoint(days_passed: int) -> int:
+    """
+    Returns the next touchpoint day on or after days_passed (e.g. 15 -> 30).
+    """
+    index = bisect_left(TOUCHPOINT_DAYS, days_passed)
+    return TOUCHPOINT_DAYS[min(index, len(TOUCHPOINT_DAYS) - 1)]
+
+
+def _db_path() -> str:
+    """
+    The current tenant's message table - candidate emails are only unique
+    within one tenant's sheet.
+    """
+    return current_tenant().data_path("pregenerated.db", PREGENERATED_DB_PATH)
+
+
+def _db(db_path: Optional[str] = None) -> sqlite3.Connection:
+    db_path = db_path or _db_path()
+    folder = os.path.dirname(db_path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    conn = sqlite3.connect(db_path, timeout=10)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS pregenerated (
+            email        TEXT NOT NULL,
+            touchpoint   INTEGER NOT NULL,
+            subject      TEXT NOT NULL,
+            body         TEXT NOT NULL,
+            generated_at REAL NOT NULL,
+            PRIMARY KEY (email, touchpoint)
+        )
+    """)
+    return conn
+
+
+def get_pregenerated(email: str, touchpoint: int) -> Optional[Dict[str, str]]:
+    """
+    Returns the stored message for a candidate's touchpoint, or None.
+
+    This never calls the LLM, so it is safe to use while rendering a page.
+    """
+    with _db() as conn:
+        row = conn.execute(
+            "SELECT subject, body FROM pregenerated WHERE email = ? AND touchpoint = ?",
+            (email, touchpoint)
+        ).fetchone()
+
+    if row is None:
+        return None
+    return {"subject": row[0], "body": row[1]}
+
+
+def pregenerate_messages(
+    candidates: List[Dict],
+    days_passed: Union[int, Dict[str, int]],
+    company_name: Optional[str] = None,
+    max_workers: int = MESSAGE_BATCH_WORKERS,
+    skip_existing: bool = True,
+) -> Dict[str, object]:
+    """
+    Generates the upcoming-touchpoint message for many candidates at once.
+
+    Args:
+        candidates: List of dicts with 'Name', 'Email' and 'Role' keys
+            (e.g. df.to_dict('records'))
+        days_passed: Day of the notice period - one number for everyone,
+            or a dict of email -> day
+        company_name: Your Company Name (default: the current tenant's)
+        max_workers: How many LLM calls may run at the same time
+        skip_existing: Don't regenerate messages that are already stored
+
+    Returns:
+        dict with 'generated', 'skipped', 'failed' (list of emails) and 'seconds'
+    """
+    started = time.time()
+    # Resolved here - the worker threads below don't know the tenant
+    company_name = company_name or current_tenant().company_name
+    db_path = _db_path()
+    jobs = []
+
+    for cand in candidates:
+        day = days_passed.get(cand['Email'], 0) if isinstance(days_passed, dict) else days_passed
+        touchpoint = get_upcoming_touchpoint(day)
+
+        if skip_existing and get_pregenerated(cand['Email'], touchpoint) is not None:
+            continue
+        jobs.append((cand, touchpoint))
+
+    generated = 0
+    failed = []
+
+    def _generate(cand, touchpoint):
+        return generate_engagement_message(
+            candidate_name=cand['Name'],
+            candidate_role=cand['Role'],
+            day_number=touchpoint,
+            company_name=company_name,
+            fallback_to_template=False
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {
+            pool.submit(_generate, cand, touchpoint): (cand['Email'], touchpoint)
+            for cand, touchpoint in jobs
+        }
+
+        for future in as_completed(futures):
+            email, touchpoint = futures[future]
+            try:
+                message = future.result()
+            except Exception as e:
+                print(f"❌ Could not generate message for {email}: {e}")
+                failed.append(email)
+                continue
+
+            with _db(db_path) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO pregenerated VALUES (?, ?, ?, ?, ?)",
+                    (email, touchpoint, message['subject'], message['body'], time.time())
+                )
+            generated += 1
+
+    return {
+        "generated": generated,
+        "skipped": len(candidates) - len(jobs),
+        "failed": failed,
+        "seconds": round(time.time() - started, 2),
+    }
+
+
+# ============================================
+# BACKGROUND RUN (used by the Anti-Ghosting page)
+# ============================================
+
+class _BatchRun:
+    """
+    One tenant's background pregeneration: the thread and its last result.
+    """
+
+    def __init__(self):
+        self.thread: Optional[threading.Thread] = None
+        self.last_result: Optional[Dict[str, object]] = None
+
+
+_batch_runs: Dict[str, _BatchRun] = {}
+_batch_lock = threading.Lock()
+
+def _batch_run() -> _BatchRun:
+    tenant_id = current_tenant().tenant_id
+
+    with _batch_lock:
+        if tenant_id not in _batch_runs:
+            _batch_runs[tenant_id] = _BatchRun()
+
+        return _batch_runs[tenant_id]
+
+
+def start_pregeneration(candidates: List[Dict], days_passed: Union[int, Dict[str, int]], **kwargs) -> bool:
+    """
+    Runs pregenerate_messages in a background thread for the current tenant.
+
+    Returns:
+        bool: False if a batch is already running for this tenant
+    """
+    run = _batch_run()
+
+    with _batch_lock:
+        if run.thread is not None and run.thread.is_alive():
+            return False
+
+        def _run():
+            run.last_result = pregenerate_messages(candidates, days_passed, **kwargs)
+
+        run.thread = start_thread(_run, name="message-pregeneration")
+
+    return True
+
+
+def get_batch_status() -> Dict[str, object]:
+    """
+    Returns {'running': bool, 'last_result': dict or None} for the current tenant.
+    """
+    run = _batch_run()
+
+    with _batch_lock:
+        running = run.thread is not None and run.thread.is_alive()
+        return {"running": running, "last_result": run.last_result}
+
+
+if __name__ == "__main__":
+    # Usage: python -m utils.message_batch [days_passed]
+    import sys
+    from utils.sheets_connector import get_connector
+
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+
+    df = get_connector().get_all_candidates()
+    notice = df[df['Status'] == 'Offer_Accepted']
+
+    print(f"Pre-generating messages for {len(notice)} candidates...")
+    result = pregenerate_messages(notice.to_dict('records'), days_passed=days)
+    print(result)
@@ -0,0 +1,179 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+import hashlib
+from typing import Dict, Optional
+from utils.config import env, LOCAL_DATA_DIR
+
+
+MESSAGE_CACHE_PATH = env("MESSAGE_CACHE_PATH", os.path.join(LOCAL_DATA_DIR, "message_cache.db"))
+MESSAGE_CACHE_MAX_ENTRIES = int(env("MESSAGE_CACHE_MAX_ENTRIES", "5000"))
+MESSAGE_CACHE_TTL_HOURS = float(env("MESSAGE_CACHE_TTL_HOURS", "168"))
+# How many different messages to keep per key - they are served in rotation
+MESSAGE_CACHE_VARIANTS = int(env("MESSAGE_CACHE_VARIANTS", "1"))
+
+
+def make_cache_key(**parts) -> str:
+    """
+    Builds a stable cache key from the inputs that decide what the LLM writes.
+
+    Values are lower-cased and whitespace-collapsed, so "Backend Engineer "
+    and "backend  engineer" share one entry.
+
+    Example:
+        make_cache_key(first_name="Arjun", role="Backend Engineer", day_bucket=2,
+                       company="TechCorp", model="llama-3.3-70b-versatile")
+    """
+    normalized = {
+        name: " ".join(str(value).lower().split())
+        for name, value in parts.items()
+    }
+    raw = json.dumps(normalized, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class MessageCache:
+    """
+    Disk-backed cache of generated messages (SQLite file).
+
+    - TTL: entries older than ttl_hours are treated as missing
+    - LRU: when there are more than max_entries keys, the least recently
+      used ones are dropped
+    - Variants: each key can hold several messages, handed out in rotation,
+      so candidates with the same role/stage don't all get identical emails
+    """
+
+    def __init__(
+        self,
+        db_path: str = MESSAGE_CACHE_PATH,
+        max_entries: int = MESSAGE_CACHE_MAX_ENTRIES,
+        ttl_hours: float = MESSAGE_CACHE_TTL_HOURS,
+        variants: int = MESSAGE_CACHE_VARIANTS,
+    ):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_hours * 3600
+        self.variants = max(1, variants)
+        self._init_db()
+
+    def _db(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _init_db(self):
+        folder = os.path.dirname(self.db_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        with self._db() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS messages (
+                    key         TEXT PRIMARY KEY,
+                    variants    TEXT NOT NULL,
+                    created_at  REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hits        INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_access ON messages (last_access)")
+
+    def get(self, key: str) -> Optional[Dict[str, str]]:
+        """
+        Returns the next cached message for this key, or None if the key is
+        missing, expired, or still has fewer than `variants` messages.
+        """
+        now = time.time()
+
+        with self._db() as conn:
+            row = conn.execute(
+                "SELECT variants, created_at, hits FROM messages WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            variants, created_at, hits = json.loads(row[0]), row[1], row[2]
+
+            if now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM messages WHERE key = ?", (key,))
+                return None
+
+            if len(variants) < self.variants:
+                return None
+
+            conn.execute(
+                "UPDATE messages SET last_access = ?, hits = hits + 1 WHERE key = ?",
+                (now, key)
+            )
+
+        return variants[hits % len(variants)]
+
+    def add(self, key: str, message: Dict[str, str]):
+        """
+        Stores a generated message as one more variant for this key.
+        """
+        now = time.time()
+
+        with self._db() as conn:
+            row = conn.execute(
+                "SELECT variants, created_at FROM messages WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl_seconds:
+                variants, created_at = [], now
+            else:
+                variants, created_at = json.loads(row[0]), row[1]
+
+            variants = (variants + [message])[-self.variants:]
+
+            conn.execute(
+                "INSERT OR REPLACE INTO messages (key, variants, created_at, last_access, hits) "
+                "VALUES (?, ?, ?, ?, COALESCE((SELECT hits FROM messages WHERE key = ?), 0))",
+                (key, json.dumps(variants), created_at, now, key)
+            )
+
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        """
+        Drops the least recently used keys once we are over max_entries.
+        """
+        count = conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+        extra = count - self.max_entries
+        if extra > 0:
+            conn.execute(
+                "DELETE FROM messages WHERE key IN "
+                "(SELECT key FROM messages ORDER BY last_access LIMIT ?)",
+                (extra,)
+            )
+
+    def clear(self):
+        with self._db() as conn:
+            conn.execute("DELETE FROM messages")
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns number of cached keys and total cache hits.
+        """
+        with self._db() as conn:
+            count, hits = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM messages"
+            ).fetchone()
+        return {"entries": count, "hits": hits}
+
+
+_message_cache_instance: Optional[MessageCache] = None
+_message_cache_lock = threading.Lock()
+
+def get_message_cache() -> MessageCache:
+    """
+    Returns the single shared MessageCache.
+    """
+    global _message_cache_instance
+
+    with _message_cache_lock:
+        if _message_cache_instance is None:
+            _message_cache_instance = MessageCache()
+
+    return _message_cache_instance
@@ -0,0 +1,136 @@
+import json
+from bisect import bisect_left
+from string import Formatter
+from typing import Dict, Iterable, List, Optional, Union
+from utils.config import env
+
+
+# Optional JSON file to override the built-in templates, e.g.
+# {"welcome": {"subject": "...", "body": "Hi {first_name}, ..."}}
+MESSAGE_TEMPLATES_PATH = env("MESSAGE_TEMPLATES_PATH")
+
+# Placeholders templates may use
+TEMPLATE_FIELDS = {"first_name", "name", "role", "company", "day"}
+
+# Stage order matters - STAGE_LAST_DAY[i] is the last day of STAGES[i]
+STAGES = ["welcome", "documents", "check_in", "meet_team", "launch"]
+STAGE_LAST_DAY = [2, 10, 35, 65]
+
+DEFAULT_TEMPLATES = {
+    "welcome": {
+        "subject": "Welcome aboard! 🎉",
+        "body": "Hi {first_name},\n\nWe are thrilled that you accepted our offer! The whole team is excited to have you join as a {role}.\n\nLet us know if you have any questions!"
+    },
+    "documents": {
+        "subject": "Getting started: Documents 📋",
+        "body": "Hi {first_name},\n\nTo make your Day 1 smooth, could you please review the attached onboarding documents?\n\nThis will save us a lot of time on your joining date!"
+    },
+    "check_in": {
+        "subject": "Checking in 👋",
+        "body": "Hi {first_name},\n\nHope your notice period is going smoothly. How are things at your current workplace? Let us know if you need any support from our side."
+    },
+    "meet_team": {
+        "subject": "Meet the team! 🏢",
+        "body": "Hi {first_name},\n\nYour future team is having a virtual coffee chat next Friday. Would you like to join and meet everyone before your official start date?"
+    },
+    "launch": {
+        "subject": "Ready for launch? 🚀",
+        "body": "Hi {first_name},\n\nJust a few days left! We have your laptop ready and your desk set up. Can't wait to see you on Monday!"
+    },
+}
+
+
+def _compile(text: str) -> str:
+    """
+    Checks a template once at load time, so a typo in a placeholder fails
+    at startup instead of in the middle of sending emails.
+    """
+    for _, field, _, _ in Formatter().parse(text):
+        if field is not None and field not in TEMPLATE_FIELDS:
+            raise ValueError(
+                f"❌ Unknown placeholder '{{{field}}}' in message template.\n"
+                f"Allowed: {', '.join(sorted(TEMPLATE_FIELDS))}"
+            )
+    return text
+
+
+def load_templates(path: Optional[str] = MESSAGE_TEMPLATES_PATH) -> Dict[str, Dict[str, str]]:
+    """
+    Loads and checks the stage templates (built-ins, overridden by the JSON file if set).
+
+    Returns:
+        dict of stage -> {'subject': str, 'body': str}
+    """
+    templates = {stage: dict(parts) for stage, parts in DEFAULT_TEMPLATES.items()}
+
+    if path:
+        with open(path, encoding="utf-8") as f:
+            for stage, parts in json.load(f).items():
+                if stage not in templates:
+                    raise ValueError(f"❌ Unknown message stage '{stage}'. Use one of: {', '.join(STAGES)}")
+                templates[stage].update(parts)
+
+    return {
+        stage: {"subject": _compile(parts["subject"]), "body": _compile(parts["body"])}
+        for stage, parts in templates.items()
+    }
+
+
+# Loaded once per process
+TEMPLATES = load_templates()
+
+
+def get_stage(day: int) -> str:
+    """
+    Maps a notice-period day to its message stage (e.g. 15 -> "check_in").
+    """
+    return STAGES[bisect_left(STAGE_LAST_DAY, day)]
+
+
+def render_message(candidate_name: str, candidate_role: str, day: int, company_name: str = "TechCorp") -> Dict[str, str]:
+    """
+    Renders the template for a candidate's current stage.
+
+    Returns:
+        dict with 'subject' and 'body' keys (same shape as the AI messages)
+    """
+    template = TEMPLATES[get_stage(day)]
+    name = str(candidate_name)
+    values = {
+        "first_name": name.split()[0] if name.strip() else name,
+        "name": name,
+        "role": candidate_role,
+        "company": company_name,
+        "day": day,
+    }
+    return {
+        "subject": template["subject"].format_map(values),
+        "body": template["body"].format_map(values),
+    }
+
+
+def render_bulk(
+    candidates: Iterable[Dict],
+    day: Union[int, Dict[str, int]],
+    company_name: str = "TechCorp"
+) -> List[Dict[str, str]]:
+    """
+    Renders messages for many candidates in one go.
+
+    Args:
+        candidates: Dicts with 'Name', 'Email' and 'Role' keys (e.g. df.to_dict('records'))
+        day: One day for everyone, or a dict of email -> day
+
+    Returns:
+        list of dicts with 'email', 'subject' and 'body', in input order
+    """
+    per_candidate = isinstance(day, dict)
+    messages = []
+
+    for cand in candidates:
+        cand_day = day.get(cand['Email'], 0) if per_candidate else day
+        message = render_message(cand['Name'], cand['Role'], cand_day, company_name)
+        message["email"] = cand['Email']
+        messages.append(message)
+
+    return messages
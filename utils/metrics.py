@@ -0,0 +1,403 @@
+"""
+Call counts, latency, bytes and errors for every external service we use
+(Google Sheets, SMTP, IMAP, the LLM), broken down by page action.
+
+Usage:
+    from utils.metrics import get_metrics, page_action, track
+
+    with page_action("Pipeline", "Save Changes"):
+        connector.batch_update_candidates(updates)   # counted under that action
+
+    with track("smtp", "send_email") as call:
+        ...
+        call.add_bytes(sent=len(raw))
+
+Numbers live in memory for the life of the process; see the System Health
+page or GET /metrics on the API.
+"""
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+# How many recent errors the System Health page can show
+RECENT_ERRORS = 50
+
+# Window for "calls in the last minute" - the Sheets quota is per minute
+RATE_WINDOW_SECONDS = 60
+
+_current_action = contextvars.ContextVar("metrics_action", default="background")
+_current_call = contextvars.ContextVar("metrics_call", default=None)
+
+
+class _Stats:
+    """
+    Totals for one service + operation.
+    """
+
+    __slots__ = ("calls", "errors", "seconds", "buckets", "bytes_sent", "bytes_received")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        # One count per bucket, plus one for "slower than the last bucket"
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+
+class Call:
+    """
+    One call in progress - handed out by track() so the caller can add bytes.
+    """
+
+    __slots__ = ("service", "operation", "bytes_sent", "bytes_received")
+
+    def __init__(self, service: str, operation: str):
+        self.service = service
+        self.operation = operation
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def add_bytes(self, sent: int = 0, received: int = 0):
+        self.bytes_sent += sent
+        self.bytes_received += received
+
+
+class Metrics:
+    """
+    Thread-safe in-memory registry.
+
+    Latency histograms are kept per service/operation; call and error
+    counts are also kept per page action, so a 429 can be traced back to
+    the button that caused it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], _Stats] = defaultdict(_Stats)
+        self._by_action: Dict[Tuple[str, str, str], List[int]] = defaultdict(lambda: [0, 0])
+        self._errors_by_type: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        self._events: Dict[str, int] = defaultdict(int)
+        self._recent_errors = deque(maxlen=RECENT_ERRORS)
+        self._recent_calls: Dict[str, deque] = defaultdict(deque)
+        self.started_at = time.time()
+
+    def record(
+        self,
+        service: str,
+        operation: str,
+        seconds: float,
+        error: Optional[BaseException] = None,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+        action: Optional[str] = None,
+    ):
+        action = action or _current_action.get()
+        now = time.time()
+
+        with self._lock:
+            stats = self._stats[(service, operation)]
+            stats.calls += 1
+            stats.seconds += seconds
+            stats.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            stats.bytes_sent += bytes_sent
+            stats.bytes_received += bytes_received
+
+            per_action = self._by_action[(service, operation, action)]
+            per_action[0] += 1
+
+            recent = self._recent_calls[service]
+            recent.append(now)
+            while recent and now - recent[0] > RATE_WINDOW_SECONDS:
+                recent.popleft()
+
+            if error is not None:
+                stats.errors += 1
+                per_action[1] += 1
+                self._errors_by_type[(service, operation, error_type(error))] += 1
+                self._recent_errors.append({
+                    "time": now,
+                    "service": service,
+                    "operation": operation,
+                    "action": action,
+                    "error": f"{error_type(error)}: {str(error)[:200]}",
+                })
+
+    def count_event(self, name: str, amount: int = 1):
+        """
+        Counts something that is not an external call (e.g. "message_cache_hit").
+        """
+        with self._lock:
+            self._events[name] += amount
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._by_action.clear()
+            self._errors_by_type.clear()
+            self._events.clear()
+            self._recent_errors.clear()
+            self._recent_calls.clear()
+            self.started_at = time.time()
+
+    # ============================================
+    # READING
+    # ============================================
+
+    def calls_last_minute(self, service: str) -> int:
+        now = time.time()
+        with self._lock:
+            return sum(1 for t in self._recent_calls[service] if now - t <= RATE_WINDOW_SECONDS)
+
+    def summary(self) -> List[Dict]:
+        """
+        One row per service/operation: calls, errors, avg/p50/p95 latency, bytes.
+        """
+        with self._lock:
+            items = [(key, _copy(stats)) for key, stats in self._stats.items()]
+
+        rows = []
+        for (service, operation), stats in sorted(items):
+            rows.append({
+                "service": service,
+                "operation": operation,
+                "calls": stats.calls,
+                "errors": stats.errors,
+                "avg_ms": round(stats.seconds / stats.calls * 1000, 1) if stats.calls else 0.0,
+                "p50_ms": _percentile_ms(stats.buckets, 0.50),
+                "p95_ms": _percentile_ms(stats.buckets, 0.95),
+                "bytes_sent": stats.bytes_sent,
+                "bytes_received": stats.bytes_received,
+            })
+        return rows
+
+    def by_action(self) -> List[Dict]:
+        """
+        One row per page action / service / operation with calls and errors.
+        """
+        with self._lock:
+            items = [(key, list(counts)) for key, counts in self._by_action.items()]
+        return [
+            {"action": action, "service": service, "operation": operation, "calls": calls, "errors": errors}
+            for (service, operation, action), (calls, errors) in sorted(items, key=lambda i: (i[0][2], i[0][0], i[0][1]))
+        ]
+
+    def recent_errors(self) -> List[Dict]:
+        with self._lock:
+            return list(reversed(self._recent_errors))
+
+    def events(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._events)
+
+    def render_prometheus(self) -> str:
+        """
+        All metrics in the Prometheus text format (for GET /metrics).
+        """
+        with self._lock:
+            stats_items = sorted((key, _copy(stats)) for key, stats in self._stats.items())
+            action_items = sorted((key, list(counts)) for key, counts in self._by_action.items())
+            error_items = sorted(self._errors_by_type.items())
+            event_items = sorted(self._events.items())
+
+        lines = [
+            "# HELP hr_external_calls_total Calls to external services, by page action.",
+            "# TYPE hr_external_calls_total counter",
+        ]
+        for (service, operation, action), (calls, _) in action_items:
+            lines.append(f"hr_external_calls_total{_labels(service=service, operation=operation, action=action)} {calls}")
+
+        lines += [
+            "# HELP hr_external_errors_total Failed calls to external services, by error type.",
+            "# TYPE hr_external_errors_total counter",
+        ]
+        for (service, operation, error), count in error_items:
+            lines.append(f"hr_external_errors_total{_labels(service=service, operation=operation, error=error)} {count}")
+
+        lines += [
+            "# HELP hr_external_call_duration_seconds Latency of calls to external services.",
+            "# TYPE hr_external_call_duration_seconds histogram",
+        ]
+        for (service, operation), stats in stats_items:
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ["+Inf"], stats.buckets):
+                cumulative += count
+                lines.append(
+                    f"hr_external_call_duration_seconds_bucket"
+                    f"{_labels(service=service, operation=operation, le=bound)} {cumulative}"
+                )
+            labels = _labels(service=service, operation=operation)
+            lines.append(f"hr_external_call_duration_seconds_sum{labels} {stats.seconds:.6f}")
+            lines.append(f"hr_external_call_duration_seconds_count{labels} {stats.calls}")
+
+        for name, attribute, help_text in [
+            ("hr_external_bytes_sent_total", "bytes_sent", "Bytes sent to external services."),
+            ("hr_external_bytes_received_total", "bytes_received", "Bytes received from external services."),
+        ]:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for (service, operation), stats in stats_items:
+                lines.append(f"{name}{_labels(service=service, operation=operation)} {getattr(stats, attribute)}")
+
+        lines += [
+            "# HELP hr_events_total Internal events (cache hits, fallbacks, ...).",
+            "# TYPE hr_events_total counter",
+        ]
+        for name, count in event_items:
+            lines.append(f"hr_events_total{_labels(event=name)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _copy(stats: _Stats) -> _Stats:
+    copy = _Stats()
+    for name in _Stats.__slots__:
+        value = getattr(stats, name)
+        setattr(copy, name, list(value) if isinstance(value, list) else value)
+    return copy
+
+
+def _percentile_ms(buckets: List[int], fraction: float) -> Optional[float]:
+    """
+    Estimates a percentile from the histogram (upper bound of its bucket).
+    """
+    total = sum(buckets)
+    if total == 0:
+        return None
+    target = total * fraction
+    running = 0
+    for bound, count in zip(LATENCY_BUCKETS, buckets):
+        running += count
+        if running >= target:
+            return bound * 1000
+    return float("inf")
+
+
+def _labels(**labels) -> str:
+    parts = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+        parts.append(f'{name}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def error_type(error: BaseException) -> str:
+    """
+    Short error label - "429" etc. for HTTP errors, else the exception class.
+    """
+    code = getattr(error, "code", None)
+    if code is None:
+        code = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(code, int) and code > 0:
+        return str(code)
+    return type(error).__name__
+
+
+# ============================================
+# RECORDING HELPERS
+# ============================================
+
+_metrics_instance = Metrics()
+
+def get_metrics() -> Metrics:
+    """
+    Returns the process-wide Metrics registry.
+    """
+    return _metrics_instance
+
+
+@contextmanager
+def track(service: str, operation: str):
+    """
+    Times the block as one call to an external service.
+
+    Exceptions are recorded as errors and re-raised.
+    """
+    call = Call(service, operation)
+    token = _current_call.set(call)
+    started = time.perf_counter()
+    error = None
+    try:
+        yield call
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _current_call.reset(token)
+        _metrics_instance.record(
+            service, operation, time.perf_counter() - started, error=error,
+            bytes_sent=call.bytes_sent, bytes_received=call.bytes_received
+        )
+
+
+def add_bytes(sent: int = 0, received: int = 0):
+    """
+    Adds bytes to the call currently being tracked (no-op outside track()).
+    """
+    call = _current_call.get()
+    if call is not None:
+        call.add_bytes(sent, received)
+
+
+@contextmanager
+def page_action(page: str, action: Optional[str] = None):
+    """
+    Labels every call made inside the block, e.g. "Pipeline/Save Changes".
+    """
+    token = _current_action.set(f"{page}/{action}" if action else page)
+    try:
+        yield
+    finally:
+        _current_action.reset(token)
+
+
+def set_page(page: str, action: Optional[str] = None):
+    """
+    Labels every call for the rest of this script run (top of a Streamlit page).
+    """
+    _current_action.set(f"{page}/{action}" if action else page)
+
+
+def record_http_response(response, *args, **kwargs):
+    """
+    requests response hook - adds the exact request/response sizes to the
+    call being tracked (used on the gspread HTTP session).
+    """
+    request_body = response.request.body if response.request is not None else None
+    add_bytes(sent=len(request_body or b""), received=len(response.content or b""))
+    return response
+
+
+class InstrumentedWorksheet:
+    """
+    Wraps a gspread Worksheet so every method call is tracked as one
+    "sheets" call, named after the method (find, batch_update, ...).
+
+    Attributes (id, title, ...) pass straight through.
+    """
+
+    def __init__(self, worksheet, service: str = "sheets"):
+        self._worksheet = worksheet
+        self._service = service
+
+    def __getattr__(self, name):
+        value = getattr(self._worksheet, name)
+        if not callable(value) or name.startswith("_"):
+            return value
+
+        def _tracked(*args, **kwargs):
+            with track(self._service, name):
+                return value(*args, **kwargs)
+
+        return _tracked
+
+    @property
+    def unwrapped(self):
+        return self._worksheet
@@ -0,0 +1,294 @@
+"""
+Keeps Google Sheets calls under the API quota instead of failing with 429.
+
+Every worksheet call from SheetsConnector goes through one shared
+SheetsRateLimiter:
+- Token buckets for reads and writes, sized so no 60s window goes over
+  the per-minute quota - calls wait their turn instead of failing
+- Identical reads made at the same time share one request, and a read
+  repeated within SHEETS_READ_COALESCE_SECONDS reuses the last answer
+  (any write through the limiter throws those answers away)
+- On 429/5xx: retry with exponential backoff + jitter, and slow the
+  bucket down; it speeds back up to the quota as calls succeed. Writes
+  that aren't safe to repeat (appends, deletes) only retry a 429 - a 5xx
+  can come back after Google already applied them
+"""
+import random
+import threading
+import time
+from typing import Callable, Dict, Hashable, Optional, Tuple
+from utils.config import env
+
+
+# Google's default limit is 60 read and 60 write requests per minute per user
+SHEETS_QUOTA_PER_MINUTE = int(env("SHEETS_QUOTA_PER_MINUTE", "60"))
+SHEETS_READ_QUOTA_PER_MINUTE = int(env("SHEETS_READ_QUOTA_PER_MINUTE", str(SHEETS_QUOTA_PER_MINUTE)))
+SHEETS_WRITE_QUOTA_PER_MINUTE = int(env("SHEETS_WRITE_QUOTA_PER_MINUTE", str(SHEETS_QUOTA_PER_MINUTE)))
+SHEETS_MAX_RETRIES = int(env("SHEETS_MAX_RETRIES", "5"))
+SHEETS_MAX_BACKOFF_SECONDS = float(env("SHEETS_MAX_BACKOFF_SECONDS", "32"))
+SHEETS_READ_COALESCE_SECONDS = float(env("SHEETS_READ_COALESCE_SECONDS", "1"))
+
+# Worksheet methods that only read - everything else counts as a write
+READ_METHODS = {
+    "get_all_records", "get_all_values", "get_values", "get", "batch_get",
+    "row_values", "col_values", "find", "findall", "acell", "cell",
+}
+
+# Writes that set cells to given values - sending one twice changes nothing
+IDEMPOTENT_WRITE_METHODS = {
+    "update", "batch_update", "update_cell", "update_acell", "update_cells",
+    "update_title", "format", "batch_format", "clear", "batch_clear",
+}
+
+# Status codes Google asks clients to retry with backoff
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# The request was turned away, so even a non-idempotent write can be resent
+RATE_LIMITED_STATUS_CODES = {429}
+
+
+class TokenBucket:
+    """
+    Hands out up to `per_minute` tokens a minute, at most `burst` at once.
+
+    Refill is (per_minute - burst) / 60 per second, so even a full burst
+    followed by steady use stays within per_minute in any 60s window.
+    """
+
+    def __init__(self, per_minute: int, burst: Optional[int] = None):
+        self.per_minute = per_minute
+        self.burst = burst if burst is not None else max(1, per_minute // 20)
+        self.max_rate = max(per_minute - self.burst, 1) / 60
+        self.rate = self.max_rate
+        self.tokens = float(self.burst)
+        self.paused_until = 0.0
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """
+        Blocks until a token is available, then takes it.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def throttle(self, pause_seconds: float):
+        """
+        After a 429: nobody calls for pause_seconds, then at half the rate.
+        """
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + pause_seconds)
+            self.rate = max(self.rate / 2, self.max_rate / 10)
+            self.tokens = 0.0
+
+    def recover(self):
+        """
+        After a success: creep back up towards the quota (+1 call/minute).
+        """
+        if self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + 1 / 60)
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """
+    Seconds from a Retry-After header, if the error carries one.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+def status_code(error: Exception) -> Optional[int]:
+    code = getattr(error, "code", None)
+    if not isinstance(code, int):
+        code = getattr(getattr(error, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SheetsRateLimiter:
+    """
+    Shared gate in front of every Sheets API call.
+
+    Args:
+        read_per_minute / write_per_minute: Quotas (None = no limit)
+        max_retries: Retries for 429 / 5xx (429 only for non-idempotent writes) before giving up
+        coalesce_seconds: How long a read answer is reused (0 = only share
+            reads that are in flight at the same time)
+    """
+
+    def __init__(
+        self,
+        read_per_minute: Optional[int] = SHEETS_READ_QUOTA_PER_MINUTE,
+        write_per_minute: Optional[int] = SHEETS_WRITE_QUOTA_PER_MINUTE,
+        max_retries: int = SHEETS_MAX_RETRIES,
+        max_backoff: float = SHEETS_MAX_BACKOFF_SECONDS,
+        coalesce_seconds: float = SHEETS_READ_COALESCE_SECONDS,
+    ):
+        self.buckets = {
+            "read": TokenBucket(read_per_minute) if read_per_minute else None,
+            "write": TokenBucket(write_per_minute) if write_per_minute else None,
+        }
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+        self.coalesce_seconds = coalesce_seconds
+
+        self._lock = threading.Lock()
+        self._flights: Dict[Tuple, _Flight] = {}
+        self._recent: Dict[Tuple, Tuple[float, object]] = {}
+        # Bumped on every write, so reads started before it aren't reused
+        self._generation = 0
+        self.stats = {"calls": 0, "coalesced": 0, "retries": 0}
+
+    def call(self, method: str, func: Callable, *args, scope: Hashable = None, **kwargs):
+        """
+        Runs one worksheet call (e.g. method="find") within the quota.
+
+        Reads are only shared between calls with the same scope (e.g. the
+        same worksheet) - row_values(1) of two tabs are different answers.
+        """
+        if method not in READ_METHODS:
+            # A repeated append adds the rows twice; a repeated delete-by-index removes the next rows
+            retry_codes = RETRY_STATUS_CODES if method in IDEMPOTENT_WRITE_METHODS else RATE_LIMITED_STATUS_CODES
+            result = self._send("write", func, args, kwargs, retry_codes)
+            with self._lock:
+                self._generation += 1
+                self._recent.clear()
+            return result
+
+        try:
+            key = (scope, method, args, tuple(sorted(kwargs.items())))
+            hash(key)
+        except TypeError:
+            # Unhashable arguments (lists, ...) - just send it
+            return self._send("read", func, args, kwargs)
+
+        with self._lock:
+            recent = self._recent.get(key)
+            if recent and time.monotonic() - recent[0] <= self.coalesce_seconds:
+                self.stats["coalesced"] += 1
+                return _copy(recent[1])
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                generation = self._generation
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return _copy(flight.result)
+
+        try:
+            flight.result = self._send("read", func, args, kwargs)
+            return _copy(flight.result)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+                if flight.error is None and generation == self._generation and self.coalesce_seconds > 0:
+                    self._recent[key] = (time.monotonic(), flight.result)
+            flight.done.set()
+
+    def _send(self, kind: str, func: Callable, args, kwargs, retry_codes=RETRY_STATUS_CODES):
+        bucket = self.buckets[kind]
+
+        for attempt in range(self.max_retries + 1):
+            if bucket is not None:
+                bucket.acquire()
+            with self._lock:
+                self.stats["calls"] += 1
+
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                if status_code(e) not in retry_codes or attempt == self.max_retries:
+                    raise
+
+                # Exponential backoff with jitter, so waiting callers don't all retry at once
+                backoff = min(self.max_backoff, 2 ** attempt)
+                pause = max(random.uniform(backoff / 2, backoff), retry_after(e) or 0)
+                if bucket is not None:
+                    bucket.throttle(pause)
+                with self._lock:
+                    self.stats["retries"] += 1
+                print(f"⚠️ Sheets {status_code(e)} - retrying in {pause:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+                if bucket is None:
+                    time.sleep(pause)
+                continue
+
+            if bucket is not None:
+                bucket.recover()
+            return result
+
+
+def _copy(result):
+    # Callers get their own list, so one caller can't change another's answer
+    return list(result) if isinstance(result, list) else result
+
+
+class RateLimitedWorksheet:
+    """
+    Wraps a worksheet so every method call goes through the limiter.
+
+    Attributes (id, title, ...) pass straight through.
+    """
+
+    def __init__(self, worksheet, limiter: SheetsRateLimiter):
+        self._worksheet = worksheet
+        self._limiter = limiter
+        self._scope = id(worksheet)
+
+    def __getattr__(self, name):
+        value = getattr(self._worksheet, name)
+        if not callable(value) or name.startswith("_"):
+            return value
+
+        def _limited(*args, **kwargs):
+            return self._limiter.call(name, value, *args, scope=self._scope, **kwargs)
+
+        return _limited
+
+
+_limiter_instance: Optional[SheetsRateLimiter] = None
+_limiter_lock = threading.Lock()
+
+def get_sheets_limiter() -> SheetsRateLimiter:
+    """
+    Returns the limiter shared by every connector in this process - the
+    quota is per user, so all pages and threads draw from the same buckets.
+    """
+    global _limiter_instance
+
+    with _limiter_lock:
+        if _limiter_instance is None:
+            _limiter_instance = SheetsRateLimiter()
+
+    return _limiter_instance
@@ -0,0 +1,323 @@
+"""
+Push-based reply detection with IMAP IDLE.
+
+Instead of searching the inbox once per candidate on every auto-check,
+one long-lived connection sits in IDLE and Gmail tells us when new mail
+arrives. New messages are matched by sender against the tracked
+candidates (the notice-period set) and recorded straight away:
+the candidate's HR alerts are resolved and Ghost Risk goes back to 10.
+
+- IDLE is restarted every IMAP_IDLE_REFRESH_SECONDS (servers drop
+  connections that idle too long - Gmail after about 10 minutes)
+- Dropped connections are re-opened with exponential backoff + jitter,
+  and mail that arrived in between is picked up by UID
+- check_for_reply() answers from here, with no IMAP round trip, when
+  the listener has been watching a candidate for the whole window
+
+Usage:
+    listener = get_reply_listener()
+    listener.track(["a@x.com", "b@y.com"])
+    listener.start()
+"""
+import email
+import imaplib
+import random
+import select
+import threading
+import time
+from email.utils import parseaddr, parsedate_to_datetime
+from typing import Callable, Dict, Iterable, Optional
+
+from utils.config import env
+from utils.metrics import add_bytes, get_metrics, page_action, track
+from utils.tenants import current_tenant, start_thread
+
+
+SMTP_EMAIL = env("SMTP_EMAIL")
+SMTP_PASSWORD = env("SMTP_PASSWORD")
+
+IMAP_HOST = "imap.gmail.com"
+IMAP_IDLE_REFRESH_SECONDS = float(env("IMAP_IDLE_REFRESH_SECONDS", "540"))
+IMAP_MAX_RECONNECT_SECONDS = float(env("IMAP_MAX_RECONNECT_SECONDS", "300"))
+
+# How often the IDLE loop wakes up to check for stop() - no traffic involved
+_POLL_SECONDS = 1.0
+
+
+class ReplyListener:
+    """
+    Background IMAP IDLE connection that records replies as they arrive.
+
+    Args:
+        on_reply: Called as on_reply(email, reply) for each reply from a
+            tracked candidate (runs on the listener thread)
+        refresh_seconds: How long one IDLE lasts before it is restarted
+    """
+
+    def __init__(
+        self,
+        on_reply: Optional[Callable[[str, Dict], None]] = None,
+        refresh_seconds: float = IMAP_IDLE_REFRESH_SECONDS,
+    ):
+        self.on_reply = on_reply
+        self.refresh_seconds = refresh_seconds
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # lowercased email -> when we started watching for it
+        self._tracked: Dict[str, float] = {}
+        # lowercased email -> as written in the sheet (updates match it exactly)
+        self._addresses: Dict[str, str] = {}
+        # email -> latest reply seen
+        self._replies: Dict[str, Dict] = {}
+
+        self._connected = False
+        self._uid_validity: Optional[int] = None
+        self._last_uid: Optional[int] = None
+        # Since when no mail can have been missed (reset if the mailbox's UIDs change)
+        self._watching_since: Optional[float] = None
+        self.stats = {"connects": 0, "reconnects": 0, "notifications": 0, "replies": 0}
+
+    # ============================================
+    # TRACKED CANDIDATES
+    # ============================================
+
+    def track(self, emails: Iterable[str]):
+        """
+        Sets which senders count as replies (e.g. everyone in notice period).
+        """
+        now = time.time()
+        addresses = {e.strip().lower(): e.strip() for e in emails if e and e.strip()}
+        with self._lock:
+            self._tracked = {e: self._tracked.get(e, now) for e in addresses}
+            self._addresses = addresses
+
+    def covers(self, from_email: str, since: float) -> bool:
+        """
+        True if every reply from this sender after `since` (unix time)
+        would have been seen - i.e. check_for_reply can trust last_reply().
+        """
+        with self._lock:
+            tracked_at = self._tracked.get(from_email.strip().lower())
+            return (
+                self._connected
+                and tracked_at is not None
+                and self._watching_since is not None
+                and max(tracked_at, self._watching_since) <= since
+            )
+
+    def last_reply(self, from_email: str) -> Optional[Dict]:
+        with self._lock:
+            reply = self._replies.get(from_email.strip().lower())
+            return dict(reply) if reply else None
+
+    def status(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "running": self._thread is not None and self._thread.is_alive(),
+                "connected": self._connected,
+                "tracked": len(self._tracked),
+                "watching_since": self._watching_since,
+                **self.stats,
+            }
+
+    # ============================================
+    # BACKGROUND THREAD
+    # ============================================
+
+    def start(self):
+        """
+        Starts the listener thread (safe to call on every rerun).
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        # Same tenant as the caller, so on_reply updates that tenant's sheet
+        self._thread = start_thread(self._run, name="imap-reply-listener")
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        attempt = 0
+
+        while not self._stop.is_set():
+            mail = None
+            try:
+                mail = self._open()
+                attempt = 0
+                while not self._stop.is_set():
+                    self._fetch_new(mail)
+                    # Only trusted (covers()) once replies that came in while
+                    # we were disconnected have been read
+                    with self._lock:
+                        self._connected = True
+                    self._idle(mail)
+            except Exception as e:
+                with self._lock:
+                    self._connected = False
+                    self.stats["reconnects"] += 1
+                get_metrics().count_event("imap_idle_reconnect")
+
+                backoff = min(IMAP_MAX_RECONNECT_SECONDS, 2 ** attempt)
+                pause = random.uniform(backoff / 2, backoff)
+                attempt += 1
+                print(f"⚠️ Reply listener disconnected ({e}) - reconnecting in {pause:.0f}s")
+                self._stop.wait(pause)
+            finally:
+                with self._lock:
+                    self._connected = False
+                if mail is not None:
+                    try:
+                        mail.logout()
+                    except Exception:
+                        pass
+
+    def _open(self) -> imaplib.IMAP4_SSL:
+        with track("imap", "idle_connect"):
+            mail = imaplib.IMAP4_SSL(IMAP_HOST, 993)
+            mail.login(SMTP_EMAIL, SMTP_PASSWORD)
+            mail.select("inbox")
+
+        # SELECT told us the mailbox's UIDVALIDITY and the next UID
+        uid_validity = _response_int(mail, "UIDVALIDITY")
+        uid_next = _response_int(mail, "UIDNEXT")
+
+        with self._lock:
+            if self._last_uid is None or uid_validity != self._uid_validity:
+                # First connect (or the mailbox was rebuilt): start from what's there now
+                if uid_next is None:
+                    _, data = mail.uid("search", None, "ALL")
+                    uids = data[0].split()
+                    uid_next = int(uids[-1]) + 1 if uids else 1
+                self._uid_validity = uid_validity
+                self._last_uid = uid_next - 1
+                self._watching_since = time.time()
+            self.stats["connects"] += 1
+
+        return mail
+
+    def _fetch_new(self, mail: imaplib.IMAP4_SSL):
+        """
+        Reads the sender of every message that arrived since the last check.
+        """
+        with track("imap", "idle_fetch"):
+            _, data = mail.uid("search", None, f"UID {self._last_uid + 1}:*")
+            # "n:*" always matches the newest message, even if it is older than n
+            uids = [int(uid) for uid in data[0].split() if int(uid) > self._last_uid]
+            if not uids:
+                return
+
+            _, data = mail.uid(
+                "fetch", ",".join(str(uid) for uid in uids),
+                "(BODY.PEEK[HEADER.FIELDS (FROM DATE SUBJECT)])"
+            )
+            messages = []
+            for part in data:
+                if isinstance(part, tuple):
+                    add_bytes(received=len(part[1]))
+                    messages.append(email.message_from_bytes(part[1]))
+
+        self._last_uid = max(uids)
+        for msg in messages:
+            self._record(msg)
+
+    def _record(self, msg):
+        sender = parseaddr(msg["From"] or "")[1].lower()
+
+        with self._lock:
+            if sender not in self._tracked:
+                return
+            try:
+                received_at = parsedate_to_datetime(msg["Date"]).timestamp()
+            except (TypeError, ValueError):
+                received_at = time.time()
+            reply = {
+                "email": self._addresses.get(sender, sender),
+                "received_at": received_at,
+                "date": msg["Date"],
+                "subject": msg["Subject"],
+            }
+            self._replies[sender] = reply
+            self.stats["replies"] += 1
+
+        get_metrics().count_event("reply_pushed")
+        if self.on_reply is not None:
+            try:
+                self.on_reply(reply["email"], reply)
+            except Exception as e:
+                print(f"❌ Reply handler failed for {sender}: {e}")
+
+    def _idle(self, mail: imaplib.IMAP4_SSL):
+        """
+        Waits in IDLE until the server reports a change, the refresh
+        interval passes or stop() is called.
+        """
+        tag = mail._new_tag()
+        mail.send(tag + b" IDLE\r\n")
+        line = mail.readline()
+        if not line.startswith(b"+"):
+            raise imaplib.IMAP4.error(f"IDLE refused: {line.strip()!r}")
+
+        deadline = time.monotonic() + self.refresh_seconds
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            # SSL may already hold decrypted bytes that select() can't see
+            pending = getattr(mail.sock, "pending", lambda: 0)()
+            if pending or select.select([mail.sock], [], [], _POLL_SECONDS)[0]:
+                if not mail.readline():
+                    raise imaplib.IMAP4.abort("connection closed during IDLE")
+                # Any untagged update (EXISTS, EXPUNGE, ...) - end IDLE and look for new mail
+                with self._lock:
+                    self.stats["notifications"] += 1
+                break
+
+        mail.send(b"DONE\r\n")
+        while True:
+            line = mail.readline()
+            if not line:
+                raise imaplib.IMAP4.abort("connection closed after IDLE")
+            if line.startswith(tag):
+                if not line[len(tag):].strip().startswith(b"OK"):
+                    raise imaplib.IMAP4.error(f"IDLE failed: {line.strip()!r}")
+                return
+
+
+def _response_int(mail: imaplib.IMAP4_SSL, name: str) -> Optional[int]:
+    _, data = mail.response(name)
+    try:
+        return int(data[-1])
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def _record_reply(from_email: str, reply: Dict):
+    """
+    Default on_reply: the candidate is engaged again - clear their HR
+    alerts and put Ghost Risk back to 10 right away.
+    """
+    from utils.hr_alerts import get_alert_manager
+    from utils.sheets_connector import get_connector
+
+    get_alert_manager().resolve(from_email)
+    with page_action("Anti-Ghosting", "Reply Listener"):
+        get_connector().batch_update_candidates({from_email: {"Ghost_Risk": "10"}})
+    print(f"📬 Reply from {from_email} ({reply['subject']})")
+
+
+_listener_instances: Dict[str, ReplyListener] = {}
+_listener_lock = threading.Lock()
+
+def get_reply_listener() -> ReplyListener:
+    """
+    Returns the current tenant's ReplyListener (not started - call start()).
+    """
+    tenant_id = current_tenant().tenant_id
+
+    with _listener_lock:
+        if tenant_id not in _listener_instances:
+            _listener_instances[tenant_id] = ReplyListener(on_reply=_record_reply)
+
+        return _listener_instances[tenant_id]
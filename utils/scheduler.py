@@ -0,0 +1,312 @@
+from __future__ import annotations
+from datetime import datetime, timedelta, date
+from typing import Dict, Optional, TYPE_CHECKING
+from utils.config import env
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+TIME_SLOTS = [
+    "9:00 AM", "10:00 AM", "11:00 AM", "12:00 PM",
+    "2:00 PM", "3:00 PM", "4:00 PM", "5:00 PM"
+]
+
+# plan_gap_fill never books or moves an interview closer than this (days)
+RESCHEDULE_NOTICE_DAYS = int(env("RESCHEDULE_NOTICE_DAYS", "1"))
+
+
+def _next_weekday(current_date: date) -> date:
+    current_date += timedelta(days=1)
+    while current_date.weekday() >= 5:
+        current_date += timedelta(days=1)
+    return current_date
+
+
+def plan_interviews(
+    all_candidates: pd.DataFrame,
+    candidates_df: pd.DataFrame,
+    interview_type: str = "L1",
+    start_date: Optional[date] = None,
+    start_time_slot: Optional[str] = None
+) -> Dict[str, Dict[str, str]]:
+    """
+    Works out interview slots for candidates - in memory, nothing is written.
+
+    Each unscheduled candidate gets the earliest free slot, starting from
+    start_date/start_time_slot and moving on to the next weekday when a
+    day is full.
+
+    Args:
+        all_candidates: Full candidate table (to see which slots are taken)
+        candidates_df: Candidates to schedule (e.g. everyone in Screening)
+        interview_type: "L1" or "L2"
+        start_date: First day to use (default: today)
+        start_time_slot: First slot to use each day (default: 9:00 AM)
+
+    Returns:
+        dict of email -> column updates, ready for
+        SheetsConnector.batch_update_candidates
+    """
+    date_col = f"{interview_type}_Date"
+    time_col = f"{interview_type}_Time"
+
+    unscheduled = candidates_df[
+        (candidates_df[date_col].isna()) | (candidates_df[date_col] == '')
+    ]
+
+    if len(unscheduled) == 0:
+        return {}
+
+    current_date = start_date if start_date is not None else datetime.now().date()
+
+    already_scheduled = all_candidates[
+        (all_candidates['Status'] == f'{interview_type}_Scheduled') &
+        (all_candidates[date_col] != '') &
+        (all_candidates[date_col].notna())
+    ]
+
+    # date -> set of taken slots, so each lookup is O(1) instead of a DataFrame filter
+    taken: Dict[str, set] = {}
+    for date_str, slot in zip(already_scheduled[date_col], already_scheduled[time_col]):
+        taken.setdefault(date_str, set()).add(slot)
+
+    if start_time_slot:
+        start_index = TIME_SLOTS.index(start_time_slot)
+        filtered_slots = TIME_SLOTS[start_index:]
+    else:
+        filtered_slots = TIME_SLOTS
+
+    plan = {}
+
+    for email in unscheduled['Email']:
+        available_slot = None
+
+        while available_slot is None:
+            date_str = current_date.strftime("%Y-%m-%d")
+            taken_slots = taken.setdefault(date_str, set())
+
+            for slot in filtered_slots:
+                if slot not in taken_slots:
+                    available_slot = slot
+                    break
+
+            if available_slot is None:
+                current_date = _next_weekday(current_date)
+
+        taken_slots.add(available_slot)
+        plan[email] = {
+            "Status": f"{interview_type}_Scheduled",
+            date_col: date_str,
+            time_col: available_slot
+        }
+
+    return plan
+
+
+def _slot_key(date_str: str, slot: str):
+    # Chronological sort key for a (date, slot) pair
+    return (date_str, TIME_SLOTS.index(slot))
+
+
+def plan_gap_fill(
+    all_candidates: pd.DataFrame,
+    interview_type: str = "L1",
+    start_date: Optional[date] = None,
+    start_time_slot: Optional[str] = None,
+    shift_bookings: bool = False,
+    notice_days: int = RESCHEDULE_NOTICE_DAYS,
+    now: Optional[datetime] = None
+) -> Dict[str, Dict[str, str]]:
+    """
+    Fills the slots freed by failed, rejected or reset candidates - in
+    memory, nothing is written.
+
+    A hole is a free weekday slot between start_date/start_time_slot and
+    the last booked interview (slots after that are what plan_interviews
+    is for), at least notice_days away - nobody is booked into a slot
+    that has passed or is too close to prepare for. Waiting candidates
+    (Screening for L1, L1_Done for L2, no date yet) get the earliest
+    holes, longest-waiting first by Applied_Date. With shift_bookings,
+    interviews booked later are then moved forward into the holes that
+    are left, in booking order - only ones at least notice_days away.
+
+    Args:
+        all_candidates: Full candidate table
+        interview_type: "L1" or "L2"
+        start_date: First day to fill (default: today; weekends move to Monday)
+        start_time_slot: First slot to use each day (default: 9:00 AM)
+        shift_bookings: Also move later interviews into earlier holes
+        notice_days: How many days ahead a hole must be, and a moved interview
+        now: For tests (default: now)
+
+    Returns:
+        dict of email -> column updates, ready for
+        SheetsConnector.batch_update_candidates. Waiting candidates get
+        Status + date + time, moved ones only the new date + time.
+    """
+    import heapq
+    import pandas as pd
+
+    date_col = f"{interview_type}_Date"
+    time_col = f"{interview_type}_Time"
+    waiting_status = "Screening" if interview_type == "L1" else "L1_Done"
+
+    now = now or datetime.now()
+    today = now.date()
+    current_date = max(start_date, today) if start_date is not None else today
+    if current_date.weekday() >= 5:
+        current_date = _next_weekday(current_date)
+    day_slots = TIME_SLOTS[TIME_SLOTS.index(start_time_slot):] if start_time_slot else TIME_SLOTS
+    start_key = _slot_key(current_date.strftime("%Y-%m-%d"), day_slots[0])
+    notice_date = (today + timedelta(days=notice_days)).strftime("%Y-%m-%d")
+
+    booked = all_candidates[
+        (all_candidates['Status'] == f'{interview_type}_Scheduled') &
+        (all_candidates[date_col] != '') &
+        (all_candidates[date_col].notna())
+    ]
+
+    taken = set()
+    bookings = []
+    for email, date_str, slot in zip(booked['Email'], booked[date_col].astype(str), booked[time_col]):
+        taken.add((date_str, slot))
+        if slot in TIME_SLOTS and _slot_key(date_str, slot) >= start_key:
+            bookings.append((_slot_key(date_str, slot), email, date_str, slot))
+
+    if not bookings:
+        return {}
+    bookings.sort()
+    last_key = bookings[-1][0]
+
+    # Every free weekday slot from the start up to the last booking, earliest first
+    holes = []
+    while current_date.strftime("%Y-%m-%d") <= last_key[0]:
+        date_str = current_date.strftime("%Y-%m-%d")
+        if date_str >= notice_date:
+            for slot in day_slots:
+                key = _slot_key(date_str, slot)
+                if (
+                    key < last_key and (date_str, slot) not in taken and
+                    datetime.strptime(f"{date_str} {slot}", "%Y-%m-%d %I:%M %p") > now
+                ):
+                    holes.append((key, date_str, slot))
+        current_date = _next_weekday(current_date)
+    heapq.heapify(holes)
+
+    plan = {}
+
+    waiting = all_candidates[
+        (all_candidates['Status'] == waiting_status) &
+        ((all_candidates[date_col].isna()) | (all_candidates[date_col] == ''))
+    ]
+    if 'Applied_Date' in waiting.columns:
+        applied = pd.to_datetime(waiting['Applied_Date'].astype(str).str.slice(0, 10), format="%Y-%m-%d", errors="coerce")
+        # Longest waiting first; no date goes last, sheet order breaks ties
+        waiting = waiting.assign(_applied=applied).sort_values('_applied', kind='stable', na_position='last')
+
+    for email in waiting['Email']:
+        if not holes:
+            break
+        _, date_str, slot = heapq.heappop(holes)
+        plan[email] = {
+            "Status": f"{interview_type}_Scheduled",
+            date_col: date_str,
+            time_col: slot
+        }
+
+    if not shift_bookings:
+        return plan
+
+    for key, email, date_str, slot in bookings:
+        if not holes or holes[0][0] >= key:
+            continue
+        if date_str < notice_date:
+            continue
+
+        _, new_date, new_slot = heapq.heappop(holes)
+        plan[email] = {date_col: new_date, time_col: new_slot}
+        # The slot this interview leaves is a hole for the ones after it
+        heapq.heappush(holes, (key, date_str, slot))
+
+    return plan
+
+
+def interview_bookings(all_candidates: pd.DataFrame) -> pd.DataFrame:
+    """
+    Every scheduled L1 and L2 interview as one long table:
+    Round, Date, Time, Name, Email, Role, Interviewer.
+
+    Interviewer comes from the optional L1_Interviewer / L2_Interviewer
+    columns ("" when the sheet has none).
+    """
+    import pandas as pd
+
+    frames = []
+    for interview_type in ("L1", "L2"):
+        booked = all_candidates[all_candidates['Status'] == f'{interview_type}_Scheduled']
+        interviewer_col = f"{interview_type}_Interviewer"
+        frames.append(pd.DataFrame({
+            "Round": interview_type,
+            "Date": booked[f"{interview_type}_Date"].astype(str),
+            "Time": booked[f"{interview_type}_Time"].astype(str),
+            "Name": booked['Name'].astype(str),
+            "Email": booked['Email'].astype(str),
+            "Role": booked['Role'].astype(str),
+            "Interviewer": booked[interviewer_col].astype(str) if interviewer_col in booked.columns else "",
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def schedule_grid(
+    all_candidates: pd.DataFrame,
+    start_date: date,
+    end_date: date,
+    by_interviewer: bool = False,
+    default_interviewer: str = "Unassigned"
+) -> pd.DataFrame:
+    """
+    L1 and L2 bookings from start_date to end_date as one calendar grid,
+    built with a single pivot of bookings by date x slot.
+
+    Rows are TIME_SLOTS; columns are the weekdays in the range (plus any
+    weekend day that has a booking) - or (date, interviewer) lanes with
+    by_interviewer. A cell lists who is booked there ("📞 L1 Name" /
+    "🎯 L2 Name"). An L1 and an L2 in the same slot is normal; two bookings
+    of the same round with the same interviewer are a double booking and
+    are marked "⚠️".
+    """
+    bookings = interview_bookings(all_candidates)
+
+    days = []
+    current_date = start_date
+    while current_date <= end_date:
+        days.append(current_date.strftime("%Y-%m-%d"))
+        current_date += timedelta(days=1)
+
+    bookings = bookings[bookings['Date'].isin(days) & bookings['Time'].isin(TIME_SLOTS)]
+    booked_days = set(bookings['Date'])
+    days = [d for d in days if datetime.strptime(d, "%Y-%m-%d").weekday() < 5 or d in booked_days]
+
+    bookings = bookings.assign(Interviewer=bookings['Interviewer'].replace("", default_interviewer))
+    clashes = bookings.duplicated(['Date', 'Time', 'Round', 'Interviewer'], keep=False)
+    bookings = bookings.assign(
+        Label=clashes.map({True: "⚠️ ", False: ""})
+        + bookings['Round'].map({"L1": "📞 L1 ", "L2": "🎯 L2 "}) + bookings['Name']
+    )
+
+    columns = ['Date', 'Interviewer'] if by_interviewer else ['Date']
+    grid = bookings.pivot_table(
+        index='Time',
+        columns=columns,
+        values='Label',
+        aggfunc=lambda labels: ", ".join(labels)
+    )
+
+    if by_interviewer:
+        import pandas as pd
+        lanes = sorted(set(bookings['Interviewer'])) or [default_interviewer]
+        grid = grid.reindex(columns=pd.MultiIndex.from_product([days, lanes], names=columns))
+    else:
+        grid = grid.reindex(columns=days)
+
+    return grid.reindex(index=TIME_SLOTS).fillna("")
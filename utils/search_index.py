@@ -0,0 +1,304 @@
+from __future__ import annotations
+import re
+import heapq
+import threading
+from bisect import bisect_left
+from itertools import islice
+from typing import Dict, Iterator, List, Set, Tuple, TYPE_CHECKING
+
+from utils.tenants import current_tenant
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+SEARCH_FIELDS = ["Name", "Email", "Role", "Notes"]
+# Typos are only matched in these fields - they are what people misspell,
+# and it keeps the typo table small (emails/notes would blow it up)
+FUZZY_FIELDS = ["Name", "Role"]
+FUZZY_MIN_LENGTH = 4
+# Shorter query words only match whole words ("a" doesn't expand to every word
+# starting with a, but still finds the word "a" itself)
+PREFIX_MIN_LENGTH = 2
+# A query word expands to at most this many indexed words - the ones found
+# in the most candidates
+MAX_PREFIX_TOKENS = 50
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text) -> List[str]:
+    """
+    Splits text into lower-case words, e.g. "arjun.s@mail.com" -> ["arjun", "s", "mail", "com"].
+    """
+    if text is None:
+        return []
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+def _deletes(word: str) -> Set[str]:
+    """
+    Every version of the word with one letter removed (plus the word itself).
+    Two words share one of these if they are about one typo apart.
+    """
+    return {word} | {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+class CandidateSearchIndex:
+    """
+    In-memory inverted index over Name, Email, Role and Notes.
+
+    - Exact and prefix matches ("arj" finds "Arjun") via a sorted word list,
+      capped at the MAX_PREFIX_TOKENS most common words per query word
+    - Typo matches ("arjnu" finds "Arjun") for names and roles
+    - update() only re-indexes candidates whose text changed
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[str]] = {}      # word -> candidate emails
+        self._fuzzy: Dict[str, Set[str]] = {}         # deleted form -> words
+        self._doc_tokens: Dict[str, Set[str]] = {}    # email -> words
+        self._doc_fuzzy: Dict[str, Set[str]] = {}     # email -> fuzzy words
+        self._fuzzy_docs: Dict[str, int] = {}         # fuzzy word -> candidates with it in a fuzzy field
+        self._doc_text: Dict[str, Tuple] = {}         # email -> indexed values
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._doc_text)
+
+    # ============================================
+    # BUILDING THE INDEX
+    # ============================================
+
+    def _add(self, doc_id: str, record: Dict):
+        tokens, fuzzy_tokens = set(), set()
+        for field in SEARCH_FIELDS:
+            words = tokenize(record.get(field))
+            tokens.update(words)
+            if field in FUZZY_FIELDS:
+                fuzzy_tokens.update(w for w in words if len(w) >= FUZZY_MIN_LENGTH)
+
+        for token in tokens:
+            if token not in self._postings:
+                self._postings[token] = set()
+                self._vocabulary_dirty = True
+            self._postings[token].add(doc_id)
+
+        for token in fuzzy_tokens:
+            count = self._fuzzy_docs.get(token, 0)
+            self._fuzzy_docs[token] = count + 1
+            if count:
+                continue
+            for variant in _deletes(token):
+                self._fuzzy.setdefault(variant, set()).add(token)
+
+        self._doc_tokens[doc_id] = tokens
+        self._doc_fuzzy[doc_id] = fuzzy_tokens
+
+    def _remove(self, doc_id: str):
+        for token in self._doc_tokens.pop(doc_id, set()):
+            docs = self._postings.get(token)
+            if docs is None:
+                continue
+            docs.discard(doc_id)
+            if not docs:
+                del self._postings[token]
+                self._vocabulary_dirty = True
+
+        # Fuzzy entries point at words; only drop them once no candidate has
+        # the word in a fuzzy field (it may still be in someone's email/notes)
+        for token in self._doc_fuzzy.pop(doc_id, set()):
+            count = self._fuzzy_docs.get(token, 0) - 1
+            if count > 0:
+                self._fuzzy_docs[token] = count
+                continue
+            self._fuzzy_docs.pop(token, None)
+            for variant in _deletes(token):
+                words = self._fuzzy.get(variant)
+                if words is not None:
+                    words.discard(token)
+                    if not words:
+                        del self._fuzzy[variant]
+
+        self._doc_text.pop(doc_id, None)
+
+    def update(self, df: pd.DataFrame) -> Dict[str, int]:
+        """
+        Brings the index in line with the latest candidate table.
+
+        Only new, changed and removed candidates are touched, so calling
+        this after every refresh is cheap.
+
+        Returns:
+            dict with 'added', 'changed' and 'removed' counts
+        """
+        fields = [f for f in SEARCH_FIELDS if f in df.columns]
+        if 'Email' not in fields:
+            return {"added": 0, "changed": 0, "removed": 0}
+
+        records = df[fields].astype(object).where(df[fields].notna(), '').to_dict('records')
+        stats = {"added": 0, "changed": 0, "removed": 0}
+
+        with self._lock:
+            seen = set()
+            for record in records:
+                doc_id = str(record['Email']).strip().lower()
+                if not doc_id or doc_id in seen:
+                    continue
+                seen.add(doc_id)
+
+                text = tuple(record.get(f, '') for f in SEARCH_FIELDS)
+                old_text = self._doc_text.get(doc_id)
+                if old_text == text:
+                    continue
+
+                if old_text is not None:
+                    self._remove(doc_id)
+                    stats["changed"] += 1
+                else:
+                    stats["added"] += 1
+
+                self._add(doc_id, record)
+                self._doc_text[doc_id] = text
+
+            for doc_id in [d for d in self._doc_text if d not in seen]:
+                self._remove(doc_id)
+                stats["removed"] += 1
+
+            # Sort the word list now rather than on the first search
+            self._sorted_vocabulary()
+
+        return stats
+
+    # ============================================
+    # SEARCHING
+    # ============================================
+
+    def _sorted_vocabulary(self) -> List[str]:
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        return self._vocabulary
+
+    def _prefix_tokens(self, prefix: str) -> List[str]:
+        """
+        Returns up to MAX_PREFIX_TOKENS indexed words starting with prefix.
+
+        The word itself always comes first, if present. When more words
+        share the prefix, the ones found in the most candidates are kept,
+        so a short prefix doesn't just return the alphabetically first words.
+        Words shorter than PREFIX_MIN_LENGTH only match themselves.
+        """
+        exact = [prefix] if prefix in self._postings else []
+        if len(prefix) < PREFIX_MIN_LENGTH:
+            return exact
+
+        vocabulary = self._sorted_vocabulary()
+        start = bisect_left(vocabulary, prefix)
+        # Every word starting with prefix sorts before prefix + the highest character
+        end = bisect_left(vocabulary, prefix + "\U0010ffff", start)
+
+        if end - start <= MAX_PREFIX_TOKENS:
+            return vocabulary[start:end]
+
+        others = (token for token in vocabulary[start:end] if token != prefix)
+        return exact + heapq.nlargest(
+            MAX_PREFIX_TOKENS - len(exact), others, key=lambda token: len(self._postings[token])
+        )
+
+    def _match_term(self, term: str) -> Tuple[List[Set[str]], List[Set[str]], List[Set[str]]]:
+        """
+        Returns the email sets for one query word, as lists of sets a
+        matching email is in one of:
+        (exact word, exact or start of a word, any match including typos).
+
+        The sets are the index's own - never modify them.
+        """
+        exact = [self._postings[term]] if term in self._postings else []
+
+        prefix_tokens = self._prefix_tokens(term)
+        prefix = [self._postings[token] for token in prefix_tokens]
+
+        matched = prefix
+        if len(term) >= FUZZY_MIN_LENGTH:
+            similar = set()
+            for variant in _deletes(term):
+                similar.update(self._fuzzy.get(variant, ()))
+            similar.difference_update(prefix_tokens)
+            matched = prefix + [self._postings[token] for token in similar if token in self._postings]
+
+        return exact, prefix, matched
+
+    @staticmethod
+    def _matching(terms_sets: List[List[Set[str]]]) -> Iterator[str]:
+        """
+        Yields the emails found in one of the sets of every term, walking
+        only the term with the fewest emails and looking the rest up -
+        no set is copied, and the walk stops as soon as the caller does.
+        """
+        if any(not sets for sets in terms_sets):
+            return
+        terms_sets = sorted(terms_sets, key=lambda sets: sum(len(s) for s in sets))
+        smallest, others = terms_sets[0], terms_sets[1:]
+
+        seen: Set[str] = set()
+        for docs in smallest:
+            for doc_id in docs:
+                if len(smallest) > 1:
+                    if doc_id in seen:
+                        continue
+                    seen.add(doc_id)
+                if all(any(doc_id in s for s in sets) for sets in others):
+                    yield doc_id
+
+    def search(self, query: str, limit: int = 100) -> List[str]:
+        """
+        Finds candidates matching every word of the query.
+
+        Results where every word matched exactly come first, then those
+        where every word matched at least the start of a word, then typo
+        matches.
+
+        Args:
+            query: Free text, e.g. "arjun backend" or "priya@gm"
+            limit: Max number of results
+
+        Returns:
+            list of candidate emails (lower-case), best matches first
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        with self._lock:
+            matches = [self._match_term(term) for term in terms]
+
+            # Only walk as far into each group as needed to fill `limit`
+            results: List[str] = []
+            found: Set[str] = set()
+            for level in range(3):
+                if len(results) >= limit:
+                    break
+                group = (d for d in self._matching([m[level] for m in matches]) if d not in found)
+                batch = sorted(islice(group, limit - len(results)))
+                results.extend(batch)
+                found.update(batch)
+
+        return results
+
+
+_search_index_instances: Dict[str, CandidateSearchIndex] = {}
+_search_index_lock = threading.Lock()
+
+def get_search_index() -> CandidateSearchIndex:
+    """
+    Returns the current tenant's search index (empty until update() is called).
+    """
+    tenant_id = current_tenant().tenant_id
+
+    with _search_index_lock:
+        if tenant_id not in _search_index_instances:
+            _search_index_instances[tenant_id] = CandidateSearchIndex()
+
+        return _search_index_instances[tenant_id]
@@ -0,0 +1,399 @@
+"""
+One logical candidate table spread over several tabs (or spreadsheets).
+
+We run one tab per hiring drive/region. With SHEET_SHARDS set,
+get_connector() returns a ShardedSheetsConnector instead of a plain
+SheetsConnector - same methods, so the pages don't know the difference:
+- get_all_candidates() pulls every shard in parallel (one values
+  batch_get per spreadsheet, however many of its tabs are shards) and
+  returns them as one DataFrame
+- Writes go to the shard the email lives in (an email -> shard index
+  built from every pull), new candidates to SHEET_DEFAULT_SHARD
+
+Usage (.env):
+    SHEET_SHARDS=Bangalore,Hyderabad,Campus Drive 2025!Sheet1
+"""
+from __future__ import annotations
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+from utils.config import env
+from utils.metrics import track
+from utils.rate_limiter import SheetsRateLimiter, get_sheets_limiter
+from utils.sheets_connector import CandidateWriteError, SheetsConnector
+from utils.snapshot import CandidateSnapshot
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Shard new candidates are added to (default: the first in SHEET_SHARDS)
+SHEET_DEFAULT_SHARD = env("SHEET_DEFAULT_SHARD", "")
+SHEET_SHARD_WORKERS = int(env("SHEET_SHARD_WORKERS", "4"))
+
+
+def values_to_frame(values: List[List]) -> pd.DataFrame:
+    """
+    A tab's raw values (header row first) as a DataFrame, converted the
+    same way as worksheet.get_all_records() - numbers as int/float, blanks as "".
+    """
+    import pandas as pd
+    from gspread.utils import fill_gaps, numericise_all, to_records
+
+    if not values:
+        return pd.DataFrame()
+
+    # The API drops trailing blank cells, so rows can be shorter than the header
+    values = fill_gaps(values)
+    headers, rows = values[0], values[1:]
+    return pd.DataFrame(to_records(headers, [numericise_all(row) for row in rows]))
+
+
+class ShardedSheetsConnector:
+    """
+    Several SheetsConnectors (one per tab) behind the SheetsConnector methods.
+
+    The shards share one rate limiter (the quota is per user, not per
+    sheet) and don't keep snapshots of their own - this class saves the
+    snapshot of the combined table.
+    """
+
+    def __init__(
+        self,
+        shards: Dict[str, SheetsConnector],
+        default_shard: Optional[str] = None,
+        rate_limiter: Optional[SheetsRateLimiter] = None,
+        snapshot: Optional[CandidateSnapshot] = None,
+        max_workers: int = SHEET_SHARD_WORKERS,
+    ):
+        """
+        Args:
+            shards: Shard name -> connector, in SHEET_SHARDS order (on
+                duplicate emails the earlier shard wins)
+            default_shard: Where add_candidate(s) write (default: the first)
+            rate_limiter: Quota gate for batch_get (default: the shared one)
+            snapshot: Saved after every full pull, dropped after every write
+            max_workers: Shards read/written at the same time
+        """
+        if not shards:
+            raise ValueError("❌ ShardedSheetsConnector needs at least one shard")
+
+        self.shards = shards
+        self.default_shard = default_shard or next(iter(shards))
+        if self.default_shard not in shards:
+            raise ValueError(f"❌ Unknown default shard '{self.default_shard}' (have: {', '.join(shards)})")
+
+        self.rate_limiter = rate_limiter or get_sheets_limiter()
+        self.snapshot = snapshot
+        self.max_workers = max(1, max_workers)
+
+        self._lock = threading.Lock()
+        self._email_shard: Dict[str, str] = {}
+
+    @classmethod
+    def connect(
+        cls,
+        specs: List[Tuple[str, str, Optional[str]]],
+        snapshot: Optional[CandidateSnapshot] = None,
+        rate_limiter: Optional[SheetsRateLimiter] = None,
+        client=None,
+    ) -> ShardedSheetsConnector:
+        """
+        Connects to every shard - the OAuth handshake happens once (or
+        not at all, given an authorized client), the tabs are then opened
+        in parallel with the same client.
+
+        Args:
+            specs: (name, spreadsheet name, tab title) from parse_sheet_shards()
+        """
+        rate_limiter = rate_limiter or get_sheets_limiter()
+        name, spreadsheet_name, worksheet_title = specs[0]
+        first = SheetsConnector(
+            rate_limiter=rate_limiter,
+            spreadsheet_name=spreadsheet_name,
+            worksheet_title=worksheet_title,
+            client=client
+        )
+
+        def _open(spec):
+            return SheetsConnector(
+                rate_limiter=rate_limiter,
+                spreadsheet_name=spec[1],
+                worksheet_title=spec[2],
+                client=first.client
+            )
+
+        with ThreadPoolExecutor(max_workers=max(1, min(SHEET_SHARD_WORKERS, len(specs)))) as pool:
+            others = list(pool.map(_open, specs[1:]))
+
+        shards = {name: first}
+        shards.update((spec[0], connector) for spec, connector in zip(specs[1:], others))
+        return cls(shards, default_shard=SHEET_DEFAULT_SHARD or None, rate_limiter=rate_limiter, snapshot=snapshot)
+
+    @property
+    def worksheet(self):
+        # Header row / appends of new candidates (e.g. bulk_import) use the default shard
+        return self.shards[self.default_shard].worksheet
+
+    def archive_worksheet(self, create: bool = True):
+        # The archive tab lives next to the default shard
+        return self.shards[self.default_shard].archive_worksheet(create)
+
+    def _each(self, func: Callable, names: List) -> List:
+        # func(name) for every name, up to max_workers at a time, results in order.
+        # Each task runs in a copy of the caller's context, so it works for
+        # the caller's tenant (like start_thread) - a pool thread would
+        # otherwise see the default tenant
+        if len(names) <= 1:
+            return [func(name) for name in names]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(names))) as pool:
+            futures = [pool.submit(contextvars.copy_context().run, func, name) for name in names]
+            return [future.result() for future in futures]
+
+    def _sheet_changed(self):
+        # The saved snapshot no longer matches the sheet
+        if self.snapshot is not None:
+            self.snapshot.invalidate()
+
+    # ============================================
+    # READS
+    # ============================================
+
+    def _fetch_group(self, names: List[str]) -> List[List[List]]:
+        """
+        Raw values of these shards, which are tabs of the same spreadsheet,
+        in ONE values batch_get request.
+        """
+        from gspread.utils import absolute_range_name
+
+        connectors = [self.shards[name] for name in names]
+        sheet = connectors[0].sheet
+        if sheet is None:
+            # Injected worksheets (benchmarks/) have no spreadsheet to batch on
+            return [connector.worksheet.get_all_values() for connector in connectors]
+
+        ranges = tuple(absolute_range_name(connector.worksheet.title) for connector in connectors)
+
+        def _batch_get(ranges):
+            with track("sheets", "batch_get"):
+                return sheet.values_batch_get(list(ranges))
+
+        # Not a worksheet method, so it goes through the limiter here
+        response = self.rate_limiter.call("batch_get", _batch_get, ranges, scope=sheet.id)
+        return [value_range.get("values", []) for value_range in response.get("valueRanges", [])]
+
+    def get_all_candidates(self) -> pd.DataFrame:
+        """
+        Fetches every shard in parallel and returns them as one DataFrame.
+
+        Columns are the union of the shards' headers (blank where a shard
+        doesn't have one). df.attrs['shard_rows'] has the rows per shard.
+        """
+        import pandas as pd
+
+        started = time.time()
+
+        # One request per spreadsheet, not per tab
+        groups: Dict[object, List[str]] = {}
+        for name, connector in self.shards.items():
+            key = connector.sheet.id if connector.sheet is not None else name
+            groups.setdefault(key, []).append(name)
+
+        fetched = self._each(self._fetch_group, list(groups.values()))
+
+        values = {}
+        for names, group_values in zip(groups.values(), fetched):
+            values.update(zip(names, group_values))
+        frames = {name: values_to_frame(values.get(name, [])) for name in self.shards}
+
+        email_shard = {}
+        for name, frame in frames.items():
+            if "Email" in frame.columns:
+                for email in frame["Email"].astype(str).tolist():
+                    email_shard.setdefault(email, name)
+        with self._lock:
+            self._email_shard = email_shard
+
+        non_empty = [frame for frame in frames.values() if len(frame.columns)]
+        if non_empty:
+            df = pd.concat(non_empty, ignore_index=True, sort=False).fillna("")
+        else:
+            df = pd.DataFrame()
+        df.attrs["fetched_at"] = started
+        df.attrs["shard_rows"] = {name: len(frame) for name, frame in frames.items()}
+
+        # Next process start can show this straight away
+        if self.snapshot is not None:
+            self.snapshot.save(df, fetched_at=started)
+
+        return df
+
+    def get_email_index(self, headers: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        Returns email -> row number within the email's shard (one Email
+        column read per shard, in parallel). shard_of() says which shard.
+
+        Args:
+            headers: Header row of the default shard, if the caller already fetched it
+        """
+        names = list(self.shards)
+
+        def _index(name):
+            return self.shards[name].get_email_index(headers if name == self.default_shard else None)
+
+        email_rows: Dict[str, int] = {}
+        email_shard: Dict[str, str] = {}
+        for name, index in zip(names, self._each(_index, names)):
+            for email, row_number in index.items():
+                if email not in email_shard:
+                    email_shard[email] = name
+                    email_rows[email] = row_number
+
+        with self._lock:
+            self._email_shard = email_shard
+        return email_rows
+
+    def shard_of(self, email: str) -> Optional[str]:
+        """
+        The shard this email lives in (None if it isn't in any).
+        """
+        return self._locate([email]).get(email)
+
+    def _locate(self, emails: List[str]) -> Dict[str, str]:
+        # email -> shard, re-reading the Email columns only if one is unknown
+        with self._lock:
+            known = dict(self._email_shard)
+        if any(email not in known for email in emails):
+            self.get_email_index()
+            with self._lock:
+                known = dict(self._email_shard)
+        return {email: known[email] for email in emails if email in known}
+
+    def get_candidates_by_status(self, status: str) -> pd.DataFrame:
+        df = self.get_all_candidates()
+        return df[df['Status'] == status]
+
+    # ============================================
+    # WRITES
+    # ============================================
+
+    def update_candidate_status(
+        self,
+        email: str,
+        new_status: str,
+        additional_updates: Optional[Dict[str, str]] = None
+    ) -> bool:
+        """
+        Same as SheetsConnector.update_candidate_status, on the email's shard.
+        """
+        name = self.shard_of(email)
+        if name is None:
+            print(f"⚠️ Candidate with email {email} not found")
+            return False
+
+        updated = self.shards[name].update_candidate_status(email, new_status, additional_updates)
+        if updated:
+            self._sheet_changed()
+        return updated
+
+    def batch_update_candidates(self, updates: Dict[str, Dict[str, str]]) -> int:
+        """
+        Same as SheetsConnector.batch_update_candidates - one batch_update
+        per shard that has updates, the shards in parallel.
+        """
+        try:
+            return len(self.write_candidates(updates))
+        except CandidateWriteError as e:
+            print(f"❌ Error in batch update: {e}")
+            return len(e.written)
+
+    def write_candidates(self, updates: Dict[str, Dict[str, str]]) -> List[str]:
+        """
+        Same as SheetsConnector.write_candidates. If a shard fails, the
+        CandidateWriteError lists what the other shards saved.
+        """
+        if not updates:
+            return []
+
+        located = self._locate(list(updates))
+        by_shard: Dict[str, Dict[str, Dict[str, str]]] = {}
+        for email, columns in updates.items():
+            name = located.get(email)
+            if name is None:
+                print(f"⚠️ Candidate with email {email} not found")
+                continue
+            by_shard.setdefault(name, {})[email] = columns
+
+        def _write(name):
+            try:
+                return self.shards[name].write_candidates(by_shard[name]), None
+            except CandidateWriteError as e:
+                return e.written, e
+
+        results = self._each(_write, list(by_shard))
+        written = [email for emails, _ in results for email in emails]
+        if written:
+            self._sheet_changed()
+
+        errors = [error for _, error in results if error is not None]
+        if errors:
+            raise CandidateWriteError(f"{len(errors)} shard(s) failed: {errors[0]}", written)
+        return written
+
+    def add_candidate(self, candidate_data: Dict[str, str], shard: Optional[str] = None) -> bool:
+        """
+        Adds a candidate to `shard` (default: the default shard).
+        """
+        name = shard or self.default_shard
+        added = self.shards[name].add_candidate(candidate_data)
+        if added:
+            with self._lock:
+                self._email_shard.setdefault(str(candidate_data.get('Email', '')), name)
+            self._sheet_changed()
+        return added
+
+    def add_candidates(
+        self,
+        candidates: List[Dict[str, str]],
+        headers: Optional[List[str]] = None,
+        shard: Optional[str] = None
+    ) -> int:
+        """
+        Adds many candidates to `shard` (default: the default shard) with
+        ONE append_rows call. headers must be that shard's header row.
+        """
+        name = shard or self.default_shard
+        added = self.shards[name].add_candidates(candidates, headers=headers)
+        if added:
+            with self._lock:
+                for candidate in candidates:
+                    self._email_shard.setdefault(str(candidate.get('Email', '')), name)
+            self._sheet_changed()
+        return added
+
+    def delete_candidates(self, emails: List[str], all_rows: bool = False) -> int:
+        """
+        Same as SheetsConnector.delete_candidates - one request per shard
+        that has rows to delete. With all_rows, every shard is checked
+        (an email can be in more than one).
+        """
+        if not emails:
+            return 0
+
+        by_shard: Dict[str, List[str]] = {}
+        if all_rows:
+            by_shard = {name: list(emails) for name in self.shards}
+        else:
+            for email, name in self._locate(list(emails)).items():
+                by_shard.setdefault(name, []).append(email)
+
+        names = list(by_shard)
+        deleted = sum(self._each(lambda name: self.shards[name].delete_candidates(by_shard[name], all_rows), names))
+        if deleted:
+            with self._lock:
+                for email in emails:
+                    self._email_shard.pop(email, None)
+            self._sheet_changed()
+        return deleted
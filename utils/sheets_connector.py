@@ -1,15 +1,88 @@
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-import pandas as pd
-from typing import Optional,List,Dict
-import os
-from dotenv import load_dotenv
-load_dotenv()
+from __future__ import annotations
+import time
+from typing import Optional,List,Dict,Tuple,TYPE_CHECKING
+from utils.config import env
+from utils.metrics import InstrumentedWorksheet, record_http_response, track
+from utils.rate_limiter import RateLimitedWorksheet, SheetsRateLimiter, get_sheets_limiter
+from utils.snapshot import CandidateSnapshot
+
+# gspread, oauth2client and pandas take ~0.8s to import together, so they
+# are imported where they are used - importing this module stays cheap
+if TYPE_CHECKING:
+    import pandas as pd
+    from utils.tenants import Tenant
 SCOPES=[
     'https://www.googleapis.com/auth/spreadsheets',
     'https://www.googleapis.com/auth/drive']
-CREDENTIALS_PATH=os.getenv('GOOGLE_CREDENTIALS_PATH','credentials.json') 
-SHEET_NAME=os.getenv('SHEET_NAME','Recruitment_Pipeline')
+CREDENTIALS_PATH=env('GOOGLE_CREDENTIALS_PATH','credentials.json') 
+SHEET_NAME=env('SHEET_NAME','Recruitment_Pipeline')
+# One logical candidate table split over several tabs (one per hiring
+# drive/region): comma-separated, each 'Tab' (a tab of SHEET_NAME) or
+# 'Spreadsheet!Tab'. Empty = the first tab of SHEET_NAME, as before.
+SHEET_SHARDS=env('SHEET_SHARDS','')
+
+def parse_sheet_shards(spec: str = SHEET_SHARDS, sheet_name: str = SHEET_NAME) -> List[Tuple[str, str, Optional[str]]]:
+    """
+    Parses SHEET_SHARDS (bare tab names are tabs of sheet_name).
+
+    Returns:
+        list: (shard name, spreadsheet name, tab title or None for the first tab)
+            e.g. "Bangalore, Campus 2025!Sheet1" ->
+            [("Bangalore", SHEET_NAME, "Bangalore"), ("Campus 2025!Sheet1", "Campus 2025", "Sheet1")]
+    """
+    shards = []
+    for entry in spec.split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        if '!' in entry:
+            spreadsheet, _, title = entry.partition('!')
+            shards.append((entry, spreadsheet.strip(), title.strip() or None))
+        else:
+            shards.append((entry, sheet_name, entry))
+    return shards
+
+
+class CandidateWriteError(Exception):
+    """
+    A batch write to the sheet failed. .written has the emails that were
+    saved anyway (e.g. on the other shards), so callers can act on those.
+    """
+
+    def __init__(self, message: str, written: Optional[List[str]] = None):
+        super().__init__(message)
+        self.written = list(written or [])
+
+
+def authorize(credentials_path: str = CREDENTIALS_PATH):
+    """
+    Returns an authorized gspread client (one HTTP session - share it
+    between connectors that use the same credentials).
+
+    The session is kept alive and its token refreshed in the background
+    before it expires (utils/sheets_session.py).
+    """
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+    from utils.sheets_session import SheetsHTTPClient
+
+    try:
+        # Create credentials object from JSON file
+        credentials = ServiceAccountCredentials.from_json_keyfile_name(credentials_path, SCOPES)
+    except FileNotFoundError:
+        raise Exception(
+            f"❌ Credentials file not found at: {credentials_path}\n"
+            "Please download from Google Cloud Console."
+        )
+
+    with track("sheets", "connect"):
+        client = gspread.authorize(credentials, http_client=SheetsHTTPClient)
+
+    # Count the exact bytes of every Sheets request/response
+    client.http_client.session.hooks["response"].append(record_http_response)
+    client.http_client.start_refresher()
+    return client
+
 class SheetsConnector:
     """
     A class to handle all Google Sheets operations.
@@ -19,48 +92,85 @@ class SheetsConnector:
     - The class "remembers" the connection (stores it in self.client)
     """
     
-    def __init__(self):                                    
+    def __init__(
+        self,
+        worksheet=None,
+        rate_limiter: Optional[SheetsRateLimiter] = None,
+        snapshot: Optional[CandidateSnapshot] = None,
+        spreadsheet_name: str = SHEET_NAME,
+        worksheet_title: Optional[str] = None,
+        client=None
+    ):
         """
         Constructor - runs when you create: connector = SheetsConnector()
+
+        Args:
+            worksheet: Use this worksheet instead of connecting to Google
+                (e.g. the in-memory FakeWorksheet in benchmarks/)
+            rate_limiter: Quota gate for API calls (default: the shared one)
+            snapshot: Saved after every full pull and dropped after every
+                write (utils/snapshot.py) - None for no snapshot
+            spreadsheet_name / worksheet_title: Which tab to use (default:
+                the first tab of SHEET_NAME)
+            client: An authorized gspread client to reuse (shards share one)
         """
-        self.client = None          
+        self.client = client
+        self.spreadsheet_name = spreadsheet_name
+        self.worksheet_title = worksheet_title
         self.sheet = None           
-        self.worksheet = None       
-        self._connect()             
+        self.rate_limiter = rate_limiter or get_sheets_limiter()
+        self.snapshot = snapshot
+        self.worksheet = None
+        self._archive_worksheet = None
+        if worksheet is None:
+            self._connect()             
+        else:
+            self.worksheet = self._wrap(worksheet)
+
+    def _wrap(self, worksheet):
+        """
+        Every worksheet call waits for the quota (utils/rate_limiter.py),
+        and each real request is counted/timed (utils/metrics.py).
+        """
+        return RateLimitedWorksheet(InstrumentedWorksheet(worksheet), self.rate_limiter)
 
     def _connect(self):                                       # Line 18
         """
         Establishes connection to Google Sheets.
         Private method (underscore prefix) - called internally.
         """
+        import gspread
+        from utils.sheets_session import open_spreadsheet
+
         try:                                                  # Line 19
-            # Step 1: Create credentials object from JSON file
-            credentials = ServiceAccountCredentials.from_json_keyfile_name(
-                CREDENTIALS_PATH, 
-                SCOPES
-            )                                                 # Line 20
-            
-            # Step 2: Authorize gspread with these credentials
-            self.client = gspread.authorize(credentials)      # Line 21
-            
-            # Step 3: Open the specific spreadsheet by name
-            self.sheet = self.client.open(SHEET_NAME)         # Line 22
-            
-            # Step 4: Get the first worksheet (tab) - index 0
-            self.worksheet = self.sheet.get_worksheet(0)      # Line 23
+            if self.client is None:
+                # Steps 1-2: Credentials from the JSON file, authorize gspread
+                self.client = authorize()                     # Line 21
+
+            with track("sheets", "connect"):
+                # Step 3: Open the specific spreadsheet by name (by its key once we know it)
+                self.sheet = open_spreadsheet(self.client, self.spreadsheet_name)  # Line 22
+
+                # Step 4: Get the configured tab, or the first one - index 0
+                if self.worksheet_title:
+                    worksheet = self.sheet.worksheet(self.worksheet_title)
+                else:
+                    worksheet = self.sheet.get_worksheet(0)   # Line 23
+
+            self.worksheet = self._wrap(worksheet)
             
-            print(f"✅ Connected to: {SHEET_NAME}")           # Line 24
+            print(f"✅ Connected to: {self.spreadsheet_name} / {worksheet.title}")  # Line 24
             
-        except FileNotFoundError:                             # Line 25
-            raise Exception(
-                f"❌ Credentials file not found at: {CREDENTIALS_PATH}\n"
-                "Please download from Google Cloud Console."
-            )
         except gspread.SpreadsheetNotFound:                   # Line 26
             raise Exception(
-                f"❌ Spreadsheet '{SHEET_NAME}' not found.\n"
+                f"❌ Spreadsheet '{self.spreadsheet_name}' not found.\n"
                 "Make sure you shared it with the service account email!"
             )
+        except gspread.WorksheetNotFound:
+            raise Exception(
+                f"❌ Tab '{self.worksheet_title}' not found in '{self.spreadsheet_name}'.\n"
+                "Check SHEET_SHARDS in your .env file."
+            )
         
     def get_all_candidates(self) -> pd.DataFrame:             
         """
@@ -69,13 +179,27 @@ class SheetsConnector:
         Returns:
             pd.DataFrame: All candidates with their data
         """
+        import pandas as pd
+
+        started = time.time()
+
         # Get all data including header row
         data = self.worksheet.get_all_records()               # Line 28
         
         # Convert to DataFrame
         df = pd.DataFrame(data)                               # Line 29
+        df.attrs["fetched_at"] = started
+
+        # Next process start can show this straight away
+        if self.snapshot is not None:
+            self.snapshot.save(df, fetched_at=started)
         
         return df                                             
+
+    def _sheet_changed(self):
+        # The saved snapshot no longer matches the sheet
+        if self.snapshot is not None:
+            self.snapshot.invalidate()
  
     def update_candidate_status(
         self, 
@@ -119,6 +243,7 @@ class SheetsConnector:
                     col_index = headers.index(column_name) + 1
                     self.worksheet.update_cell(row_number, col_index, value)
             
+            self._sheet_changed()
             print(f"✅ Updated {email} to status: {new_status}")
             return True
             
@@ -126,6 +251,141 @@ class SheetsConnector:
             print(f"❌ Error updating: {e}")
             return False
         
+    def get_email_index(self, headers: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        Returns email -> sheet row number, from a single read of the Email column.
+
+        Args:
+            headers: Header row, if the caller already fetched it
+
+        Returns:
+            dict: e.g. {"john@email.com": 2} (row 1 is the header)
+        """
+        if headers is None:
+            headers = self.worksheet.row_values(1)
+        email_col = headers.index('Email') + 1
+
+        emails = self.worksheet.col_values(email_col)
+        email_rows = {}
+        for row_number, value in enumerate(emails, start=1):
+            # First match wins, same as worksheet.find()
+            if row_number > 1 and value not in email_rows:
+                email_rows[value] = row_number
+        return email_rows
+
+    def get_email_rows(self, headers: Optional[List[str]] = None) -> Dict[str, List[int]]:
+        """
+        Like get_email_index, but with every row of an email that is in
+        the sheet more than once, e.g. {"john@email.com": [2, 57]}.
+        """
+        if headers is None:
+            headers = self.worksheet.row_values(1)
+        email_col = headers.index('Email') + 1
+
+        email_rows: Dict[str, List[int]] = {}
+        for row_number, value in enumerate(self.worksheet.col_values(email_col), start=1):
+            if row_number > 1:
+                email_rows.setdefault(value, []).append(row_number)
+        return email_rows
+
+    def archive_worksheet(self, create: bool = True):
+        """
+        The ARCHIVE_SHEET tab of this spreadsheet (utils/archive.py),
+        created with its header row if missing (or None with create=False).
+        None for a connector without a spreadsheet (a given worksheet).
+        """
+        import gspread
+        from utils.archive import ARCHIVE_HEADERS, ARCHIVE_SHEET
+
+        if self._archive_worksheet is not None or self.sheet is None:
+            return self._archive_worksheet
+
+        with track("sheets", "open_archive"):
+            try:
+                worksheet = self.sheet.worksheet(ARCHIVE_SHEET)
+            except gspread.WorksheetNotFound:
+                if not create:
+                    return None
+                try:
+                    worksheet = self.sheet.add_worksheet(ARCHIVE_SHEET, rows=1000, cols=len(ARCHIVE_HEADERS))
+                    worksheet.append_row(ARCHIVE_HEADERS)
+                except gspread.exceptions.APIError:
+                    # Another process created it first
+                    worksheet = self.sheet.worksheet(ARCHIVE_SHEET)
+
+        self._archive_worksheet = self._wrap(worksheet)
+        return self._archive_worksheet
+
+    def batch_update_candidates(self, updates: Dict[str, Dict[str, str]]) -> int:
+        """
+        Updates many candidates in ONE write request.
+
+        update_candidate_status does 2 reads + 1 write per cell; this does
+        2 reads (headers + Email column) and a single batch_update for everything.
+
+        Args:
+            updates: Dict of email -> {column_name: new_value}
+                Example: {"john@email.com": {"Status": "L1_Scheduled", "L1_Date": "2025-01-10"}}
+
+        Returns:
+            int: Number of candidates updated (unknown emails are skipped, 0 on error)
+        """
+        try:
+            return len(self.write_candidates(updates))
+        except CandidateWriteError as e:
+            print(f"❌ Error in batch update: {e}")
+            return len(e.written)
+
+    def write_candidates(self, updates: Dict[str, Dict[str, str]]) -> List[str]:
+        """
+        Same write as batch_update_candidates, for callers that must know
+        exactly what was saved (the API, scheduling + invites).
+
+        Returns:
+            list: Emails that were written (unknown emails are skipped)
+
+        Raises:
+            CandidateWriteError: The write failed - nothing was saved
+        """
+        if not updates:
+            return []
+
+        from gspread.utils import ValueInputOption, rowcol_to_a1
+
+        try:
+            headers = self.worksheet.row_values(1)
+            email_rows = self.get_email_index(headers)
+
+            data = []
+            written = []
+            for email, columns in updates.items():
+                row_number = email_rows.get(email)
+                if row_number is None:
+                    print(f"⚠️ Candidate with email {email} not found")
+                    continue
+
+                for column_name, value in columns.items():
+                    col_index = headers.index(column_name) + 1
+                    data.append({
+                        'range': rowcol_to_a1(row_number, col_index),
+                        'values': [[value]]
+                    })
+                written.append(email)
+
+            if data:
+                # USER_ENTERED, same as update_cell - "10" is stored as a number
+                self.worksheet.batch_update(
+                    data,
+                    value_input_option=ValueInputOption.user_entered
+                )
+                self._sheet_changed()
+
+        except Exception as e:
+            raise CandidateWriteError(str(e)) from e
+
+        print(f"✅ Batch updated {len(written)} candidate(s) ({len(data)} cells)")
+        return written
+
     def add_candidate(self, candidate_data: Dict[str, str]) -> bool:  # Line 40
         """
         Adds a new candidate row to the sheet.
@@ -150,6 +410,7 @@ class SheetsConnector:
             
             # Append the new row at the bottom
             self.worksheet.append_row(new_row)                # Line 44
+            self._sheet_changed()
             
             print(f"✅ Added candidate: {candidate_data.get('Name', 'Unknown')}")
             return True
@@ -158,6 +419,99 @@ class SheetsConnector:
             print(f"❌ Error adding candidate: {e}")
             return False
         
+    def add_candidates(self, candidates: List[Dict[str, str]], headers: Optional[List[str]] = None) -> int:
+        """
+        Adds many candidate rows with ONE append_rows call.
+
+        Args:
+            candidates: List of dicts with column names as keys
+            headers: Header row, if the caller already fetched it
+
+        Returns:
+            int: Number of rows added (0 on error)
+        """
+        if not candidates:
+            return 0
+
+        try:
+            if headers is None:
+                headers = self.worksheet.row_values(1)
+
+            new_rows = [
+                [candidate.get(header, '') for header in headers]
+                for candidate in candidates
+            ]
+
+            self.worksheet.append_rows(new_rows)
+            self._sheet_changed()
+
+            print(f"✅ Added {len(new_rows)} candidate(s)")
+            return len(new_rows)
+
+        except Exception as e:
+            print(f"❌ Error adding candidates: {e}")
+            return 0
+
+    def delete_candidates(self, emails: List[str], all_rows: bool = False) -> int:
+        """
+        Deletes these candidates' rows from the sheet in ONE request - the
+        first row of each email, or with all_rows every row of it.
+
+        Row numbers are looked up right before deleting (one read of the
+        Email column). Worksheet.delete_rows only takes one range, so the
+        runs of adjacent rows go as deleteDimension requests in a single
+        spreadsheet batch_update - bottom-up, so earlier deletes don't
+        shift later ones.
+
+        Returns:
+            int: Number of rows deleted (0 on error)
+        """
+        if not emails:
+            return 0
+
+        try:
+            if all_rows:
+                email_rows = self.get_email_rows()
+                rows = sorted({row for email in emails for row in email_rows.get(email, [])}, reverse=True)
+            else:
+                email_rows = self.get_email_index()
+                rows = sorted({email_rows[email] for email in emails if email in email_rows}, reverse=True)
+            if not rows:
+                return 0
+
+            # [(end, start), ...] runs of adjacent rows, highest first
+            runs = []
+            for row in rows:
+                if runs and runs[-1][1] == row + 1:
+                    runs[-1][1] = row
+                else:
+                    runs.append([row, row])
+
+            body = {"requests": [
+                {"deleteDimension": {"range": {
+                    "sheetId": self.worksheet.id,
+                    "dimension": "ROWS",
+                    "startIndex": start - 1,
+                    "endIndex": end,
+                }}}
+                for end, start in runs
+            ]}
+
+            def _delete():
+                with track("sheets", "delete_rows"):
+                    return self.worksheet.spreadsheet.batch_update(body)
+
+            # Not a worksheet method, so it goes through the limiter here
+            self.rate_limiter.call("delete_rows", _delete)
+            self._sheet_changed()
+
+            print(f"✅ Deleted {len(rows)} candidate row(s) ({len(runs)} range(s), 1 request)")
+            return len(rows)
+
+        except Exception as e:
+            print(f"❌ Error deleting candidates: {e}")
+            return 0
+
     def get_candidates_by_status(self, status: str) -> pd.DataFrame:  # Line 45
         """
         Returns only candidates with a specific status.
@@ -176,26 +530,67 @@ class SheetsConnector:
         return filtered_df                                    # Line 48
     
     # ============================================
-    # SINGLETON INSTANCE
+    # ONE CONNECTOR PER TENANT
     # ============================================
 
-    # Create ONE global instance to reuse across the app
-    # This prevents connecting multiple times
-_connector_instance: Optional[SheetsConnector] = None         # Line 49
+def connect_tenant(tenant: Tenant, client=None, rate_limiter: Optional[SheetsRateLimiter] = None) -> SheetsConnector:
+    """
+    Connects to a tenant's candidate table - its spreadsheet's first tab,
+    one configured tab, or several tabs as shards (utils/sharded_connector.py).
+    """
+    from utils.snapshot import snapshot_for
+
+    snapshot = snapshot_for(tenant)
+    shards = parse_sheet_shards(tenant.sheet_shards, tenant.sheet_name)
+    if len(shards) > 1:
+        from utils.sharded_connector import ShardedSheetsConnector
+        return ShardedSheetsConnector.connect(shards, snapshot=snapshot, rate_limiter=rate_limiter, client=client)
+
+    _, spreadsheet_name, worksheet_title = shards[0] if shards else (None, tenant.sheet_name, None)
+    return SheetsConnector(
+        rate_limiter=rate_limiter,
+        snapshot=snapshot,
+        spreadsheet_name=spreadsheet_name,
+        worksheet_title=worksheet_title,
+        client=client
+    )
+
 
 def get_connector() -> SheetsConnector:                       # Line 50
     """
-    Returns the single shared instance of SheetsConnector.
-    Creates it on first call, reuses on subsequent calls.
+    Returns the current tenant's SheetsConnector (utils/tenants.py).
+    Creates it on first call, reuses it from the pool after that.
     
     Usage:
         from utils.sheets_connector import get_connector
         connector = get_connector()
         df = connector.get_all_candidates()
     """
-    global _connector_instance                                # Line 51
-    
-    if _connector_instance is None:                           # Line 52
-        _connector_instance = SheetsConnector()               # Line 53
-    
-    return _connector_instance                                # Line 54
\ No newline at end of file
+    from utils.tenants import get_connector_pool
+
+    # The pool is locked, so a page and warm_connector() never connect twice
+    return get_connector_pool().get()                         # Line 54
+
+
+def warm_connector():
+    """
+    Starts connecting to Google Sheets in the background.
+
+    Call it as early as possible (top of app.py / a page, after
+    use_tenant()): the imports and the OAuth handshake then overlap with
+    Streamlit drawing the page, and the first get_connector() call only
+    waits for whatever is left.
+    Errors are ignored here - get_connector() raises them when it is used.
+    """
+    from utils.tenants import current_tenant, get_connector_pool, start_thread
+
+    if get_connector_pool().has(current_tenant().tenant_id):
+        return
+
+    def _warm():
+        try:
+            get_connector()
+        except Exception:
+            pass
+
+    start_thread(_warm, name="sheets-warm")
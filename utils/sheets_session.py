@@ -0,0 +1,217 @@
+"""
+A Google Sheets connection that stays healthy for the life of the process.
+
+authorize() in utils/sheets_connector.py used to hand gspread the
+credentials and never look at them again: once the connection dropped
+or the token was rejected, every call failed until the app restarted.
+SheetsHTTPClient (given to gspread.authorize) instead:
+- Keeps one keep-alive session with a connection pool big enough for
+  parallel shard reads, and retries requests that never reached Google
+  (dropped keep-alive connections) at the transport level
+- Refreshes the access token on a background thread
+  SHEETS_TOKEN_REFRESH_MARGIN_SECONDS before it expires, so no page
+  waits on the token endpoint
+- Retries a request once, with a fresh token, if Google answers 401
+
+open_spreadsheet() remembers each spreadsheet's key, so reconnecting
+opens it by key instead of searching Drive for it by name.
+
+gspread and google-auth are imported at the top here - this module is
+only imported when connecting.
+"""
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+import gspread
+import requests
+from google.auth.transport.requests import AuthorizedSession, Request
+from gspread.exceptions import APIError
+from gspread.utils import convert_credentials
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.config import env, LOCAL_DATA_DIR
+from utils.metrics import track
+from utils.rate_limiter import status_code
+
+
+SHEETS_TOKEN_REFRESH_MARGIN_SECONDS = float(env("SHEETS_TOKEN_REFRESH_MARGIN_SECONDS", "300"))
+SHEETS_HTTP_POOL_SIZE = int(env("SHEETS_HTTP_POOL_SIZE", "10"))
+SPREADSHEET_KEYS_PATH = env("SPREADSHEET_KEYS_PATH", os.path.join(LOCAL_DATA_DIR, "spreadsheet_keys.json"))
+
+# Wait this long before trying again after a failed token refresh
+_REFRESH_RETRY_SECONDS = 30
+
+
+class SheetsHTTPClient(gspread.HTTPClient):
+    """
+    gspread's HTTP client with a pooled keep-alive session, background
+    token refresh and one retry on 401.
+
+    Usage:
+        client = gspread.authorize(credentials, http_client=SheetsHTTPClient)
+        client.http_client.start_refresher()
+    """
+
+    def __init__(self, auth, session: Optional[requests.Session] = None):
+        # Token requests get a keep-alive session of their own
+        self._token_request = Request(requests.Session())
+        if session is None:
+            # 401s are retried (once, and counted) in request() below
+            session = AuthorizedSession(
+                convert_credentials(auth),
+                max_refresh_attempts=0,
+                auth_request=self._token_request
+            )
+        super().__init__(auth, session)
+        self.auth = session.credentials
+
+        # Connect errors never reached Google, and idempotent reads
+        # (GET) can be resent - POST writes are never retried here.
+        # 429/5xx are left to the rate limiter (utils/rate_limiter.py).
+        retry = Retry(total=2, connect=2, read=1, status=0, other=0, backoff_factor=0.2)
+        adapter = HTTPAdapter(
+            pool_connections=SHEETS_HTTP_POOL_SIZE,
+            pool_maxsize=SHEETS_HTTP_POOL_SIZE,
+            max_retries=retry
+        )
+        self.session.mount("https://", adapter)
+
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"token_refreshes": 0, "refresh_failures": 0, "auth_retries": 0}
+
+    # ============================================
+    # TOKEN
+    # ============================================
+
+    def refresh_token(self, force: bool = False):
+        """
+        Gets a new access token (unless another thread just did, and
+        force=False and the current one is still valid).
+        """
+        with self._refresh_lock:
+            if not force and self.auth.token and self.seconds_until_refresh() > 0:
+                return
+            with track("sheets", "token_refresh"):
+                self.auth.refresh(self._token_request)
+            self.stats["token_refreshes"] += 1
+
+    def seconds_until_refresh(self) -> float:
+        """
+        Seconds until the token is within the refresh margin of expiring
+        (0 = refresh now, e.g. before the first token).
+        """
+        expiry = getattr(self.auth, "expiry", None)
+        if not self.auth.token or expiry is None:
+            return 0.0
+        # google-auth keeps expiry as naive UTC
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return max(0.0, (expiry - now).total_seconds() - SHEETS_TOKEN_REFRESH_MARGIN_SECONDS)
+
+    def start_refresher(self):
+        """
+        Starts the background token refresh (safe to call more than once).
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sheets-token-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        wait = 0.0
+        while not self._stop.wait(wait):
+            try:
+                self.refresh_token()
+                wait = self.seconds_until_refresh()
+            except Exception as e:
+                # Requests still refresh on their own if the token runs out
+                self.stats["refresh_failures"] += 1
+                print(f"⚠️ Sheets token refresh failed, retrying in {_REFRESH_RETRY_SECONDS}s: {e}")
+                wait = _REFRESH_RETRY_SECONDS
+
+    # ============================================
+    # REQUESTS
+    # ============================================
+
+    def request(self, *args, **kwargs):
+        try:
+            return super().request(*args, **kwargs)
+        except APIError as e:
+            if status_code(e) != 401:
+                raise
+
+        # Token revoked or expired under us - get a new one and try once more
+        self.stats["auth_retries"] += 1
+        print("⚠️ Sheets answered 401 - refreshing the token and retrying once")
+        self.refresh_token(force=True)
+        return super().request(*args, **kwargs)
+
+
+# ============================================
+# SPREADSHEET KEYS
+# ============================================
+
+_keys_lock = threading.Lock()
+
+def _load_keys() -> Dict[str, str]:
+    try:
+        with open(SPREADSHEET_KEYS_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_key(name: str, key: Optional[str]):
+    with _keys_lock:
+        keys = _load_keys()
+        if key is None:
+            keys.pop(name, None)
+        else:
+            keys[name] = key
+
+        folder = os.path.dirname(SPREADSHEET_KEYS_PATH)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        temp_path = f"{SPREADSHEET_KEYS_PATH}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(keys, f, indent=2)
+        os.replace(temp_path, SPREADSHEET_KEYS_PATH)
+
+
+def open_spreadsheet(client: gspread.Client, name: str) -> gspread.Spreadsheet:
+    """
+    Opens a spreadsheet by name - by its remembered key when we have one
+    (one request instead of a Drive search plus the open).
+
+    Keys are remembered per service account, since two accounts can see
+    different spreadsheets with the same name.
+    """
+    account = getattr(client.http_client.auth, "service_account_email", "") or ""
+    cache_name = f"{account}/{name}"
+
+    key = _load_keys().get(cache_name)
+    if key:
+        try:
+            spreadsheet = client.open_by_key(key)
+        except (gspread.SpreadsheetNotFound, PermissionError):
+            # Deleted, or no longer shared with us - look it up by name again
+            _save_key(cache_name, None)
+        else:
+            if spreadsheet.title == name:
+                return spreadsheet
+            # Renamed since - `name` may now be another spreadsheet
+            _save_key(cache_name, None)
+
+    spreadsheet = client.open(name)
+    _save_key(cache_name, spreadsheet.id)
+    return spreadsheet
@@ -0,0 +1,215 @@
+"""
+Last-known candidate table on local disk, for instant warm starts.
+
+Every pull from Sheets (SheetsConnector.get_all_candidates) is saved as an
+Arrow IPC file stamped with when it was pulled and a hash of its contents.
+load_candidates_fast() memory-maps that file and returns it straight away,
+then pulls from Sheets in the background if it's older than
+CANDIDATE_SNAPSHOT_MAX_AGE_SECONDS - so a restarted process (or a new
+replica sharing the disk) renders immediately instead of waiting on the
+network. Our own writes delete the snapshot, so a page never re-reads
+data from before a change it just made.
+
+pyarrow is optional: without it there are no snapshots and every load
+goes to Sheets, as before. Each tenant (utils/tenants.py) has its own file.
+"""
+from __future__ import annotations
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
+from utils.config import env, LOCAL_DATA_DIR
+from utils.tenants import current_tenant, start_thread
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from utils.tenants import Tenant
+
+
+CANDIDATE_SNAPSHOT_PATH = env("CANDIDATE_SNAPSHOT_PATH", os.path.join(LOCAL_DATA_DIR, "candidates.arrow"))
+CANDIDATE_SNAPSHOT_MAX_AGE_SECONDS = float(env("CANDIDATE_SNAPSHOT_MAX_AGE_SECONDS", "30"))
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        return pyarrow
+    except ImportError:
+        return None
+
+
+class CandidateSnapshot:
+    """
+    One Arrow file holding the candidate table plus its version stamp
+    (schema metadata: saved_at, rows, version hash).
+    """
+
+    def __init__(self, path: str = CANDIDATE_SNAPSHOT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._invalidated_at = 0.0
+
+    @property
+    def available(self) -> bool:
+        return _pyarrow() is not None
+
+    def save(self, df: pd.DataFrame, fetched_at: Optional[float] = None) -> bool:
+        """
+        Writes the table (to a temp file, then swapped in - readers that
+        have the old file mapped keep seeing it).
+
+        Args:
+            fetched_at: When the pull that produced df started. A pull that
+                started before our last write is not saved (it may miss it).
+
+        Returns:
+            bool: False if skipped, pyarrow isn't installed or the write failed
+        """
+        pa = _pyarrow()
+        fetched_at = fetched_at or time.time()
+        if pa is None or fetched_at < self._invalidated_at:
+            return False
+
+        import pandas as pd
+
+        try:
+            columns = {}
+            for name in df.columns:
+                try:
+                    columns[str(name)] = pa.array(df[name], from_pandas=True)
+                except (pa.ArrowInvalid, pa.ArrowTypeError):
+                    # get_all_records mixes numbers and text in one column (e.g. Ghost_Risk)
+                    columns[str(name)] = pa.array(
+                        df[name].astype(object).where(df[name].notna(), None).map(
+                            lambda v: v if v is None else str(v)
+                        ),
+                        type=pa.string()
+                    )
+
+            metadata = {
+                "saved_at": str(fetched_at),
+                "rows": str(len(df)),
+                "version": format(int(pd.util.hash_pandas_object(df.astype(str), index=False).sum()), "016x"),
+            }
+            table = pa.table(columns).replace_schema_metadata(metadata)
+
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            temp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with self._lock:
+                if fetched_at < self._invalidated_at:
+                    return False
+                with pa.OSFile(temp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+                os.replace(temp_path, self.path)
+            return True
+
+        except Exception as e:
+            print(f"⚠️ Could not save candidate snapshot: {e}")
+            return False
+
+    def load(self) -> Optional[Tuple[pd.DataFrame, Dict[str, str]]]:
+        """
+        Memory-maps the snapshot.
+
+        Returns:
+            (DataFrame, {'saved_at', 'rows', 'version'}) or None if there is none
+        """
+        pa = _pyarrow()
+        if pa is None or not os.path.exists(self.path):
+            return None
+
+        try:
+            with pa.memory_map(self.path, "r") as source:
+                table = pa.ipc.open_file(source).read_all()
+        except (OSError, pa.ArrowInvalid) as e:
+            print(f"⚠️ Ignoring unreadable candidate snapshot: {e}")
+            return None
+
+        metadata = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+        df = table.to_pandas()
+        df.attrs["fetched_at"] = float(metadata.get("saved_at", 0))
+        return df, metadata
+
+    def invalidate(self):
+        """
+        Throws the snapshot away (after we changed the sheet).
+        """
+        with self._lock:
+            self._invalidated_at = time.time()
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+
+_reconcile_threads: Dict[str, threading.Thread] = {}
+_reconcile_lock = threading.Lock()
+
+def reconcile_in_background() -> bool:
+    """
+    Pulls the current tenant's table from Sheets on a background thread
+    (which saves a new snapshot). Does nothing if a pull is already running.
+
+    Returns:
+        bool: True if a pull was started
+    """
+    tenant_id = current_tenant().tenant_id
+
+    def _reconcile():
+        from utils.sheets_connector import get_connector
+        try:
+            get_connector().get_all_candidates()
+        except Exception as e:
+            print(f"⚠️ Background refresh from Sheets failed: {e}")
+
+    with _reconcile_lock:
+        running = _reconcile_threads.get(tenant_id)
+        if running is not None and running.is_alive():
+            return False
+        _reconcile_threads[tenant_id] = start_thread(_reconcile, name="candidate-reconcile")
+    return True
+
+
+def load_candidates_fast(max_age_seconds: float = CANDIDATE_SNAPSHOT_MAX_AGE_SECONDS) -> pd.DataFrame:
+    """
+    The candidate table - from the snapshot when there is one, else from Sheets.
+
+    A snapshot older than max_age_seconds is still returned immediately,
+    and a background pull brings it up to date for the next call.
+    df.attrs['fetched_at'] says how old the data is.
+    """
+    loaded = get_candidate_snapshot().load()
+    if loaded is None:
+        from utils.sheets_connector import get_connector
+        return get_connector().get_all_candidates()
+
+    df, metadata = loaded
+    if time.time() - float(metadata.get("saved_at", 0)) > max_age_seconds:
+        reconcile_in_background()
+    return df
+
+
+_snapshot_instances: Dict[str, CandidateSnapshot] = {}
+_snapshot_lock = threading.Lock()
+
+def snapshot_for(tenant: Tenant) -> CandidateSnapshot:
+    """
+    Returns this tenant's CandidateSnapshot.
+    """
+    with _snapshot_lock:
+        if tenant.tenant_id not in _snapshot_instances:
+            _snapshot_instances[tenant.tenant_id] = CandidateSnapshot(
+                tenant.data_path("candidates.arrow", CANDIDATE_SNAPSHOT_PATH)
+            )
+
+        return _snapshot_instances[tenant.tenant_id]
+
+
+def get_candidate_snapshot() -> CandidateSnapshot:
+    """
+    Returns the current tenant's CandidateSnapshot.
+    """
+    return snapshot_for(current_tenant())
@@ -0,0 +1,288 @@
+"""
+Several client companies served from one deployment.
+
+Each tenant has its own spreadsheet, company name, HR inbox and Sheets
+quota share. TENANTS_PATH (a JSON file) lists them; without it there is
+one "default" tenant built from .env, exactly as before.
+
+Which tenant a call is for is a context variable, set once at the top
+of a page (?tenant=acme) or per API request (X-Tenant header), like
+set_page() in utils/metrics.py. Everything that holds a tenant's data -
+connector, snapshot, candidate cache/store, archive, analytics, alerts -
+is kept per tenant; its files go to LOCAL_DATA_DIR/tenants/<id>/.
+
+Connectors live in a ConnectorPool: at most TENANT_POOL_SIZE are kept
+(least recently used ones are dropped), tenants with the same
+credentials file share one authorized gspread client (one HTTP session),
+and each tenant gets its own rate limiter, so a busy tenant waits on its
+own quota instead of using up everyone else's.
+
+tenants.json:
+    {
+        "acme": {"company_name": "Acme", "sheet_name": "Acme_Pipeline", "hr_email": "hr@acme.com"},
+        "globex": {"company_name": "Globex", "sheet_name": "Hiring", "sheet_shards": "Pune,Delhi",
+                   "read_quota_per_minute": 20, "write_quota_per_minute": 20}
+    }
+"""
+from __future__ import annotations
+import contextvars
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, TYPE_CHECKING
+from utils.config import env, LOCAL_DATA_DIR
+
+if TYPE_CHECKING:
+    from utils.rate_limiter import SheetsRateLimiter
+    from utils.sheets_connector import SheetsConnector
+
+
+TENANTS_PATH = env("TENANTS_PATH", "config/tenants.json")
+TENANT_POOL_SIZE = int(env("TENANT_POOL_SIZE", "8"))
+COMPANY_NAME = env("COMPANY_NAME", "TechCorp")
+DEFAULT_TENANT = "default"
+
+
+class Tenant:
+    """
+    One client company's settings (missing ones fall back to .env).
+    """
+
+    def __init__(
+        self,
+        tenant_id: str,
+        company_name: str = COMPANY_NAME,
+        sheet_name: Optional[str] = None,
+        sheet_shards: Optional[str] = None,
+        hr_email: Optional[str] = None,
+        credentials_path: Optional[str] = None,
+        read_quota_per_minute: Optional[int] = None,
+        write_quota_per_minute: Optional[int] = None,
+    ):
+        from utils.hr_alerts import HR_EMAIL
+        from utils.sheets_connector import CREDENTIALS_PATH, SHEET_NAME, SHEET_SHARDS
+
+        self.tenant_id = tenant_id
+        self.company_name = company_name
+        self.sheet_name = sheet_name or SHEET_NAME
+        # A tenant with its own sheet doesn't inherit the default tenant's shards
+        self.sheet_shards = sheet_shards if sheet_shards is not None else ("" if sheet_name else SHEET_SHARDS)
+        self.hr_email = hr_email or HR_EMAIL
+        self.credentials_path = credentials_path or CREDENTIALS_PATH
+        self.read_quota_per_minute = read_quota_per_minute
+        self.write_quota_per_minute = write_quota_per_minute
+
+    @property
+    def is_default(self) -> bool:
+        return self.tenant_id == DEFAULT_TENANT
+
+    def data_path(self, filename: str, default: str) -> str:
+        """
+        Where this tenant keeps a local file: `default` (the path from .env)
+        for the default tenant, LOCAL_DATA_DIR/tenants/<id>/<filename> otherwise.
+        """
+        if self.is_default:
+            return default
+        return os.path.join(LOCAL_DATA_DIR, "tenants", self.tenant_id, filename)
+
+    def __repr__(self):
+        return f"Tenant({self.tenant_id!r}, {self.company_name!r})"
+
+
+def load_tenants(path: str = TENANTS_PATH) -> Dict[str, Tenant]:
+    """
+    Reads the tenant registry. The default tenant (.env settings) is always there.
+    """
+    tenants = {DEFAULT_TENANT: Tenant(DEFAULT_TENANT)}
+    if not os.path.exists(path):
+        return tenants
+
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+
+    for tenant_id, settings in entries.items():
+        try:
+            tenants[tenant_id] = Tenant(tenant_id, **settings)
+        except TypeError as e:
+            raise ValueError(f"❌ Bad settings for tenant '{tenant_id}' in {path}: {e}")
+
+    print(f"✅ Loaded {len(tenants)} tenant(s) from {path}")
+    return tenants
+
+
+_tenants: Optional[Dict[str, Tenant]] = None
+_tenants_lock = threading.Lock()
+
+def get_tenants() -> Dict[str, Tenant]:
+    """
+    Returns the tenant registry (read once).
+    """
+    global _tenants
+
+    with _tenants_lock:
+        if _tenants is None:
+            _tenants = load_tenants()
+
+    return _tenants
+
+
+# ============================================
+# CURRENT TENANT
+# ============================================
+
+_current_tenant: contextvars.ContextVar[str] = contextvars.ContextVar("tenant", default=DEFAULT_TENANT)
+
+def use_tenant(tenant_id: Optional[str] = None) -> Tenant:
+    """
+    Makes every call for the rest of this script run / request use this
+    tenant (None = the default tenant).
+
+    Raises:
+        ValueError: Unknown tenant
+    """
+    tenant_id = tenant_id or DEFAULT_TENANT
+    tenants = get_tenants()
+    if tenant_id not in tenants:
+        raise ValueError(f"❌ Unknown tenant '{tenant_id}'")
+
+    _current_tenant.set(tenant_id)
+    return tenants[tenant_id]
+
+
+def current_tenant() -> Tenant:
+    return get_tenants()[_current_tenant.get()]
+
+
+def start_thread(target, name: str) -> threading.Thread:
+    """
+    Starts a daemon thread that works for the current tenant (a new
+    thread would otherwise start out on the default tenant).
+    """
+    thread = threading.Thread(target=contextvars.copy_context().run, args=(target,), name=name, daemon=True)
+    thread.start()
+    return thread
+
+
+# ============================================
+# CONNECTOR POOL
+# ============================================
+
+class ConnectorPool:
+    """
+    Authorized connectors for the most recently used tenants.
+
+    Args:
+        max_size: Connectors kept; the least recently used is dropped
+            (reconnecting later only reopens its spreadsheet - the
+            authorized client is kept)
+    """
+
+    def __init__(self, max_size: int = TENANT_POOL_SIZE):
+        self.max_size = max(1, max_size)
+        self._lock = threading.Lock()
+        self._connectors: OrderedDict[str, SheetsConnector] = OrderedDict()
+        # One lock per tenant, so only one thread connects it and other tenants don't wait
+        self._connecting: Dict[str, threading.Lock] = {}
+        # credentials path -> authorized gspread client (shared HTTP session)
+        self._clients: Dict[str, object] = {}
+        self._limiters: Dict[str, SheetsRateLimiter] = {}
+        self.stats = {"connects": 0, "evictions": 0}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._connectors)
+
+    def has(self, tenant_id: str) -> bool:
+        with self._lock:
+            return tenant_id in self._connectors
+
+    def get(self, tenant: Optional[Tenant] = None) -> SheetsConnector:
+        """
+        Returns this tenant's connector (default: the current tenant),
+        connecting it on first use.
+        """
+        tenant = tenant or current_tenant()
+
+        with self._lock:
+            connector = self._connectors.get(tenant.tenant_id)
+            if connector is not None:
+                self._connectors.move_to_end(tenant.tenant_id)
+                return connector
+            connecting = self._connecting.setdefault(tenant.tenant_id, threading.Lock())
+
+        with connecting:
+            with self._lock:
+                connector = self._connectors.get(tenant.tenant_id)
+            if connector is None:
+                connector = self._connect(tenant)
+
+            with self._lock:
+                self._connectors[tenant.tenant_id] = connector
+                self._connectors.move_to_end(tenant.tenant_id)
+                while len(self._connectors) > self.max_size:
+                    evicted, _ = self._connectors.popitem(last=False)
+                    self.stats["evictions"] += 1
+                    print(f"♻️ Dropped Sheets connector for tenant '{evicted}' (pool size {self.max_size})")
+
+        return connector
+
+    def rate_limiter(self, tenant: Tenant) -> SheetsRateLimiter:
+        """
+        The tenant's quota gate. With one tenant it is the shared limiter;
+        otherwise each tenant gets its configured quota, or an even share
+        of the quota of the credentials (Google's quota is per account).
+        """
+        from utils.rate_limiter import (
+            SHEETS_READ_QUOTA_PER_MINUTE, SHEETS_WRITE_QUOTA_PER_MINUTE,
+            SheetsRateLimiter, get_sheets_limiter
+        )
+
+        tenants = get_tenants()
+        if len(tenants) == 1:
+            return get_sheets_limiter()
+
+        with self._lock:
+            limiter = self._limiters.get(tenant.tenant_id)
+            if limiter is None:
+                sharing = sum(1 for t in tenants.values() if t.credentials_path == tenant.credentials_path)
+                limiter = self._limiters[tenant.tenant_id] = SheetsRateLimiter(
+                    read_per_minute=tenant.read_quota_per_minute or max(1, SHEETS_READ_QUOTA_PER_MINUTE // sharing),
+                    write_per_minute=tenant.write_quota_per_minute or max(1, SHEETS_WRITE_QUOTA_PER_MINUTE // sharing),
+                )
+            return limiter
+
+    def _client(self, credentials_path: str):
+        from utils.sheets_connector import authorize
+
+        with self._lock:
+            client = self._clients.get(credentials_path)
+        if client is None:
+            client = authorize(credentials_path)
+            with self._lock:
+                client = self._clients.setdefault(credentials_path, client)
+        return client
+
+    def _connect(self, tenant: Tenant) -> SheetsConnector:
+        from utils.sheets_connector import connect_tenant
+
+        connector = connect_tenant(tenant, client=self._client(tenant.credentials_path), rate_limiter=self.rate_limiter(tenant))
+        with self._lock:
+            self.stats["connects"] += 1
+        return connector
+
+
+_pool_instance: Optional[ConnectorPool] = None
+_pool_lock = threading.Lock()
+
+def get_connector_pool() -> ConnectorPool:
+    """
+    Returns the single shared ConnectorPool.
+    """
+    global _pool_instance
+
+    with _pool_lock:
+        if _pool_instance is None:
+            _pool_instance = ConnectorPool()
+
+    return _pool_instance